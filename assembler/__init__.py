@@ -1 +1,5 @@
- 
+# m6800_sdk/assembler
+
+# Derleme önbelleği anahtarına girer: assembler'ın ürettiği çıktıyı değiştiren her
+# sürümde artırılmalıdır (bkz. cache.py).
+__version__ = "0.9.0"
@@ -1,25 +1,71 @@
+import io
+import linecache
+import os
 from .lexical_analyzer import LexicalAnalyzer
 from .syntax_analyzer import SyntaxAnalyzer, ParsedInstruction
 from .symbol_table import SymbolTable
-from .opcode_table import get_pseudo_op_info, MODE_DIRECT, MODE_EXTENDED, MODE_RELATIVE
+from .opcode_table import get_instruction_info, get_pseudo_op_info, MODE_DIRECT, MODE_EXTENDED, MODE_RELATIVE
+from .expression import ExpressionError, UndefinedSymbolError, evaluate, expression_to_str, symbols_in
 import assembler.opcode_table as ot_module
-from .code_generator import CodeGenerator # CodeGenerator'ı import et
+from .code_generator import CodeGenerator, include_range # CodeGenerator'ı import et
+from .peephole import PeepholeOptimizer
+from .timing import TimingAnalyzer, TimingReport, instruction_cycles, format_cycles
+from .source_map import SourceMap
+from .cache import cache_key, file_key, file_digest, dependencies_current
+from .conditional import ConditionalAssembly
 
 # CodeGenerator'ı daha sonra import edeceğiz
 # from .code_generator import CodeGenerator
 
+# Tek satırda büyük veri bloğu üretebilen direktifler; listing'de ilk LISTING_HEX_LIMIT byte gösterilir
+BULK_DATA_DIRECTIVES = frozenset(('FCC', 'FILL', 'INCBIN'))
+LISTING_HEX_LIMIT = 8
+
 class Assembler:
-    def __init__(self):
+    def __init__(self, optimize_addressing=True, relax_branches=False, peephole=False, cache=None, defines=None,
+                 routine_timing=True):
         self.lexer = LexicalAnalyzer()
         self.syntax_analyzer = SyntaxAnalyzer(ot_module) # ot_module burada kullanılıyor
         self.symbol_table = SymbolTable()
         self.code_generator = CodeGenerator(self.symbol_table, ot_module) # CodeGenerator'ı initialize et
         self.location_counter = 0
-        self.program_origin = 0 # ORG ile set edilecek
+        self.program_origin = 0 # İlk ORG ile set edilecek
+        self.entry_point = 0 # Programın başlangıç adresi (END operandı veya ilk kod byte'ı)
         self.parsed_instructions = [] # Syntax analizinden geçmiş talimatlar
-        self.object_code = [] # Üretilen byte listesi
+        # Üretilen nesne kodu: adres sırasıyla [(başlangıç_adresi, bytearray), ...]
+        # ORG boşlukları ve RMB rezervasyonları ayrı segmentlere bölünür.
+        self.segments = []
         self.errors = []
-        self.listing = [] # (adres, hex_kod, kaynak_satır) tuple listesi
+        self.listing = [] # (adres, hex_kod, kaynak_satır, yorum, cycle) tuple listesi
+        self.source_map = SourceMap() # Adres <-> satır eşlemesi (Pass 2'de, listing'den bağımsız üretilir)
+        # True ise $00-$FF'e çözülen operandlar için Extended yerine Direct adresleme seçilir
+        self.optimize_addressing = optimize_addressing
+        # True ise menzil dışındaki relative branch'ler ters branch + JMP'ye çevrilir
+        self.relax_branches = relax_branches
+        # True ise Pass 1 ile Pass 2 arasında peephole optimizasyonu uygulanır (bkz. peephole.py)
+        self.peephole = peephole
+        self.peephole_report = [] # [(satır_no, kural, kazanılan_byte, kazanılan_cycle), ...]
+        # Statik zamanlama raporu (timing.TimingReport); listing veya CYCLES varsa üretilir.
+        self.timing = None
+        # True ise listing tutulurken etiketli her rutinin en iyi/en kötü cycle toplamı hesaplanıp
+        # listing'e eklenir (yol araması, derleme süresinin ~%15'i). False ise sadece CYCLES
+        # direktifinde adı geçen rutinler hesaplanır; yazarken yapılan derlemeler bunu kullanır.
+        self.routine_timing = routine_timing
+        self._label_owners = {} # Etiket -> onu tanımlayan ParsedInstruction (adresi yerleşimde atanır)
+        # False ise (büyük dosyalar için) kaynak satırları ve listing tutulmaz; hata mesajları
+        # için gereken satırlar dosyadan tekrar okunur (bkz. _source_of).
+        self.keep_listing = True
+        self._source_path = None
+        # INCBIN yollarının göreli olduğu dizin (dosyadan derlemede kaynağın dizini; yoksa çalışma dizini)
+        self._include_dir = None
+        self._includes = {} # Çözülmüş INCBIN yolu -> dosya boyutu (Pass 1'de bir kez okunur)
+        # cache.AssemblyCache örneği; verilirse aynı kaynak/seçenekler için derleme atlanır.
+        # Önbellekten gelen sonuçta parsed_instructions boştur (sadece çıktılar saklanır).
+        self.cache = cache
+        # Komut satırı tanımları (-D SEMBOL=değer): IF/IFDEF koşullarında ve ifadelerde sembol olarak görülür
+        self.defines = {name.upper(): value for name, value in (defines or {}).items()}
+        self._early_symbols = {} # Pass 1 akışı sırasında o ana kadar bilinen sabitler (IF koşulları için)
+        self._conditional_results = {} # IF satır no -> koşul değeri (listing için)
 
     def _add_error(self, line_number, message, original_line=""):
         self.errors.append(f"Error (L:{line_number}): {message} -> '{original_line}'")
@@ -28,124 +74,447 @@ class Assembler:
         self.symbol_table.clear()
         self.location_counter = 0
         self.program_origin = 0
+        self.entry_point = 0
         self.parsed_instructions = []
-        self.object_code = []
+        self.segments = []
         self.errors = []
         self.listing = []
-
-    def assemble_pass1(self, source_code_str):
+        self.source_map = SourceMap()
+        self.peephole_report = []
+        self.timing = None
+        self._label_owners = {}
+        self._early_symbols = {}
+        self._conditional_results = {}
+        self._includes = {}
+
+    def _source_of(self, pi):
+        """Komutun kaynak satırı; saklanmadıysa kaynak dosyadan okunur."""
+        if pi.source_line is not None:
+            return pi.source_line
+        if self._source_path:
+            return linecache.getline(self._source_path, pi.line_number).strip()
+        return ""
+
+    def _add_listing_row(self, row, cycles=""):
+        """row: (adres, hex_kod, kaynak_satır, yorum); cycle sütunu sona eklenir."""
+        if self.keep_listing:
+            self.listing.append(row + (cycles,))
+
+    def _evaluate_now(self, pi, expression, location_counter, errors):
         """
-        Assembler'ın birinci geçişi.
-        - Kaynak kodu token'lara ve sonra parsed instruction'lara çevirir.
-        - Sembol tablosunu (etiketler ve adresleri) oluşturur.
-        - Her komutun yaklaşık uzunluğunu hesaplar (LC'yi yönetir).
+        ORG/RMB gibi LC'yi hemen etkileyen direktiflerin değerini Pass 1 sırasında hesaplar.
+        İfadenin bağlı olduğu EQU sembolleri önce (sadece ilgili alt grafik) çözülür.
+        Hesaplanamazsa hatayı errors listesine ekler ve None döndürür.
         """
-        self.parsed_instructions = [] # Her assemble çağrısında temizle
-        self.location_counter = self.program_origin # LC, ORG ile başlar
-
-        tokens = self.lexer.tokenize_source_code(source_code_str)
-        parsed_instructions_temp = self.syntax_analyzer.parse_tokens(tokens)
-
-        current_lc_for_instruction = self.location_counter
-
-        for pi in parsed_instructions_temp:
+        if not isinstance(expression, int):
+            self.symbol_table.resolve_expressions(symbols_in(expression))
+        try:
+            return self.symbol_table.evaluate(expression, location_counter)
+        except ExpressionError as e:
+            errors.append((pi.line_number,
+                           f"{pi.mnemonic} value '{expression_to_str(expression)}' must be defined before use: {e}",
+                           self._source_of(pi)))
+            return None
+
+    def _define_symbols(self):
+        """
+        Etiketleri ve EQU tanımlarını sembol tablosuna bir kez kaydeder (yeniden tanım kontrolü dahil).
+        Etiketlerin adresleri _assign_addresses() tarafından her yerleşimde yeniden atanır.
+        """
+        self._label_owners = {}
+        for name, value in self.defines.items():
+            self.symbol_table.add_symbol(name, value)
+        for pi in self.parsed_instructions:
+            if pi.error or not pi.label:
+                continue
+            label = pi.label
+            if pi.is_directive and pi.mnemonic == 'EQU':
+                # EQU LC'yi etkilemez, sadece sembol tablosuna değer atar.
+                # Değer sabitse hemen eklenir; ifade ise (ileri başvurular dahil) bağımlılık
+                # grafiğine kaydedilir ve yerleşim sonunda topolojik sırayla tek geçişte çözülür.
+                if not pi.operands:
+                    self._add_error(pi.line_number, "EQU directive requires a label and a value.", self._source_of(pi))
+                elif self.symbol_table.has_symbol(label):
+                    self._add_error(pi.line_number, f"Label '{label}' (for EQU) redefined.", self._source_of(pi))
+                elif isinstance(pi.operands[0], int):
+                    self.symbol_table.add_symbol(label, pi.operands[0])
+                else:
+                    # '*' için LC, yerleşim sırasında güncellenir (bkz. _assign_addresses)
+                    self.symbol_table.add_expression(label, pi.operands[0], 0, pi.line_number)
+            elif self.symbol_table.has_symbol(label):
+                self._add_error(pi.line_number, f"Label '{label}' redefined.", self._source_of(pi))
+            else:
+                self.symbol_table.add_symbol(label, 0) # Gerçek adres yerleşimde atanır
+                self._label_owners[label] = pi
+
+    def _assign_addresses(self):
+        """
+        Tüm parsed instruction'lara adres atar, etiket değerlerini günceller ve
+        EQU ifadelerini çözer. Boyutlar değiştikçe (relaxation) tekrar çağrılabilir.
+        Döndürülen değer: [(satır_no, mesaj, orijinal_satır), ...] yerleşim hataları
+        """
+        errors = []
+        # Önceki yerleşimden kalan etiket değerlerini unut; ORG/RMB sadece önceden tanımlı
+        # sembolleri görebilmeli.
+        for label in self._label_owners:
+            self.symbol_table.remove_symbol(label)
+
+        current_lc_for_instruction = 0 # LC, ilk ORG ile set edilir
+        self.program_origin = None
+        for pi in self.parsed_instructions:
             pi.address = current_lc_for_instruction # Her parsed instruction'a o anki LC'yi ekleyelim
-            self.parsed_instructions.append(pi) # Hatalı olsa bile listeye ekle, Pass2'de atlanabilir
-
             if pi.error:
-                self._add_error(pi.token.line_number, pi.error, pi.token.original_line)
-                # Hatalı komutlar için LC ilerletme konusunda dikkatli olmalı, şimdilik atlayalım
-                # veya varsayılan bir uzunluk ekleyebiliriz.
-                # Şimdilik hatalı komutun LC'yi etkilemediğini varsayalım.
-                continue # Hata varsa LC ilerletme ve sembol ekleme yapma
-
-            # 1. Etiket Varsa Sembol Tablosuna Ekle
-            if pi.token.label:
-                if self.symbol_table.has_symbol(pi.token.label):
-                    self._add_error(pi.token.line_number, f"Label '{pi.token.label}' redefined.", pi.token.original_line)
-                else:
-                    self.symbol_table.add_symbol(pi.token.label, current_lc_for_instruction)
+                # Hatalı komutların LC'yi etkilemediğini varsayıyoruz.
+                continue
 
-            # 2. LC'yi Güncelle
-            if pi.is_directive:
-                directive_name = pi.mnemonic.upper()
-                pseudo_op_info = get_pseudo_op_info(directive_name) # opcode_table'dan al
+            if pi.label and self._label_owners.get(pi.label) is pi:
+                self.symbol_table.add_symbol(pi.label, current_lc_for_instruction)
 
+            if pi.is_directive:
+                directive_name = pi.mnemonic
                 if directive_name == 'ORG':
-                    if pi.operands:
-                        # Operandın sayısal bir değer veya çözümlenebilir bir etiket olması lazım.
-                        # Şimdilik sadece sayısal değeri destekleyelim. Etiket çözümü Pass2'de.
-                        try:
-                            new_origin = int(str(pi.operands[0]), 0) # Hex ($) veya decimal olabilir
-                            self.location_counter = new_origin
-                            self.program_origin = new_origin
+                    # ORG değeri bu noktada hesaplanabilir olmalı (önceden tanımlı semboller/EQU'lar).
+                    new_origin = self._evaluate_now(pi, pi.operands[0], current_lc_for_instruction, errors)
+                    if new_origin is not None:
+                        if not (0 <= new_origin <= 0xFFFF):
+                            errors.append((pi.line_number, f"ORG address out of range: {new_origin}", self._source_of(pi)))
+                        else:
+                            if self.program_origin is None:
+                                self.program_origin = new_origin
                             current_lc_for_instruction = new_origin # ORG sonrası LC'yi güncelle
-                        except ValueError:
-                            self._add_error(pi.token.line_number, f"Invalid ORG value: {pi.operands[0]}", pi.token.original_line)
-                    else:
-                        self._add_error(pi.token.line_number, "ORG directive requires an address.", pi.token.original_line)
                 elif directive_name == 'EQU':
-                    # EQU LC'yi etkilemez, sadece sembol tablosuna değer atar.
-                    # Etiket (pi.token.label) ve değer (pi.operands[0]) olmalı.
-                    if pi.token.label and pi.operands:
-                        try:
-                            # EQU değeri sayı veya başka bir etiket olabilir.
-                            # Şimdilik sadece sayısal değerleri destekleyelim.
-                            equ_value_str = str(pi.operands[0])
-                            equ_value = 0
-                            if equ_value_str.startswith('$'):
-                                equ_value = int(equ_value_str[1:], 16)
-                            elif equ_value_str.startswith('%'):
-                                equ_value = int(equ_value_str[1:], 2)
-                            else: # Decimal veya etiket olabilir. Şimdilik decimal.
-                                equ_value = int(equ_value_str)
-
-                            # Sembol tablosuna normal adres gibi değil, sabit değer olarak ekleyebiliriz.
-                            # Ya da SymbolTable sınıfını buna göre modifiye edebiliriz.
-                            # Şimdilik normal adres gibi ekliyoruz.
-                            if self.symbol_table.has_symbol(pi.token.label):
-                                self._add_error(pi.token.line_number, f"Label '{pi.token.label}' (for EQU) redefined.", pi.token.original_line)
-                            else:
-                                self.symbol_table.add_symbol(pi.token.label, equ_value)
-                        except ValueError:
-                            self._add_error(pi.token.line_number, f"Invalid EQU value: {pi.operands[0]}", pi.token.original_line)
-                    else:
-                         self._add_error(pi.token.line_number, "EQU directive requires a label and a value.", pi.token.original_line)
-
+                    if pi.label and pi.operands and not isinstance(pi.operands[0], int):
+                        self.symbol_table.add_expression(pi.label, pi.operands[0],
+                                                         current_lc_for_instruction, pi.line_number)
                 elif directive_name == 'FCB': # Form Constant Byte(s)
-                    # Operandlar byte değerleri listesi olmalı
-                    current_lc_for_instruction += len(pi.operands) # Her operand bir byte
+                    size = len(pi.operands) # Her operand bir byte
+                    current_lc_for_instruction += self._checked_size(pi, current_lc_for_instruction, size, errors)
                 elif directive_name == 'FDB': # Form Double Byte(s) / WORD
-                    current_lc_for_instruction += len(pi.operands) * 2 # Her operand iki byte
+                    size = len(pi.operands) * 2 # Her operand iki byte
+                    current_lc_for_instruction += self._checked_size(pi, current_lc_for_instruction, size, errors)
+                elif directive_name == 'FCC': # Form Constant Characters: string'ler + tek byte değerler
+                    size = sum(len(op) if isinstance(op, bytes) else 1 for op in pi.operands)
+                    current_lc_for_instruction += self._checked_size(pi, current_lc_for_instruction, size, errors)
+                elif directive_name == 'FILL':
+                    count = self._evaluate_now(pi, pi.operands[1], current_lc_for_instruction, errors)
+                    if count is not None:
+                        if count < 0:
+                            errors.append((pi.line_number, f"Invalid FILL count: {count}", self._source_of(pi)))
+                        else:
+                            current_lc_for_instruction += self._checked_size(pi, current_lc_for_instruction, count, errors)
+                elif directive_name == 'INCBIN':
+                    size = self._include_length(pi, current_lc_for_instruction, errors)
+                    current_lc_for_instruction += self._checked_size(pi, current_lc_for_instruction, size, errors)
                 elif directive_name == 'RMB': # Reserve Memory Bytes
-                    if pi.operands:
-                        try:
-                            num_bytes = int(str(pi.operands[0]), 0)
-                            current_lc_for_instruction += num_bytes
-                        except ValueError:
-                            self._add_error(pi.token.line_number, f"Invalid RMB value: {pi.operands[0]}", pi.token.original_line)
-                    else:
-                        self._add_error(pi.token.line_number, "RMB directive requires a count.", pi.token.original_line)
-                elif directive_name == 'END':
-                    # Program sonu, LC'yi etkilemez ama Pass1'i bitirebilir.
-                    break # END sonrası satırları işlemeyi durdur
-                # Diğer direktifler (varsa) LC'yi etkilemeyebilir.
+                    num_bytes = self._evaluate_now(pi, pi.operands[0], current_lc_for_instruction, errors)
+                    if num_bytes is not None:
+                        if num_bytes < 0:
+                            errors.append((pi.line_number, f"Invalid RMB value: {num_bytes}", self._source_of(pi)))
+                        else:
+                            current_lc_for_instruction += self._checked_size(pi, current_lc_for_instruction, num_bytes, errors)
+                # END ve diğer direktifler LC'yi etkilemez.
 
             elif pi.mnemonic and pi.op_info: # M6800 komutu
                 # op_info, syntax_analyzer tarafından belirlenen moda özgü bilgiyi içerir.
-                # (opcode, bytes, ...)
-                instruction_length = pi.op_info.get('bytes', 0) # Varsayılan 0 eğer byte bilgisi yoksa
+                instruction_length = self._instruction_size(pi)
                 if instruction_length == 0:
-                    # Bu bir hata olabilir, opcode_table'da byte bilgisi eksik.
-                    self._add_error(pi.token.line_number, f"Byte length not found for instruction '{pi.mnemonic}' in mode '{pi.addressing_mode}'.", pi.token.original_line)
-                current_lc_for_instruction += instruction_length
-            # LC'yi bir sonraki komutun adresi olacak şekilde güncelle
-            self.location_counter = current_lc_for_instruction
+                    errors.append((pi.line_number, f"Byte length not found for instruction '{pi.mnemonic}' in mode '{pi.addressing_mode}'.", self._source_of(pi)))
+                current_lc_for_instruction += self._checked_size(pi, current_lc_for_instruction, instruction_length, errors)
+
+        self.location_counter = current_lc_for_instruction
+        if self.program_origin is None:
+            self.program_origin = 0
+
+        # İfadeyle tanımlanan sembolleri (EQU) bağımlılık sırasıyla çöz
+        for name, line_number, message in self.symbol_table.resolve_expressions():
+            errors.append((line_number, message, name))
+        return errors
+
+    def _checked_size(self, pi, address, size, errors):
+        """
+        LC'yi ilerleten her komut/direktifin boyutu; address + size 64 KiB adres alanını
+        aşıyorsa Pass 1 hatası eklenir ve 0 döner (segment $FFFF'ten sonraya taşmasın).
+        """
+        if address + size > 0x10000:
+            errors.append((pi.line_number, f"{pi.mnemonic} of {size} byte(s) at ${address:04X} "
+                                           f"exceeds the 64 KiB address space.", self._source_of(pi)))
+            return 0
+        return size
+
+    def _open_include(self, pi):
+        """
+        INCBIN yolunu çözer ve dosya boyutunu kaydeder; pi.operands[0] çözülmüş yolla değiştirilir.
+        Dosyanın içeriği Pass 2'ye kadar okunmaz (bkz. CodeGenerator._read_include).
+        """
+        path = os.path.join(self._include_dir or "", pi.operands[0])
+        try:
+            size = os.stat(path).st_size
+        except OSError as e:
+            pi.error = f"Cannot include '{pi.operands[0]}': {e.strerror}"
+            return
+        self._includes[path] = size
+        pi.operands = (path,) + pi.operands[1:]
+
+    def _include_length(self, pi, location_counter, errors):
+        """INCBIN'in yerleşimdeki byte uzunluğu; offset/uzunluk hatalıysa 0."""
+        values = [self._evaluate_now(pi, op, location_counter, errors) for op in pi.operands[1:]]
+        if None in values:
+            return 0
+        values += [None] * (2 - len(values))
+        try:
+            return include_range(self._includes[pi.operands[0]], *values)[1]
+        except ValueError as e:
+            errors.append((pi.line_number, str(e), self._source_of(pi)))
+            return 0
+
+    @staticmethod
+    def _instruction_size(pi):
+        """Komutun yerleşimdeki byte uzunluğu (uzun branch'e çevrilmişse genişletilmiş hali)."""
+        if pi.relaxation == 'long_branch':
+            # BRA -> JMP, BSR -> JSR (3 byte); Bcc -> B!cc *+5 ; JMP hedef (2 + 3 byte)
+            return 3 if pi.mnemonic in ('BRA', 'BSR') else 5
+        return pi.op_info.get('bytes', 0)
+
+    def _try_direct(self, pi, allow_shrink):
+        """Extended/Direct seçimini operandın güncel değerine göre yapar. Değişiklik olduysa True."""
+        modes = get_instruction_info(pi.mnemonic)
+        if MODE_DIRECT not in modes or MODE_EXTENDED not in modes:
+            return False
+        try:
+            value = self.symbol_table.evaluate(pi.operands[0], pi.address)
+        except ExpressionError:
+            value = None # Tanımsız sembol; hata Pass 2'de raporlanır
+        fits_direct = value is not None and 0 <= value <= 0xFF
+        if fits_direct and pi.addressing_mode == MODE_EXTENDED and allow_shrink:
+            pi.addressing_mode = MODE_DIRECT
+            pi.op_info = modes[MODE_DIRECT]
+            pi.relaxation = 'direct'
+            return True
+        if not fits_direct and pi.relaxation == 'direct':
+            pi.addressing_mode = MODE_EXTENDED
+            pi.op_info = modes[MODE_EXTENDED]
+            pi.relaxation = None
+            return True
+        return False
+
+    def _try_long_branch(self, pi):
+        """Menzil dışına çıkan relative branch'i uzun branch olarak işaretler. Değişiklik olduysa True."""
+        if pi.relaxation == 'long_branch':
+            return False # Uzun branch'ler bir daha kısaltılmaz (yakınsama için tek yönlü)
+        try:
+            target = self.symbol_table.evaluate(pi.operands[0], pi.address)
+        except ExpressionError:
+            return False
+        offset = (target & 0xFFFF) - (pi.address + 2)
+        if -128 <= offset <= 127:
+            return False
+        pi.relaxation = 'long_branch'
+        return True
 
+    def _relax(self):
+        """
+        Boyut optimizasyonlarını (Extended -> Direct, menzil dışı branch -> uzun branch)
+        uygular ve adresleri boyutlar sabitlenene kadar yeniden atar.
+        İlk turlarda Direct'e küçülmeye izin verilir; sonra sadece büyüme olur. Her komut
+        en fazla bir kez büyüyebildiği için döngü her zaman sonlanır.
+        Döndürülen değer: son yerleşimin hataları
+        """
+        shrink_rounds = 8
+        errors = self._assign_addresses()
+        iteration = 0
+        while True:
+            allow_shrink = iteration < shrink_rounds
+            changed = False
+            for pi in self.parsed_instructions:
+                if pi.error or pi.is_directive or not pi.operands:
+                    continue
+                mode = pi.addressing_mode
+                if self.optimize_addressing and (mode == MODE_EXTENDED or mode == MODE_DIRECT):
+                    changed |= self._try_direct(pi, allow_shrink)
+                elif self.relax_branches and mode == MODE_RELATIVE:
+                    changed |= self._try_long_branch(pi)
+            if not changed:
+                break
+            errors = self._assign_addresses()
+            iteration += 1
+        return errors
+
+    def _note_early_symbol(self, pi):
+        """Etiketi IFDEF için, sabit değerli EQU'yu IF ifadeleri için kaydeder."""
+        value = None
+        if pi.is_directive and pi.mnemonic == 'EQU' and pi.operands:
+            try:
+                # _early_value, değeri henüz bilinmeyen (None) etiketler için de UndefinedSymbolError verir
+                value = evaluate(pi.operands[0], self._early_value)
+            except ExpressionError:
+                value = None # Etiketlere veya ileri başvurulara bağlı: IF içinde kullanılamaz
+        self._early_symbols.setdefault(pi.label, value)
+
+    def _evaluate_condition(self, expression):
+        return evaluate(expression, self._early_value)
+
+    def _early_value(self, name):
+        value = self._early_symbols.get(name)
+        if value is None:
+            raise UndefinedSymbolError(name)
+        return value
+
+    def _is_defined_early(self, name):
+        return name in self._early_symbols
+
+    def _layout(self):
+        if self.optimize_addressing or self.relax_branches:
+            return self._relax()
+        return self._assign_addresses()
+
+    def _run_peephole(self):
+        """
+        Peephole kurallarını, yeni bir değişiklik çıkmayana kadar uygular. Her turdan sonra
+        yerleşim yenilenir; kaldırılan byte'lar yeni fırsatlar (örn. sonraki komuta JMP) açabilir.
+        Döndürülen değer: son yerleşimin hataları
+        """
+        optimizer = PeepholeOptimizer(self.symbol_table, set(self._label_owners), self._instruction_size)
+        errors = []
+        while True:
+            rewrites = optimizer.optimize(self.parsed_instructions)
+            if not rewrites:
+                return errors
+            self.peephole_report.extend(rewrites)
+            errors = self._layout()
+            if errors:
+                return errors
+
+    def assemble_pass1(self, source):
+        """
+        Assembler'ın birinci geçişi.
+        - Kaynak kodu (string veya satır iterable'ı, örn. açık dosya) satır satır
+          token'lara ve parsed instruction'lara çevirir; ara listeler oluşturulmaz.
+        - Sembol tablosunu (etiketler ve adresleri) oluşturur.
+        - Her komutun uzunluğunu hesaplar (LC'yi yönetir), gerekirse adresleme modlarını küçültür.
+        """
+        self.parsed_instructions = [] # Her assemble çağrısında temizle
+
+        lines = io.StringIO(source) if isinstance(source, str) else source
+        keep_listing = self.keep_listing
+        # Koşullu derleme: yanlış bloklardaki satırlar lexer'a hiç ulaşmaz. Koşullar, satır
+        # okunduğu anda o ana kadar bu döngüde görülen sabitlerle değerlendirilir.
+        self._early_symbols = dict(self.defines)
+        conditions = ConditionalAssembly(self.lexer, self._evaluate_condition, self._is_defined_early)
+        tokens = self.lexer.iter_numbered_tokens(conditions.filter(lines))
+        for pi in self.syntax_analyzer.iter_parse(tokens):
+            if pi.mnemonic == 'INCBIN' and pi.is_directive and not pi.error:
+                self._open_include(pi)
+            if pi.error:
+                self._add_error(pi.line_number, pi.error, pi.source_line)
+            elif pi.label:
+                self._note_early_symbol(pi)
+            if not keep_listing:
+                # Listing yoksa sadece yorum satırlarının Pass 2'ye bir katkısı yoktur
+                if not pi.error and pi.mnemonic is None and pi.label is None:
+                    continue
+                pi.source_line = None
+            self.parsed_instructions.append(pi) # Hatalı olsa bile listeye ekle, Pass2'de atlanabilir
+            if not pi.error and pi.is_directive and pi.mnemonic == 'END':
+                break # END sonrası satırları işlemeyi durdur
+        conditions.check_closed()
+        for line_number, message, original_line in conditions.errors:
+            self._add_error(line_number, message, original_line)
+        self._conditional_results = conditions.results
+        self._early_symbols = {}
+
+        self._define_symbols()
+        layout_errors = self._layout()
+        if self.peephole and not self.errors and not layout_errors:
+            layout_errors = self._run_peephole()
+        for line_number, message, original_line in layout_errors:
+            self._add_error(line_number, message, original_line)
+        if not self.errors:
+            self._analyze_timing()
 
         # Pass 1 sonunda, eğer hatalar varsa, bunları döndür veya sakla
         return not self.errors # Başarılıysa True, değilse False
 
+    def _analyze_timing(self):
+        """
+        Listing tutuluyorsa veya kaynakta CYCLES direktifi varsa statik zamanlama analizini yapar
+        ve CYCLES bütçelerini kontrol eder; bütçeyi aşan rutinler derleme hatasıdır.
+        Blok toplamları (cycle sütunu) her zaman hesaplanır; etiketli rutinlerin toplamları sadece
+        routine_timing açıkken (listing için) ve CYCLES ile adı verilen rutinler için.
+        """
+        assertions = [pi for pi in self.parsed_instructions
+                      if pi.is_directive and pi.mnemonic == 'CYCLES' and not pi.error]
+        if not self.keep_listing and not assertions:
+            return
+        analyzer = TimingAnalyzer(self.symbol_table, self._instruction_size)
+        routine_labels = None if self.keep_listing and self.routine_timing else ()
+        self.timing = analyzer.analyze(self.parsed_instructions, routine_labels)
+        for pi in assertions:
+            routine, budget = pi.operands
+            name = expression_to_str(routine)
+            try:
+                address = self.symbol_table.evaluate(routine, pi.address)
+                budget = self.symbol_table.evaluate(budget, pi.address)
+            except ExpressionError as e:
+                self._add_error(pi.line_number, f"CYCLES operand cannot be evaluated: {e}", self._source_of(pi))
+                continue
+            if not analyzer.has_code(address):
+                self._add_error(pi.line_number, f"Routine '{name}' has no code at routine address ${address & 0xFFFF:04X}.",
+                                self._source_of(pi))
+                continue
+            best, worst = analyzer.routine_cycles(address)
+            self.timing.routines.setdefault(name, (best, worst))
+            if worst is None:
+                self._add_error(pi.line_number, f"Routine '{name}' has no static cycle bound "
+                                                f"(unrecognized loop, recursion, indexed jump or too deeply nested calls).", self._source_of(pi))
+            elif worst > budget:
+                self._add_error(pi.line_number, f"Routine '{name}' worst case {worst} cycles exceeds budget of {budget}.",
+                                self._source_of(pi))
+
+    def _cycles_column(self, pi):
+        """Listing'in cycle sütunu; temel bloğun son komutunda blok toplamı da gösterilir."""
+        text = format_cycles(*instruction_cycles(pi))
+        block_total = self.timing.block_total_after(pi) if self.timing else None
+        return text if block_total is None else f"{text} Σ{block_total}"
+
+    def _relaxation_summary(self):
+        """Direct adreslemeye çevrilen komut sayısını ve kazanılan byte/cycle toplamını döndürür."""
+        count = bytes_saved = cycles_saved = 0
+        for pi in self.parsed_instructions:
+            if pi.relaxation == 'direct' and not pi.error:
+                ext_info = get_instruction_info(pi.mnemonic)[MODE_EXTENDED]
+                count += 1
+                bytes_saved += ext_info['bytes'] - pi.op_info['bytes']
+                cycles_saved += self._cycles_saved(ext_info, pi.op_info)
+        return count, bytes_saved, cycles_saved
+
+    @staticmethod
+    def _cycles_saved(ext_info, direct_info):
+        # M6800'de direct adresleme extended'a göre her zaman 1 cycle daha hızlıdır;
+        # tabloda cycle bilgisi varsa onu kullan.
+        if 'cycles' in ext_info and 'cycles' in direct_info:
+            return ext_info['cycles'] - direct_info['cycles']
+        return 1
+
+    def _listing_value(self, pi):
+        """Listing yorumları için direktifin ilk operandının sayısal değeri (çözülemezse 0)."""
+        if pi.mnemonic == 'EQU':
+            return self.symbol_table.get_address(pi.label) or 0
+        return self._listing_value_of(pi, 0)
+
+    def _listing_value_of(self, pi, index):
+        try:
+            return self.symbol_table.evaluate(pi.operands[index], pi.address)
+        except ExpressionError:
+            return 0
+
+    def _emit(self, address, data):
+        """Üretilen byte'ları, bir önceki segmentin devamıysa ona ekler; değilse yeni segment açar."""
+        if self.segments:
+            segment_address, segment_data = self.segments[-1]
+            if segment_address + len(segment_data) == address:
+                segment_data.extend(data)
+                return
+        self.segments.append((address, bytearray(data)))
 
     def assemble_pass2(self):
         """
@@ -159,8 +528,10 @@ class Assembler:
         # Şimdilik genel self.errors'a eklemeye devam edelim.
         # pass2_errors = []
 
-        self.object_code = []
+        self.segments = []
         self.listing = []
+        self.source_map = SourceMap([self._source_path or "<source>"])
+        self.entry_point = None
         # current_address_in_object_code = self.program_origin # Bu, listing için LC'yi takip etmeli
 
         for pi in self.parsed_instructions:
@@ -169,15 +540,19 @@ class Assembler:
 
             if pi.error: # Syntax analizinden gelen hata
                 # Bu hatayı CodeGenerator üretmese bile listing'e ekleyelim
-                self.listing.append((f"{current_lc_for_listing:04X}", "ERROR", pi.token.original_line, pi.error))
+                self._add_listing_row((f"{current_lc_for_listing:04X}", "ERROR", pi.source_line, pi.error))
                 # self.errors'a zaten Pass1'de eklenmiş olabilir, tekrar eklemeyebiliriz.
                 continue
 
+            if pi.mnemonic is None: # Sadece yorum ve/veya etiket içeren (veya peephole ile kaldırılmış) satır
+                self._add_listing_row((f"{current_lc_for_listing:04X}", "      ", pi.source_line, pi.note or ""))
+                continue
+
             generated_bytes, codegen_error_msg = self.code_generator.generate_code_for_instruction(pi)
 
             if codegen_error_msg:
-                self._add_error(pi.token.line_number, codegen_error_msg, pi.token.original_line)
-                self.listing.append((f"{current_lc_for_listing:04X}", "CG_ERR", pi.token.original_line, codegen_error_msg))
+                self._add_error(pi.line_number, codegen_error_msg, self._source_of(pi))
+                self._add_listing_row((f"{current_lc_for_listing:04X}", "CG_ERR", pi.source_line, codegen_error_msg))
                 # Hata varsa, bu komut için nesne kodu eklenmemeli
                 continue # Bir sonraki komuta geç
 
@@ -186,68 +561,223 @@ class Assembler:
                 directive_name = pi.mnemonic.upper()
                 directive_comment = ""
                 if directive_name == 'ORG':
-                    directive_comment = f"; ORG to ${pi.operands[0]:04X}" if pi.operands else "; ORG"
+                    directive_comment = f"; ORG to ${self._listing_value(pi):04X}" if pi.operands else "; ORG"
                     # ORG nesne kodu üretmez, ama sonraki adresleri etkiler
                     # self.program_origin = pi.operands[0] # Bu Pass1'de yapıldı, burada tekrar gerek yok
                 elif directive_name == 'EQU':
-                    directive_comment = f"; {pi.token.label} EQU {pi.operands[0]}" # Değer hex/dec olabilir
+                    directive_comment = f"; {pi.label} EQU ${self._listing_value(pi):04X}"
                 elif directive_name == 'RMB':
-                    directive_comment = f"; RMB {pi.operands[0]} byte(s)"
+                    directive_comment = f"; RMB {self._listing_value(pi)} byte(s)"
+                elif directive_name in BULK_DATA_DIRECTIVES:
+                    directive_comment = f"; {directive_name} {len(generated_bytes)} byte(s)"
                 elif directive_name == 'END':
                     directive_comment = "; END of program"
+                elif directive_name in ('IF', 'IFDEF', 'IFNDEF'):
+                    result = self._conditional_results.get(pi.line_number)
+                    directive_comment = f"; {directive_name} {'true' if result else 'false'}" if result is not None else ""
+                elif directive_name == 'CYCLES':
+                    name = expression_to_str(pi.operands[0])
+                    worst = self.timing.routines.get(name, (0, None))[1] if self.timing else None
+                    directive_comment = f"; {name}: worst {worst} cycle(s), budget {self._listing_value_of(pi, 1)}"
 
                 if generated_bytes: # FCB, FDB gibi byte üreten direktifler
-                    hex_code_str = " ".join([f"{b:02X}" for b in generated_bytes])
-                    self.listing.append((f"{current_lc_for_listing:04X}", hex_code_str, pi.token.original_line, directive_comment))
-                    self.object_code.extend(generated_bytes)
+                    if directive_name in BULK_DATA_DIRECTIVES and len(generated_bytes) > LISTING_HEX_LIMIT:
+                        # Büyük veri bloklarının tamamı listing'e yazılmaz
+                        hex_code_str = " ".join([f"{b:02X}" for b in generated_bytes[:LISTING_HEX_LIMIT]]) + " ..."
+                    else:
+                        hex_code_str = " ".join([f"{b:02X}" for b in generated_bytes])
+                    self._add_listing_row((f"{current_lc_for_listing:04X}", hex_code_str, pi.source_line, directive_comment))
+                    self._emit(current_lc_for_listing, generated_bytes)
+                    self.source_map.add(current_lc_for_listing, len(generated_bytes), pi.line_number)
                 else: # Byte üretmeyen direktifler (ORG, EQU, RMB, END)
-                    self.listing.append((f"{current_lc_for_listing:04X}", "      ", pi.token.original_line, directive_comment))
+                    self._add_listing_row((f"{current_lc_for_listing:04X}", "      ", pi.source_line, directive_comment))
 
                 if directive_name == 'END':
+                    if pi.operands: # END <başlangıç_adresi>
+                        self.entry_point = self._listing_value(pi)
                     break # Program sonu
                 continue # Bir sonraki talimata geç
 
             # M6800 Komutları için listeleme
             if generated_bytes:
-                self.object_code.extend(generated_bytes)
+                self._emit(current_lc_for_listing, generated_bytes)
+                self.source_map.add(current_lc_for_listing, len(generated_bytes), pi.line_number)
                 hex_code_str = " ".join([f"{b:02X}" for b in generated_bytes])
-                self.listing.append((f"{current_lc_for_listing:04X}", hex_code_str, pi.token.original_line, ""))
+                relax_comment = pi.note or ""
+                if pi.relaxation == 'long_branch':
+                    relax_comment = f"; long branch ({len(generated_bytes)} bytes)"
+                elif pi.relaxation == 'direct':
+                    ext_info = get_instruction_info(pi.mnemonic)[MODE_EXTENDED]
+                    relax_comment = (f"; EXT->DIR (-{ext_info['bytes'] - pi.op_info['bytes']} byte, "
+                                     f"-{self._cycles_saved(ext_info, pi.op_info)} cycle)")
+                self._add_listing_row((f"{current_lc_for_listing:04X}", hex_code_str, pi.source_line, relax_comment),
+                                      self._cycles_column(pi))
             elif not pi.error: # Kod üretmeyen ama hata da olmayan (örn. sadece etiket)
-                 self.listing.append((f"{current_lc_for_listing:04X}", "      ", pi.token.original_line, "; No object code"))
-
+                 self._add_listing_row((f"{current_lc_for_listing:04X}", "      ", pi.source_line, "; No object code"))
+
+
+        self.source_map.finalize()
+
+        # END ile başlangıç adresi verilmediyse ilk kod segmentinden başla
+        if self.entry_point is None:
+            self.entry_point = self.segments[0][0] if self.segments else self.program_origin
+
+        # Adresleme optimizasyonunun özeti
+        relaxed_count, bytes_saved, cycles_saved = self._relaxation_summary()
+        if relaxed_count:
+            self._add_listing_row(("----", "", "", f"; Direct addressing: {relaxed_count} instruction(s), "
+                                                 f"{bytes_saved} byte(s) and {cycles_saved} cycle(s) saved"))
+        long_branch_count = sum(1 for pi in self.parsed_instructions if pi.relaxation == 'long_branch')
+        if long_branch_count:
+            self._add_listing_row(("----", "", "", f"; Long branches: {long_branch_count} out-of-range branch(es) relaxed"))
+        if self.peephole_report:
+            self._add_listing_row(("----", "", "", f"; Peephole: {len(self.peephole_report)} rewrite(s), "
+                                                 f"{sum(r[2] for r in self.peephole_report)} byte(s) and "
+                                                 f"{sum(r[3] for r in self.peephole_report)} cycle(s) saved"))
+        if self.timing:
+            for name, (best, worst) in self.timing.routines.items():
+                worst_text = "unbounded" if worst is None else worst
+                self._add_listing_row(("----", "", "", f"; Timing {name}: best {best}, worst {worst_text} cycle(s)"),
+                                      format_cycles(best or 0, worst))
 
         # CodeGenerator'dan gelen hataları ana hata listesine ekleyebiliriz
         # self.errors.extend(self.code_generator.errors) # Eğer CodeGenerator kendi listesini tutuyorsa
 
         return not any(err for err in self.errors if "Error" in err or "CodeGen Error" in err) # Kritik hata var mı kontrol et
 
-    def assemble(self, source_code_str):
+    def assemble(self, source_code_str, keep_listing=True, include_dir=None):
         """
         Tüm assembler sürecini yönetir.
+        include_dir: INCBIN'deki göreli yolların çözüleceği dizin (None ise çalışma dizini)
+        """
+        self._reset_state()
+        self.keep_listing = keep_listing
+        self._source_path = None
+        self._include_dir = include_dir
+        if self.cache is None:
+            return self._run_passes(source_code_str)
+        return self._run_cached(cache_key(source_code_str, self._cache_options()), source_code_str)
+
+    def assemble_file(self, path, keep_listing=False, encoding="utf-8"):
+        """
+        Kaynak dosyayı belleğe tamamen okumadan, satır satır akış halinde derler.
+        keep_listing=False iken kaynak satırları ve listing tutulmaz; bu, çok büyük
+        (üretilmiş) kaynaklarda bellek kullanımını büyük ölçüde azaltır.
+        """
+        self._reset_state()
+        self.keep_listing = keep_listing
+        self._source_path = path
+        self._include_dir = os.path.dirname(path)
+        linecache.checkcache(path)
+        key = file_key(path, self._cache_options() + (encoding,)) if self.cache is not None else None
+        if key is not None:
+            cached = self._load_cached(key)
+            if cached is not None:
+                return cached
+        with open(path, "r", encoding=encoding) as f:
+            result = self._run_passes(f)
+        if key is not None:
+            self.cache.store(key, self.result_state(result[0]))
+        return result
+
+    # --- Derleme önbelleği ---
+
+    def _cache_options(self):
+        """Çıktıyı etkileyen seçenekler (önbellek anahtarına girer)."""
+        return (self.optimize_addressing, self.relax_branches, self.peephole, self.keep_listing,
+                self.routine_timing, self._source_path, self._include_dir, tuple(sorted(self.defines.items())))
+
+    def _run_cached(self, key, source):
+        cached = self._load_cached(key)
+        if cached is not None:
+            return cached
+        result = self._run_passes(source)
+        self.cache.store(key, self.result_state(result[0]))
+        return result
+
+    def result_state(self, success):
+        """
+        Derleme çıktılarını marshal/pickle ile yazılabilecek yerleşik tiplere çevirir
+        (önbellek kaydı ve arka plan derleme sürecinin sonucu; bkz. background.py).
+        """
+        return {
+            'success': success,
+            'segments': [(address, bytes(data)) for address, data in self.segments],
+            'entry_point': self.entry_point,
+            'program_origin': self.program_origin,
+            'listing': self.listing,
+            'errors': self.errors,
+            'symbols': self.symbol_table.get_all_symbols(),
+            'source_map': self.source_map.to_state(),
+            'peephole_report': self.peephole_report,
+            'timing': (self.timing.blocks, self.timing.routines) if self.timing else None,
+            # INCBIN dosyaları kaynak okunmadan bilinemez; içerik özetleri kayıtla birlikte saklanır
+            'dependencies': [(path, file_digest(path)) for path in self._includes],
+        }
+
+    def _load_cached(self, key):
+        """Önbellekte kayıt varsa assembler durumunu ondan kurar ve sonucu döndürür; yoksa None."""
+        value = self.cache.load(key)
+        if value is None:
+            return None
+        if not dependencies_current(value.get('dependencies', ())):
+            return None # Dahil edilen bir dosya değişmiş: yeniden derle (kayıt üzerine yazılır)
+        result = self.restore_result_state(value)
+        if result is not None:
+            print("Assembly successful (cached)." if result[0] else "Assembly failed (cached).")
+        return result
+
+    def restore_result_state(self, value):
+        """
+        result_state() çıktısından assembler durumunu kurar. Döndürülen değer assemble() ile
+        aynıdır: (success, segments, listing, errors); kayıt beklenmedik biçimdeyse None.
+        Sonuçta parsed_instructions boştur (sadece çıktılar saklanır).
         """
         self._reset_state()
-        if not self.assemble_pass1(source_code_str):
+        try:
+            self.segments = [(address, bytearray(data)) for address, data in value['segments']]
+            self.entry_point = value['entry_point']
+            self.program_origin = value['program_origin']
+            self.listing = [tuple(row) for row in value['listing']]
+            self.errors = list(value['errors'])
+            for name, address in value['symbols'].items():
+                self.symbol_table.add_symbol(name, address)
+            self.source_map = SourceMap.from_state(value['source_map'])
+            self.peephole_report = [tuple(rewrite) for rewrite in value['peephole_report']]
+            if value['timing'] is not None:
+                self.timing = TimingReport()
+                self.timing.blocks = [tuple(block) for block in value['timing'][0]]
+                self.timing.routines = {name: tuple(cycles) for name, cycles in value['timing'][1].items()}
+            success = value['success']
+        except (KeyError, TypeError, ValueError):
+            self._reset_state() # Beklenmeyen biçimde kayıt: önbellekte yokmuş gibi derle
+            return None
+        return success, self.segments, self.listing, self.errors
+
+    def _run_passes(self, source):
+        if not self.assemble_pass1(source):
             print("Assembly failed in Pass 1.")
             # self.listing'e hataları ekleyebiliriz
             for error_msg in self.errors:
                 # Hata mesajından satır numarasını ayrıştırmak gerekebilir.
                 # Şimdilik genel bir hata olarak ekleyelim.
-                self.listing.append(("----", "ERROR", "", error_msg))
+                self._add_listing_row(("----", "ERROR", "", error_msg))
 
-            return False, self.object_code, self.listing, self.errors
+            return False, self.segments, self.listing, self.errors
 
         if not self.assemble_pass2():
             print("Assembly failed in Pass 2.")
             # Pass 2 hataları zaten self.errors ve self.listing'e eklenmiş olmalı
-            return False, self.object_code, self.listing, self.errors
+            return False, self.segments, self.listing, self.errors
 
         print("Assembly successful.")
-        return True, self.object_code, self.listing, self.errors
+        return True, self.segments, self.listing, self.errors
 
 # Test için örnek kullanım
 if __name__ == "__main__":
+    import textwrap # Örnekler girintili yazıldı; etiketler 1. sütuna gelsin
     assembler = Assembler()
-    sample_code = """
+    sample_code = textwrap.dedent("""
     STARTADR EQU $0100    ; Program başlangıç adresi
              ORG  STARTADR
     LOOP     LDAA #$05      ; A'ya 5 yükle
@@ -259,40 +789,41 @@ if __name__ == "__main__":
     DATA_VAL FCB  $FF
     RESULT   RMB  1
              END
-    """
+    """)
     # İkinci bir örnek, hatalı
-    sample_code_error = """
+    sample_code_error = textwrap.dedent("""
              ORG $C000
     MYLOOP   LDAA #$AA
              ADDB UNKNOWN_LABEL ; Tanımsız etiket
              BNE  MYLOOP
     ENDIT    EQU  MYLOOP ; Bu geçerli
              END
-    """
+    """)
 
     print("--- Assembling Sample Code 1 ---")
-    success, obj_code, listing_output, errors_output = assembler.assemble(sample_code)
+    success, segments, listing_output, errors_output = assembler.assemble(sample_code)
     if success:
-        print("Object Code:", ["0x{:02X}".format(b) for b in obj_code])
+        for seg_addr, seg_data in segments:
+            print(f"Segment ${seg_addr:04X}:", seg_data.hex(" ").upper())
         print("\nListing:")
-        for addr, code, src, err_cmt in listing_output:
-            print(f"{addr}\t{code:<10}\t{src:<30}\t{err_cmt}")
+        for addr, code, src, err_cmt, cycles in listing_output:
+            print(f"{addr}\t{code:<10}\t{cycles:<8}\t{src:<30}\t{err_cmt}")
     else:
         print("\nErrors:")
         for err in errors_output:
             print(err)
         print("\nPartial Listing with Errors:")
-        for addr, code, src, err_cmt in listing_output:
-            print(f"{addr}\t{code:<10}\t{src:<30}\t{err_cmt}")
+        for addr, code, src, err_cmt, cycles in listing_output:
+            print(f"{addr}\t{code:<10}\t{cycles:<8}\t{src:<30}\t{err_cmt}")
 
 
     print("\n\n--- Assembling Sample Code 2 (with errors) ---")
-    success2, obj_code2, listing_output2, errors_output2 = assembler.assemble(sample_code_error)
+    success2, segments2, listing_output2, errors_output2 = assembler.assemble(sample_code_error)
     if not success2:
-        print("Object Code (if any):", ["0x{:02X}".format(b) for b in obj_code2])
+        print("Segments (if any):", [(f"${a:04X}", d.hex(" ").upper()) for a, d in segments2])
         print("\nErrors:")
         for err in errors_output2:
             print(err)
         print("\nListing with Errors:")
-        for addr, code, src, err_cmt in listing_output2:
-            print(f"{addr}\t{code:<10}\t{src:<30}\t{err_cmt}") 
+        for addr, code, src, err_cmt, cycles in listing_output2:
+            print(f"{addr}\t{code:<10}\t{cycles:<8}\t{src:<30}\t{err_cmt}") 
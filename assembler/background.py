@@ -0,0 +1,104 @@
+# m6800_sdk/assembler/background.py
+
+# Arka planda (ayrı bir süreçte) derleme. Editör her yazma duraklamasında yeni bir derleme
+# ister; derleme UI sürecinin GIL'ini paylaşmadığı için büyük kaynaklarda bile tuş vuruşları
+# bloklanmaz. Değişmemiş bir kaynağa (örn. geri alma sonrası) dönüldüğünde sonuç önbellekten gelir:
+# yazarken yapılan derlemeler işçi sürecin bellek içi önbelleğini (MemoryAssemblyCache) kullanır,
+# her ara düzenleme için diske kalıcı kayıt yazılmaz. Disk önbelleği (AssemblyCache) sadece
+# çağıran cache_dir verdiğinde (örn. Assemble düğmesi) kullanılır.
+#
+# Her istek artan bir nesil numarası alır. Sadece en son istek takip edilir: henüz başlamamış
+# eski istekler iptal edilir, çalışmakta olanların sonucu ise geldiğinde atılır. Böylece
+# kullanıcı yazmaya devam ederken eski (stale) bir listing ekrana hiç gelmez.
+#
+# Sonuç, Assembler.result_state() sözlüğüdür (sadece yerleşik tipler); UI sürecinde
+# Assembler.restore_result_state() ile assembler nesnesine yüklenir.
+
+import contextlib
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+_session_cache = None # İşçi süreç boyunca yaşayan bellek içi önbellek
+
+def assemble_in_worker(source, options, include_dir=None, cache_dir=None):
+    """
+    İşçi süreçte çalışır: kaynağı derler ve result_state() döndürür.
+    cache_dir verilirse o dizindeki disk önbelleği, verilmezse sürecin bellek içi önbelleği kullanılır.
+    """
+    global _session_cache
+    from .assembler import Assembler
+    from .cache import AssemblyCache, MemoryAssemblyCache
+
+    if cache_dir is not None:
+        cache = AssemblyCache(cache_dir)
+    else:
+        if _session_cache is None:
+            _session_cache = MemoryAssemblyCache()
+        cache = _session_cache
+    assembler = Assembler(cache=cache, **options)
+    with contextlib.redirect_stdout(io.StringIO()): # Durum mesajları UI konsolunu doldurmasın
+        success = assembler.assemble(source, include_dir=include_dir)[0]
+    return assembler.result_state(success)
+
+class BackgroundAssembler:
+    def __init__(self):
+        self._executor = None
+        self._generation = 0
+        self._latest = None # (nesil, future): sadece en son istek
+
+    def submit(self, source, options, include_dir=None, cache_dir=None):
+        """
+        options: Assembler kurucusunun anahtar kelime argümanları (cache hariç).
+        cache_dir: sonucun kalıcı olarak yazılacağı disk önbelleği dizini; None ise sadece
+        işçi sürecin bellek içi önbelleği kullanılır.
+        Döndürülen değer: isteğin nesil numarası.
+        """
+        if self._latest is not None:
+            self._latest[1].cancel() # Henüz başlamadıysa hiç çalışmaz; çalışıyorsa sonucu atılacak
+        self._generation += 1
+        future = self._get_executor().submit(assemble_in_worker, source, options, include_dir, cache_dir)
+        self._latest = (self._generation, future)
+        return self._generation
+
+    def busy(self):
+        return self._latest is not None
+
+    def poll(self):
+        """
+        En son istek tamamlandıysa (nesil, result_state) döndürür, değilse None.
+        İşçi süreç çöktüyse veya başlatılamadıysa future'ın hatası fırlatılır.
+        """
+        if self._latest is None or not self._latest[1].done():
+            return None
+        generation, future = self._latest
+        self._latest = None
+        return generation, future.result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # 'spawn': Tk ve thread'ler içeren bir süreci fork etmek güvenli değil
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    import time
+
+    background = BackgroundAssembler()
+    options = {'optimize_addressing': True, 'relax_branches': False, 'peephole': False, 'defines': {}}
+    # Art arda üç düzenleme: sadece sonuncusunun sonucu alınır
+    for value in (1, 2, 3):
+        generation = background.submit(f"        ORG $0100\n        LDAA #{value}\n        END\n", options)
+    start = time.perf_counter()
+    while (result := background.poll()) is None:
+        time.sleep(0.05)
+    generation, state = result
+    print(f"generation {generation} after {time.perf_counter() - start:.2f} s: success={state['success']}, "
+          f"segments={[(hex(a), d.hex()) for a, d in state['segments']]}")
+    background.close()
@@ -0,0 +1,251 @@
+# m6800_sdk/assembler/cache.py
+
+# İçerik adresli derleme önbelleği. Anahtar; kaynak metnin, dahil edilen dosyaların,
+# assembler sürümünün ve derleme seçeneklerinin SHA-256 özetidir. Değer; nesne imajı
+# (segmentler), listing, hata listesi, sembol tablosu, source map ve zamanlama özetidir.
+#
+# INCBIN ile dahil edilen dosyalar kaynak ayrıştırılmadan bilinemediği için anahtara değil
+# kayda girer: kayıt, her bağımlılığın yolunu ve içerik özetini taşır; yüklenirken özetler
+# tutmuyorsa (bkz. dependencies_current) kayıt kullanılmaz.
+#
+# Değerler marshal ile yazılır: sadece yerleşik tipler (bytes, tuple, dict, int, str)
+# içerdiği için pickle'dan daha kompakt ve hızlı yüklenir, kod çalıştırmaz. marshal formatı
+# Python sürümüne bağlı olduğundan format sürümü de anahtara katılır.
+#
+# Dizin düzeni: <önbellek_dizini>/<anahtarın ilk 2 hanesi>/<anahtar>.bin
+# Bozuk veya okunamayan bir kayıt sessizce "önbellekte yok" sayılır.
+#
+# Önbellek boyutu sınırlıdır (max_bytes, varsayılan DEFAULT_MAX_BYTES): her yazmadan sonra
+# toplam boyut aşılmışsa en uzun süredir kullanılmayan kayıtlar silinir (LRU). Kullanım
+# zamanı dosyanın mtime'ıdır; önbellekten okunan kayıtların mtime'ı yenilenir. Yarım kalmış
+# yazmalardan artan .tmp dosyaları da temizlenir.
+
+import contextlib
+import hashlib
+import marshal
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from . import __version__
+
+CACHE_FORMAT = 2
+DEFAULT_CACHE_DIR = os.environ.get("M6800_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "m6800_sdk")
+_HASH_CHUNK_SIZE = 1 << 20
+# Önbellek dizininin en büyük toplam boyutu (byte); M6800_CACHE_MAX_BYTES ile değiştirilebilir
+DEFAULT_MAX_BYTES = int(os.environ.get("M6800_CACHE_MAX_BYTES") or 64 * 1024 * 1024)
+# Bu süreden eski .tmp dosyaları yarım kalmış (başka süreçte başarısız olmuş) yazmalardır
+_STALE_TMP_SECONDS = 3600
+
+def cache_key(source, options, dependencies=()):
+    """
+    source: kaynak metin (str); dosyalar için bkz. file_key
+    options: çıktıyı etkileyen seçeneklerin (sıralı) tuple'ı
+    dependencies: dahil edilen dosyaların yolları; içerikleri de özete katılır
+    """
+    digest = _new_digest(options)
+    digest.update(b"S")
+    digest.update(source.encode("utf-8"))
+    _update_dependencies(digest, dependencies)
+    return digest.hexdigest()
+
+def file_key(path, options, dependencies=()):
+    """Kaynak dosyayı belleğe tamamen okumadan (bloklar halinde) özetler."""
+    digest = _new_digest(options)
+    digest.update(b"F")
+    _update_file(digest, path)
+    _update_dependencies(digest, dependencies)
+    return digest.hexdigest()
+
+def file_digest(path):
+    """Dosya içeriğinin SHA-256 özeti (hex); INCBIN bağımlılıklarının kayıtta saklanan hali."""
+    digest = hashlib.sha256()
+    _update_file(digest, path)
+    return digest.hexdigest()
+
+def dependencies_current(dependencies):
+    """[(yol, özet), ...] listesindeki tüm dosyalar hâlâ aynı içeriğe sahipse True."""
+    for path, expected in dependencies:
+        try:
+            if file_digest(path) != expected:
+                return False
+        except OSError:
+            return False
+    return True
+
+def _new_digest(options):
+    digest = hashlib.sha256()
+    digest.update(f"m6800-asm {__version__} format {CACHE_FORMAT} marshal {marshal.version}\0".encode())
+    digest.update(repr(tuple(options)).encode("utf-8"))
+    return digest
+
+def _update_file(digest, path):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_HASH_CHUNK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+
+def _update_dependencies(digest, dependencies):
+    for path in dependencies:
+        digest.update(b"\0D" + os.path.abspath(path).encode("utf-8") + b"\0")
+        try:
+            _update_file(digest, path)
+        except OSError:
+            digest.update(b"<missing>")
+
+class AssemblyCache:
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".bin")
+
+    def load(self, key):
+        """Kayıtlı değeri (sözlük) döndürür; yoksa veya okunamıyorsa None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                value = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            self.misses += 1
+            return None
+        if not isinstance(value, dict) or value.get("format") != CACHE_FORMAT:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(self._path(key)) # LRU: kullanılan kayıt en yeni sayılır
+        except OSError:
+            pass
+        return value
+
+    def store(self, key, value):
+        """
+        Değeri atomik olarak yazar (geçici dosya + os.replace); yarım yazılmış bir kayıt
+        başka bir süreç tarafından okunamaz. Yazılamazsa (salt okunur dizin vb.) sessizce geçer.
+        """
+        path = self._path(key)
+        value = dict(value, format=CACHE_FORMAT)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(marshal.dumps(value))
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except OSError as e:
+            print(f"Warning: could not write assembly cache entry: {e}")
+        finally:
+            if tmp_path is not None: # Yazma veya os.replace başarısız: geçici dosya kalmasın
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+        self.evict()
+
+    def evict(self):
+        """
+        Toplam boyut max_bytes'ı aşıyorsa en eski (en uzun süredir kullanılmayan) kayıtları
+        siler; eski .tmp dosyalarını da temizler. Döndürülen değer: silinen kayıt sayısı.
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        for path, stat in self._files():
+            if path.endswith(".tmp"):
+                if now - stat.st_mtime > _STALE_TMP_SECONDS:
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+            elif path.endswith(".bin"):
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        removed = 0
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                    removed += 1
+                total -= size # Başka bir süreç silmiş olsa da artık yer kaplamıyor
+        self.evictions += removed
+        return removed
+
+    def clear(self):
+        """Önbellekteki tüm kayıtları ve yarım kalmış yazmaların .tmp dosyalarını siler."""
+        for path, _ in self._files():
+            if path.endswith((".bin", ".tmp")):
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+
+    def _files(self):
+        """Önbellek dizinindeki dosyalar: [(yol, os.stat_result), ...]"""
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    files.append((path, os.stat(path)))
+                except OSError:
+                    continue # Bu arada silinmiş
+        return files
+
+class MemoryAssemblyCache:
+    """
+    AssemblyCache ile aynı arayüzde, süreç içi (diske yazmayan) küçük bir LRU önbellek.
+    Yazarken derleme gibi ara sonuçların kalıcı kayıt bırakmaması gereken yollar içindir.
+    """
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def store(self, key, value):
+        self._entries[key] = dict(value, format=CACHE_FORMAT)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    from .assembler import Assembler
+
+    sample_code = "".join(f"L{i:05d}   LDAA #{i & 0xFF}\n        STAA $40\n" for i in range(5000))
+    sample_code = "        ORG $0100\n" + sample_code + "        END\n"
+    with tempfile.TemporaryDirectory() as tmp:
+        assembler = Assembler(cache=AssemblyCache(tmp))
+        for attempt in ("cold", "warm"):
+            start = time.perf_counter()
+            success, segments, listing, errors = assembler.assemble(sample_code)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{attempt}: {elapsed:7.1f} ms, success={success}, {len(listing)} listing rows, "
+                  f"{sum(len(data) for _, data in segments)} bytes")
+        print("hits:", assembler.cache.hits, "misses:", assembler.cache.misses)
+        # Sınır tek kayıttan küçükse her yazmadan sonra en eski kayıtlar silinir
+        small = AssemblyCache(tmp, max_bytes=1)
+        small.store(cache_key("x", ()), {"segments": []})
+        print("evicted with max_bytes=1:", small.evictions)
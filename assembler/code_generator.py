@@ -1,8 +1,26 @@
 # m6800_sdk/assembler/code_generator.py
 
+import mmap
+import os
+
 from .symbol_table import SymbolTable
 # opcode_table'dan mod sabitlerini ve diğer bilgileri alacağız
-from .opcode_table import MODE_IMPLIED, MODE_IMMEDIATE, MODE_DIRECT, MODE_EXTENDED, MODE_INDEXED, MODE_RELATIVE
+from .opcode_table import ENCODE_TABLE, MODE_IMPLIED, MODE_IMMEDIATE, MODE_DIRECT, MODE_EXTENDED, MODE_INDEXED, MODE_RELATIVE
+from .expression import ExpressionError, expression_to_str
+
+def include_range(file_size, offset, length):
+    """
+    INCBIN "dosya",offset,uzunluk için dosyadan alınacak (offset, uzunluk) aralığı.
+    offset/length None ise sırasıyla 0 ve dosyanın kalanı kabul edilir. Geçersizse ValueError.
+    """
+    offset = 0 if offset is None else offset
+    if not (0 <= offset <= file_size):
+        raise ValueError(f"INCBIN offset {offset} outside file of {file_size} byte(s)")
+    if length is None:
+        return offset, file_size - offset
+    if length < 0 or offset + length > file_size:
+        raise ValueError(f"INCBIN range {offset}+{length} outside file of {file_size} byte(s)")
+    return offset, length
 
 class CodeGenerator:
     def __init__(self, symbol_table: SymbolTable, opcode_table_module):
@@ -15,6 +33,20 @@ class CodeGenerator:
         # Şimdilik kendi listesinde tutalım.
         self.errors.append(f"CodeGen Error (L:{line_number}): {message} -> '{original_line}'")
 
+    def _read_include(self, pi):
+        """
+        INCBIN dosyasını mmap ile eşler ve istenen aralığı tek bir dilimle bytes olarak kopyalar.
+        pi.operands[0], Pass 1'de çözülmüş dosya yoludur.
+        """
+        offset = self.symbol_table.evaluate(pi.operands[1], pi.address) if len(pi.operands) > 1 else None
+        length = self.symbol_table.evaluate(pi.operands[2], pi.address) if len(pi.operands) > 2 else None
+        with open(pi.operands[0], 'rb') as f:
+            offset, length = include_range(os.fstat(f.fileno()).st_size, offset, length)
+            if length == 0:
+                return b"" # Boş dosya mmap ile eşlenemez
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[offset:offset + length]
+
     def generate_code_for_instruction(self, parsed_instruction):
         """
         Verilen ParsedInstruction için makine kodu byte'larını üretir.
@@ -28,60 +60,71 @@ class CodeGenerator:
             # Direktif hataları zaten syntax analyzer tarafından işaretlenmiş olabilir,
             # ama direktifler için kod üretmeye çalışabiliriz (örn: FCB'deki hatalı değer).
             # Şimdilik komut hatalarında direkt boş dönelim.
-            # self._add_error(pi.token.line_number, f"Syntax error prevents code generation: {pi.error}", pi.token.original_line)
+            # self._add_error(pi.line_number, f"Syntax error prevents code generation: {pi.error}", pi.source_line)
             return [], f"Syntax error prevents code generation: {pi.error}" # Hata mesajını da döndür
 
         if pi.is_directive:
             directive_name = pi.mnemonic.upper()
             if directive_name == 'FCB':
-                for val_op in pi.operands: # pi.operands artık çözümlenmiş değerler listesi
+                for val_op in pi.operands: # pi.operands ifade AST'leri (veya sabit int) listesi
                     try:
-                        # Syntax analyzer'dan gelen değerin uygun türde olması beklenir (int)
-                        # Ama yine de kontrol edelim.
-                        byte_val = 0
-                        if isinstance(val_op, str): # Etiket veya $XX, %BB gibi olabilir
-                            if val_op.startswith('$'): byte_val = int(val_op[1:], 16)
-                            elif val_op.startswith('%'): byte_val = int(val_op[1:], 2)
-                            elif val_op.startswith("'") and val_op.endswith("'") and len(val_op) == 3: byte_val = ord(val_op[1])
-                            else: # Decimal veya çözümlenmemiş etiket
-                                sym_addr = self.symbol_table.get_address(val_op)
-                                if sym_addr is not None:
-                                    byte_val = sym_addr
-                                else:
-                                    byte_val = int(val_op) # Decimal dene
-                        else: # Zaten int ise
-                            byte_val = int(val_op)
-
-                        if not (0 <= byte_val <= 255):
+                        byte_val = self.symbol_table.evaluate(val_op, pi.address)
+                        if not (-128 <= byte_val <= 255):
                             raise ValueError("Byte value out of range")
-                        generated_bytes.append(byte_val)
+                        generated_bytes.append(byte_val & 0xFF) # Negatif değerler 2's complement
                     except ValueError as e:
-                        err_msg = f"Invalid byte value for FCB '{val_op}': {e}"
-                        self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+                        err_msg = f"Invalid byte value for FCB '{expression_to_str(val_op)}': {e}"
+                        self._add_error(pi.line_number, err_msg, pi.source_line)
                         return [], err_msg
             elif directive_name == 'FDB':
                 for val_op in pi.operands:
                     try:
-                        word_val = 0
-                        if isinstance(val_op, str): # Etiket veya $XXXX gibi olabilir
-                            if val_op.startswith('$'): word_val = int(val_op[1:], 16)
-                            else: # Decimal veya çözümlenmemiş etiket
-                                sym_addr = self.symbol_table.get_address(val_op)
-                                if sym_addr is not None:
-                                    word_val = sym_addr
-                                else:
-                                    word_val = int(val_op)
-                        else: # Zaten int ise
-                            word_val = int(val_op)
-
-                        if not (0 <= word_val <= 65535):
+                        word_val = self.symbol_table.evaluate(val_op, pi.address)
+                        if not (-32768 <= word_val <= 65535):
                             raise ValueError("Word value out of range")
+                        word_val &= 0xFFFF
                         generated_bytes.append((word_val >> 8) & 0xFF) # High byte
                         generated_bytes.append(word_val & 0xFF)        # Low byte
                     except ValueError as e:
-                        err_msg = f"Invalid word value for FDB '{val_op}': {e}"
-                        self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+                        err_msg = f"Invalid word value for FDB '{expression_to_str(val_op)}': {e}"
+                        self._add_error(pi.line_number, err_msg, pi.source_line)
                         return [], err_msg
+            elif directive_name == 'FCC':
+                # String parçaları zaten bytes; araya giren değerler FCB gibi tek byte
+                for val_op in pi.operands:
+                    if isinstance(val_op, bytes):
+                        generated_bytes.extend(val_op)
+                        continue
+                    try:
+                        byte_val = self.symbol_table.evaluate(val_op, pi.address)
+                        if not (-128 <= byte_val <= 255):
+                            raise ValueError("Byte value out of range")
+                        generated_bytes.append(byte_val & 0xFF)
+                    except ValueError as e:
+                        err_msg = f"Invalid byte value for FCC '{expression_to_str(val_op)}': {e}"
+                        self._add_error(pi.line_number, err_msg, pi.source_line)
+                        return [], err_msg
+            elif directive_name == 'FILL':
+                try:
+                    byte_val = self.symbol_table.evaluate(pi.operands[0], pi.address)
+                    count = self.symbol_table.evaluate(pi.operands[1], pi.address)
+                    if not (-128 <= byte_val <= 255):
+                        raise ValueError("Byte value out of range")
+                    if count < 0:
+                        raise ValueError(f"Invalid count {count}")
+                except ValueError as e:
+                    err_msg = f"Invalid FILL operands: {e}"
+                    self._add_error(pi.line_number, err_msg, pi.source_line)
+                    return [], err_msg
+                # Byte byte liste yerine tek bir bytes nesnesi: Assembler segmente tek dilimde ekler
+                return bytes((byte_val & 0xFF,)) * count, None
+            elif directive_name == 'INCBIN':
+                try:
+                    return self._read_include(pi), None
+                except (OSError, ValueError) as e:
+                    err_msg = f"Cannot include '{pi.operands[0]}': {e}"
+                    self._add_error(pi.line_number, err_msg, pi.source_line)
+                    return [], err_msg
             # ORG, EQU, RMB, END direktifleri doğrudan byte üretmez, Assembler sınıfı tarafından yönetilir.
             # Bu yüzden burada onlar için özel bir işlem yok.
             return generated_bytes, None
@@ -90,7 +133,7 @@ class CodeGenerator:
         if not pi.mnemonic or not pi.op_info:
             # Bu durum normalde olmamalı, syntax analyzer yakalamış olmalı
             err_msg = "Missing mnemonic or op_info for code generation."
-            self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+            self._add_error(pi.line_number, err_msg, pi.source_line)
             return [], err_msg
 
         opcode = pi.op_info.get('opcode')
@@ -100,70 +143,70 @@ class CodeGenerator:
 
         if opcode is None:
             err_msg = f"Opcode not found for '{pi.mnemonic}' in mode '{addressing_mode}'."
-            self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+            self._add_error(pi.line_number, err_msg, pi.source_line)
             return [], err_msg
 
         generated_bytes.append(opcode)
         actual_operand_byte_count = 0
 
+        # Operand ifadesini (etiket, sabit, LABEL+2, <ADDR, * ...) sayısal değere çevir
+        operand_value = None
+        if addressing_mode != MODE_IMPLIED:
+            if operand_value_from_parser is None:
+                err_msg = f"Missing operand for '{pi.mnemonic}' in mode '{addressing_mode}'."
+                self._add_error(pi.line_number, err_msg, pi.source_line)
+                return [], err_msg
+            try:
+                operand_value = self.symbol_table.evaluate(operand_value_from_parser, pi.address)
+            except ExpressionError as e:
+                err_msg = f"{e} in operand of '{pi.mnemonic}' ({addressing_mode} mode)."
+                self._add_error(pi.line_number, err_msg, pi.source_line)
+                return [], err_msg
+
+        if pi.relaxation == 'long_branch':
+            return self._generate_long_branch(pi, operand_value)
+
         if addressing_mode == MODE_IMMEDIATE:
-            if not isinstance(operand_value_from_parser, int) or not (0 <= operand_value_from_parser <= 0xFF) :
-                err_msg = f"Invalid immediate value for '{pi.mnemonic}': {operand_value_from_parser}. Expected 8-bit int."
-                self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+            # LDX/LDS/CPX gibi 16-bit komutlarda anında değer 2 byte'tır
+            immediate_size = (num_bytes_expected or 2) - 1
+            limit = 0xFF if immediate_size == 1 else 0xFFFF
+            if not (-(limit + 1) // 2 <= operand_value <= limit):
+                err_msg = f"Invalid immediate value for '{pi.mnemonic}': {operand_value}. Expected {immediate_size * 8}-bit value."
+                self._add_error(pi.line_number, err_msg, pi.source_line)
                 return [], err_msg
-            generated_bytes.append(operand_value_from_parser & 0xFF)
-            actual_operand_byte_count = 1
+            operand_value &= limit
+            if immediate_size == 2:
+                generated_bytes.append((operand_value >> 8) & 0xFF)
+            generated_bytes.append(operand_value & 0xFF)
+            actual_operand_byte_count = immediate_size
         elif addressing_mode == MODE_DIRECT:
-            target_address = operand_value_from_parser
-            if isinstance(operand_value_from_parser, str): # Etiket
-                addr = self.symbol_table.get_address(operand_value_from_parser)
-                if addr is None:
-                    err_msg = f"Undefined symbol '{operand_value_from_parser}' for DIRECT mode."
-                    self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
-                    return [], err_msg
-                target_address = addr
-            if not isinstance(target_address, int) or not (0 <= target_address <= 0xFF):
+            target_address = operand_value
+            if not (0 <= target_address <= 0xFF):
                 err_msg = f"Address '{target_address:X}' out of range for DIRECT mode (00-FF)."
-                self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+                self._add_error(pi.line_number, err_msg, pi.source_line)
                 return [], err_msg
             generated_bytes.append(target_address & 0xFF)
             actual_operand_byte_count = 1
         elif addressing_mode == MODE_EXTENDED:
-            target_address = operand_value_from_parser
-            if isinstance(operand_value_from_parser, str): # Etiket
-                addr = self.symbol_table.get_address(operand_value_from_parser)
-                if addr is None:
-                    err_msg = f"Undefined symbol '{operand_value_from_parser}' for EXTENDED mode."
-                    self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
-                    return [], err_msg
-                target_address = addr
-            if not isinstance(target_address, int) or not (0 <= target_address <= 0xFFFF):
+            target_address = operand_value
+            if not (0 <= target_address <= 0xFFFF):
                 err_msg = f"Address '{target_address:X}' out of range for EXTENDED mode (0000-FFFF)."
-                self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+                self._add_error(pi.line_number, err_msg, pi.source_line)
                 return [], err_msg
             generated_bytes.append((target_address >> 8) & 0xFF) # High byte
             generated_bytes.append(target_address & 0xFF)        # Low byte
             actual_operand_byte_count = 2
         elif addressing_mode == MODE_INDEXED:
-            # operand_value_from_parser 8-bit offset olmalı
-            if not isinstance(operand_value_from_parser, int) or not (0 <= operand_value_from_parser <= 0xFF):
-                err_msg = f"Invalid indexed offset for '{pi.mnemonic}': {operand_value_from_parser}. Expected 8-bit int."
-                self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+            # Operand 8-bit işaretsiz offset olmalı
+            if not (0 <= operand_value <= 0xFF):
+                err_msg = f"Invalid indexed offset for '{pi.mnemonic}': {operand_value}. Expected 8-bit int."
+                self._add_error(pi.line_number, err_msg, pi.source_line)
                 return [], err_msg
-            generated_bytes.append(operand_value_from_parser & 0xFF)
+            generated_bytes.append(operand_value & 0xFF)
             actual_operand_byte_count = 1
         elif addressing_mode == MODE_RELATIVE:
-            target_label = operand_value_from_parser
-            if not isinstance(target_label, str): # Etiket olmalı
-                err_msg = f"Operand for RELATIVE mode must be a label. Got: {target_label}"
-                self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
-                return [], err_msg
-
-            target_address = self.symbol_table.get_address(target_label)
-            if target_address is None:
-                err_msg = f"Undefined symbol '{target_label}' for branch instruction."
-                self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
-                return [], err_msg
+            target_label = expression_to_str(operand_value_from_parser)
+            target_address = operand_value & 0xFFFF
 
             current_instruction_address = pi.address # ParsedInstruction'a eklediğimiz adres
             # Relative offset: target_address - (current_instruction_address + instruction_length_for_branch)
@@ -172,7 +215,7 @@ class CodeGenerator:
 
             if not (-128 <= offset <= 127):
                 err_msg = f"Branch to '{target_label}' (addr {target_address:04X}) from {current_instruction_address:04X} is out of relative range (offset: {offset})."
-                self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+                self._add_error(pi.line_number, err_msg, pi.source_line)
                 return [], err_msg
             generated_bytes.append(offset & 0xFF) # 2's complement ofset
             actual_operand_byte_count = 1
@@ -181,7 +224,7 @@ class CodeGenerator:
             pass
         else:
             err_msg = f"Unsupported addressing mode '{addressing_mode}' for code generation of '{pi.mnemonic}'."
-            self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+            self._add_error(pi.line_number, err_msg, pi.source_line)
             return [], err_msg
 
         # Üretilen toplam byte sayısını kontrol et
@@ -189,13 +232,32 @@ class CodeGenerator:
         if num_bytes_expected is not None and total_bytes_generated != num_bytes_expected:
             err_msg = (f"Byte count mismatch for '{pi.mnemonic}' in mode '{addressing_mode}'. "
                        f"Expected {num_bytes_expected}, Generated {total_bytes_generated}.")
-            self._add_error(pi.token.line_number, err_msg, pi.token.original_line)
+            self._add_error(pi.line_number, err_msg, pi.source_line)
             # Hata durumunda üretilen byte'ları döndürmeyebiliriz veya olduğu gibi bırakabiliriz.
             # Şimdilik hatayı bildirip üretilenleri döndürelim.
             return generated_bytes, err_msg # Hata mesajını da döndür
 
         return generated_bytes, None # Başarılı, hata mesajı None
 
+    def _generate_long_branch(self, pi, target_address):
+        """
+        Menzil dışı branch'i uzun forma çevirir:
+          BRA hedef  -> JMP hedef
+          BSR hedef  -> JSR hedef
+          Bcc hedef  -> B!cc *+5 ; JMP hedef   (koşul tersine çevrilip JMP'nin üzerinden atlanır)
+        """
+        target_address &= 0xFFFF
+        address_bytes = [(target_address >> 8) & 0xFF, target_address & 0xFF]
+        if pi.mnemonic in ('BRA', 'BSR'):
+            long_mnemonic = 'JMP' if pi.mnemonic == 'BRA' else 'JSR'
+            return [self._extended_opcode(long_mnemonic)] + address_bytes, None
+        # M6800'de koşullu branch opkodları ($22-$2F) çiftler halindedir; en düşük bit koşulu tersine çevirir.
+        inverted_opcode = pi.op_info['opcode'] ^ 0x01
+        return [inverted_opcode, 0x03, self._extended_opcode('JMP')] + address_bytes, None
+
+    def _extended_opcode(self, mnemonic):
+        return ENCODE_TABLE[(mnemonic, MODE_EXTENDED)].opcode
+
 # Test için örnek kullanım (Assembler sınıfı içinden çağrılacak)
 if __name__ == "__main__":
     # Bu sınıfı tek başına test etmek için mock nesneler oluşturmak gerekir.
@@ -215,7 +277,9 @@ if __name__ == "__main__":
 
     class MockParsedInstruction:
         def __init__(self, token, mnemonic, addressing_mode=None, operands=None, op_info=None, is_directive=False, error=None, address=0):
-            self.token = token
+            self.line_number = token.line_number
+            self.source_line = token.original_line
+            self.label = None
             self.mnemonic = mnemonic
             self.addressing_mode = addressing_mode
             self.operands = operands if operands is not None else []
@@ -223,6 +287,7 @@ if __name__ == "__main__":
             self.is_directive = is_directive
             self.error = error
             self.address = address # Komutun adresi (branch offset için)
+            self.relaxation = None
 
     class MockToken:
         def __init__(self, line_number, original_line):
@@ -251,12 +316,12 @@ if __name__ == "__main__":
     # Test 3: FCB $0A, MYLABEL
     token3 = MockToken(3, "FCB $0A, MYLABEL")
     # FCB için op_info'yu mocklamaya gerek yok, direktif adı yeterli.
-    pi3 = MockParsedInstruction(token3, "FCB", operands=["$0A", "MYLABEL"], is_directive=True, address=0x0105)
+    pi3 = MockParsedInstruction(token3, "FCB", operands=[0x0A, "MYLABEL"], is_directive=True, address=0x0105)
     code3, err3 = cg.generate_code_for_instruction(pi3)
     print(f"FCB $0A, MYLABEL -> Code: {[hex(b) for b in code3]}, Error: {err3}") # Beklenen: [0x0A, 0x01, 0x50] (MYLABEL 0x0150 olduğu için 2 byte olarak yorumlanmamalı, FCB 1 byte alır)
     # FCB için düzeltme: FCB operandları tek byte'lık değerler olmalı. Eğer MYLABEL 0x0150 ise bu FCB için bir hata olmalı ya da sadece düşük byte'ı almalı.
     # Mevcut kodumda FCB için etiket çözümlemesi 0-255 aralığında olmalı.
     st.add_symbol("BYTE_LABEL", 0x20)
-    pi3_corrected = MockParsedInstruction(token3, "FCB", operands=["$0A", "BYTE_LABEL"], is_directive=True, address=0x0105)
+    pi3_corrected = MockParsedInstruction(token3, "FCB", operands=[0x0A, "BYTE_LABEL"], is_directive=True, address=0x0105)
     code3_c, err3_c = cg.generate_code_for_instruction(pi3_corrected)
     print(f"FCB $0A, BYTE_LABEL -> Code: {[hex(b) for b in code3_c]}, Error: {err3_c}") # Beklenen: [0x0A, 0x20] 
@@ -0,0 +1,165 @@
+# m6800_sdk/assembler/conditional.py
+
+# Koşullu derleme: IF <ifade> / IFDEF <sembol> / IFNDEF <sembol> / ELSE / ENDIF
+#
+# ConditionalAssembly, kaynak satırlarını lexer'a vermeden önce süzer. Yanlış (false)
+# bloklardaki satırlar için Token veya ParsedInstruction oluşturulmaz; sadece ilk bir-iki
+# kelimeye bakılarak iç içe IF/ENDIF derinliği takip edilir. Böylece bir kart varyantının
+# derlenmesi sadece tuttuğu kod kadar maliyetlidir.
+#
+# Koşul direktiflerinin kendisi (görünür bir bloktaysa) listing için aşağıya aktarılır.
+# IF ifadeleri, satır okunduğu anda çağıranın verdiği evaluate() ile hesaplanır; Pass 1
+# akışı satır satır ilerlediği için (lexer -> parser -> assembler döngüsü) o ana kadar
+# tanımlanmış sabit EQU'lar ve -D tanımları görülebilir.
+
+from .expression import parse_expression, ExpressionError
+
+CONDITIONAL_DIRECTIVES = frozenset(('IF', 'IFDEF', 'IFNDEF', 'ELSE', 'ENDIF'))
+_OPENERS = frozenset(('IF', 'IFDEF', 'IFNDEF'))
+
+def _conditional_keyword(line):
+    """
+    Satır bir koşul direktifiyse anahtar kelimesini (büyük harf) döndürür, değilse None.
+    İlk kelimeye (veya etiketli satırlarda ikinci kelimeye) bakar; yorumları ayrıştırmaz.
+    """
+    parts = line.split(None, 2)
+    if not parts:
+        return None
+    word = parts[0].upper()
+    if word in CONDITIONAL_DIRECTIVES:
+        return word
+    if len(parts) > 1 and not line[:1].isspace() and word[0] not in ';*': # Etiketli satır
+        word = parts[1].upper()
+        if word in CONDITIONAL_DIRECTIVES:
+            return word
+    return None
+
+class _Block:
+    __slots__ = ('enclosing_active', 'condition', 'else_seen', 'line_number')
+
+    def __init__(self, enclosing_active, condition, line_number):
+        self.enclosing_active = enclosing_active
+        self.condition = condition
+        self.else_seen = False
+        self.line_number = line_number
+
+class ConditionalAssembly:
+    def __init__(self, lexer, evaluate, is_defined):
+        """
+        lexer: koşul satırlarının operandını ayırmak için LexicalAnalyzer
+        evaluate(ifade_AST): IF ifadesinin değeri; hesaplanamazsa ExpressionError fırlatmalı
+        is_defined(ad): IFDEF/IFNDEF için sembolün o ana kadar tanımlı olup olmadığı
+        """
+        self.lexer = lexer
+        self.evaluate = evaluate
+        self.is_defined = is_defined
+        self.active = True
+        self.errors = [] # [(satır_no, mesaj, kaynak_satır), ...]
+        self.results = {} # IF/IFDEF/IFNDEF satır no -> koşulun değeri (listing için)
+        self.skipped_lines = 0
+        self._stack = []
+
+    def filter(self, lines, first_line_number=1):
+        """
+        (satır_no, satır) çiftleri üretir: aktif bloklardaki satırlar ve görünür koşul direktifleri.
+        """
+        for line_number, line in enumerate(lines, first_line_number):
+            keyword = _conditional_keyword(line)
+            if keyword is None:
+                if self.active:
+                    yield line_number, line
+                else:
+                    self.skipped_lines += 1
+                continue
+            if self._handle(keyword, line_number, line):
+                yield line_number, line
+            else:
+                self.skipped_lines += 1
+
+    def check_closed(self):
+        """Kaynak bittiğinde kapanmamış blokları hata olarak kaydeder."""
+        for block in self._stack:
+            self.errors.append((block.line_number, "IF without matching ENDIF.", ""))
+        self._stack = []
+        self.active = True
+
+    def _handle(self, keyword, line_number, line):
+        """Koşul direktifini işler. Döndürülen değer: satır listing'e aktarılmalı mı (görünür mü)."""
+        if keyword in _OPENERS:
+            visible = self.active
+            condition = self._condition(keyword, line_number, line) if visible else False
+            self._stack.append(_Block(self.active, condition, line_number))
+            self.active = visible and condition
+            return visible
+        if not self._stack:
+            self.errors.append((line_number, f"{keyword} without matching IF.", line.strip()))
+            return False
+        block = self._stack[-1]
+        if keyword == 'ELSE':
+            if block.else_seen:
+                self.errors.append((line_number, "Duplicate ELSE for the same IF.", line.strip()))
+            block.else_seen = True
+            self.active = block.enclosing_active and not block.condition
+        else: # ENDIF
+            self._stack.pop()
+            self.active = block.enclosing_active
+        return block.enclosing_active
+
+    def _condition(self, keyword, line_number, line):
+        token = self.lexer.tokenize_line(line_number, line)
+        operand = token.operands_raw_str if token is not None and not token.error else None
+        if not operand:
+            self.errors.append((line_number, f"{keyword} requires an operand.", line.strip()))
+            return False
+        if keyword == 'IF':
+            try:
+                value = self.evaluate(parse_expression(operand)) != 0
+            except ExpressionError as e:
+                self.errors.append((line_number, f"IF condition must be defined before use: {e}", line.strip()))
+                return False
+        else:
+            value = self.is_defined(operand.strip().upper()) == (keyword == 'IFDEF')
+        self.results[line_number] = value
+        return value
+
+def parse_define(text):
+    """
+    Komut satırı tanımı: 'SEMBOL' (değer 1) veya 'SEMBOL=ifade'.
+    Döndürülen değer: (ad, değer); geçersizse ValueError fırlatır.
+    """
+    name, _, value_text = text.partition('=')
+    name = name.strip().upper()
+    if not (name.isascii() and name.isidentifier()):
+        raise ValueError(f"Invalid define name '{name}'.")
+    if not value_text.strip():
+        return name, 1
+    value = parse_expression(value_text)
+    if not isinstance(value, int):
+        raise ValueError(f"Define '{name}' must have a constant value, got '{value_text.strip()}'.")
+    return name, value
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    import textwrap # Örnekler girintili yazıldı; etiketler 1. sütuna gelsin
+    from .assembler import Assembler
+
+    sample_code = textwrap.dedent("""
+            ORG  $0100
+    UARTS   EQU  2
+            IFDEF BOARD_B
+            LDAA #$B0
+            ELSE
+            LDAA #$A0
+            ENDIF
+            IF   UARTS>1
+            IFNDEF NO_SECOND
+            STAA $4000       ; ikinci UART
+            ENDIF
+            ENDIF
+            END
+    """)
+    for defines in ({}, {'BOARD_B': 1, 'NO_SECOND': 1}):
+        assembler = Assembler(defines=defines)
+        success, segments, listing, errors = assembler.assemble(sample_code)
+        print(f"defines={defines}: {[(hex(a), d.hex()) for a, d in segments]} errors={errors}")
+    print(parse_define("BOARD=$10"), parse_define("DEBUG"))
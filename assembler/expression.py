@@ -0,0 +1,225 @@
+# m6800_sdk/assembler/expression.py
+
+# Operand ifadelerini (LABEL+2, <ADDR, >ADDR, *, $10*4 | %0001 ...) bir kez
+# ayrıştırıp küçük bir AST'ye çevirir ve daha sonra sembol tablosuyla değerlendirir.
+#
+# AST gösterimi bilerek çok sade tutuldu:
+#   int                  -> sabit değer (sabit alt ifadeler ayrıştırma sırasında katlanır)
+#   str                  -> sembol adı (büyük harf), LC_SYMBOL ('*') ise o anki konum sayacı
+#   (op, sol, sağ)       -> ikili işlem ('+', '-', '*', '/', '&', '|', '^', '<<', '>>')
+#   (op, alt)            -> tekli işlem ('NEG', '~', '<' düşük byte, '>' yüksek byte)
+
+import re
+import sys
+
+LC_SYMBOL = '*' # Konum sayacı (location counter) için özel sembol
+
+class ExpressionError(ValueError):
+    """İfade ayrıştırma veya değerlendirme hatası."""
+    pass
+
+class UndefinedSymbolError(ExpressionError):
+    """İfade, henüz tanımlanmamış bir sembole başvuruyor."""
+    def __init__(self, name):
+        super().__init__(f"Undefined symbol '{name}'")
+        self.name = name
+
+_TOKEN_REGEX = re.compile(
+    r"\s*(?:"
+    r"\$([0-9A-Fa-f]+)"                 # 1: Hex ($FF)
+    r"|%([01]+)"                        # 2: Binary (%0101)
+    r"|(\d+)"                           # 3: Decimal
+    r"|'(.)'?"                          # 4: Karakter ('A' veya 'A)
+    r"|([A-Za-z_][A-Za-z0-9_]*)"        # 5: Sembol
+    r"|(<<|>>|<=|>=|<>|==|!=|[-+*/&|^~<>()=])" # 6: Operatör / parantez
+    r")")
+
+# İkili operatörlerin öncelikleri (büyük olan daha sıkı bağlar).
+# Karşılaştırmalar (IF koşulları için) en gevşek bağlar ve 1/0 üretir. '<' ve '>' önek
+# konumunda düşük/yüksek byte, iki operand arasında karşılaştırmadır.
+_BINARY_PRECEDENCE = {
+    '=': 1, '==': 1, '<>': 1, '!=': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+    '|': 2,
+    '^': 3,
+    '&': 4,
+    '<<': 5, '>>': 5,
+    '+': 6, '-': 6,
+    '*': 7, '/': 7,
+}
+
+_COMPARISONS = {
+    '=': lambda a, b: a == b, '==': lambda a, b: a == b,
+    '<>': lambda a, b: a != b, '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b, '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b, '>=': lambda a, b: a >= b,
+}
+
+_UNARY_OPS = {'-': 'NEG', '~': '~', '<': '<', '>': '>', '+': None}
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    length = len(text)
+    while pos < length:
+        if text[pos].isspace():
+            pos += 1
+            continue
+        m = _TOKEN_REGEX.match(text, pos)
+        if not m or m.end() == pos:
+            raise ExpressionError(f"Unexpected character '{text[pos]}' in expression '{text}'")
+        hex_val, bin_val, dec_val, char_val, symbol, op = m.groups()
+        if hex_val is not None: tokens.append(('num', int(hex_val, 16)))
+        elif bin_val is not None: tokens.append(('num', int(bin_val, 2)))
+        elif dec_val is not None: tokens.append(('num', int(dec_val)))
+        elif char_val is not None: tokens.append(('num', ord(char_val)))
+        elif symbol is not None: tokens.append(('sym', sys.intern(symbol.upper()))) # Etiketlerle aynı string nesnesi
+        else: tokens.append(('op', op))
+        pos = m.end()
+    return tokens
+
+def _fold(op, left, right=None):
+    """Alt ifadeler sabitse işlemi hemen uygular, değilse AST düğümü döndürür."""
+    if right is None:
+        if isinstance(left, int):
+            return _apply_unary(op, left)
+        return (op, left)
+    if isinstance(left, int) and isinstance(right, int):
+        return _apply_binary(op, left, right)
+    return (op, left, right)
+
+def _apply_unary(op, value):
+    if op == 'NEG': return -value
+    if op == '~': return ~value & 0xFFFF
+    if op == '<': return value & 0xFF
+    if op == '>': return (value >> 8) & 0xFF
+    raise ExpressionError(f"Unknown unary operator '{op}'")
+
+def _apply_binary(op, left, right):
+    if op == '+': return left + right
+    if op == '-': return left - right
+    if op == '*': return left * right
+    if op == '/':
+        if right == 0:
+            raise ExpressionError("Division by zero in expression")
+        return int(left / right) # Sıfıra doğru yuvarla
+    if op == '&': return left & right
+    if op == '|': return left | right
+    if op == '^': return left ^ right
+    if op == '<<': return left << right
+    if op == '>>': return left >> right
+    if op in _COMPARISONS: return int(_COMPARISONS[op](left, right))
+    raise ExpressionError(f"Unknown operator '{op}'")
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        tok = self._peek()
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        node = self._parse_binary(1)
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected '{self._peek()[1]}' in expression '{self.text}'")
+        return node
+
+    def _parse_binary(self, min_prec):
+        left = self._parse_unary()
+        while True:
+            kind, value = self._peek()
+            prec = _BINARY_PRECEDENCE.get(value) if kind == 'op' else None
+            if prec is None or prec < min_prec:
+                return left
+            self.pos += 1
+            right = self._parse_binary(prec + 1)
+            left = _fold(value, left, right)
+
+    def _parse_unary(self):
+        kind, value = self._next()
+        if kind == 'num':
+            return value
+        if kind == 'sym':
+            return value
+        if kind == 'op':
+            if value == '*': # Önek konumundaki '*' konum sayacıdır
+                return LC_SYMBOL
+            if value == '(':
+                node = self._parse_binary(1)
+                if self._next() != ('op', ')'):
+                    raise ExpressionError(f"Missing ')' in expression '{self.text}'")
+                return node
+            if value in _UNARY_OPS:
+                operand = self._parse_unary()
+                unary_op = _UNARY_OPS[value]
+                return operand if unary_op is None else _fold(unary_op, operand)
+        if kind is None:
+            raise ExpressionError(f"Unexpected end of expression '{self.text}'")
+        raise ExpressionError(f"Unexpected '{value}' in expression '{self.text}'")
+
+def parse_expression(text):
+    """
+    Bir ifade string'ini AST'ye çevirir. Sabit ifadeler doğrudan int olarak döner.
+    Hatalı ifadelerde ExpressionError fırlatır.
+    """
+    return _Parser(text.strip()).parse()
+
+def evaluate(node, lookup, location_counter=0):
+    """
+    AST'yi değerlendirir. lookup(name) sembolün değerini döndürmeli,
+    bilinmeyen semboller için UndefinedSymbolError fırlatmalıdır.
+    """
+    if isinstance(node, int):
+        return node
+    if isinstance(node, str):
+        if node == LC_SYMBOL:
+            return location_counter
+        return lookup(node)
+    if len(node) == 2:
+        return _apply_unary(node[0], evaluate(node[1], lookup, location_counter))
+    return _apply_binary(node[0],
+                         evaluate(node[1], lookup, location_counter),
+                         evaluate(node[2], lookup, location_counter))
+
+def symbols_in(node, found=None):
+    """AST içinde başvurulan sembol adlarını (konum sayacı hariç) küme olarak döndürür."""
+    if found is None:
+        found = set()
+    if isinstance(node, str):
+        if node != LC_SYMBOL:
+            found.add(node)
+    elif isinstance(node, tuple):
+        for child in node[1:]:
+            symbols_in(child, found)
+    return found
+
+def expression_to_str(node):
+    """AST'yi listing/hata mesajları için tekrar okunabilir metne çevirir."""
+    if isinstance(node, int):
+        return f"${node:X}" if node >= 0 else str(node)
+    if isinstance(node, str):
+        return node
+    if len(node) == 2:
+        op = '-' if node[0] == 'NEG' else node[0]
+        return f"{op}{expression_to_str(node[1])}"
+    return f"({expression_to_str(node[1])}{node[0]}{expression_to_str(node[2])})"
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    symbols = {'LABEL': 0x1234, 'COUNT': 3}
+    def lookup(name):
+        if name not in symbols:
+            raise UndefinedSymbolError(name)
+        return symbols[name]
+
+    for text in ["LABEL+2", "<LABEL", ">LABEL", "* + 3", "$10*4|%0001", "(COUNT+1)<<2", "-1", "'A'+1"]:
+        ast = parse_expression(text)
+        print(f"{text!r:>16} -> AST {ast!r:<40} = {evaluate(ast, lookup, 0x0100):#06x}")
@@ -1,125 +1,189 @@
-import re
+import sys
+from .opcode_table import MNEMONICS, DIRECTIVES
 
 class Token:
     """
     Bir assembly satırının ayrıştırılmış bileşenlerini temsil eder.
+    Etiket ve mnemonik string'leri sys.intern ile paylaşılır; binlerce satırda
+    aynı "LDAA" veya "LOOP" için tek bir string nesnesi tutulur.
     """
-    def __init__(self, line_number, original_line, label=None, mnemonic=None, operands=None, comment=None):
+    __slots__ = ('line_number', 'original_line', 'label', 'mnemonic', 'operands_raw_str', 'comment', 'error')
+
+    def __init__(self, line_number, original_line, label=None, mnemonic=None, operands=None, comment=None, error=None):
         self.line_number = line_number
         self.original_line = original_line.strip()
-        self.label = label.upper() if label else None
-        self.mnemonic = mnemonic.upper() if mnemonic else None # Mnemonik ve direktifler büyük harf
+        self.label = sys.intern(label.upper()) if label else None
+        self.mnemonic = sys.intern(mnemonic.upper()) if mnemonic else None # Mnemonik ve direktifler büyük harf
         self.operands_raw_str = operands # Operandları ham string olarak tutalım, syntax analizi sonra yapsın
         self.comment = comment
+        self.error = error # Satır sözdizimsel olarak parçalanamadıysa hata mesajı
 
     def __repr__(self):
         return (f"Token(L:{self.line_number}, Label='{self.label}', Mnemonic='{self.mnemonic}', "
-                f"Operands='{self.operands_raw_str}', Comment='{self.comment}')")
+                f"Operands='{self.operands_raw_str}', Comment='{self.comment}'"
+                + (f", Error='{self.error}')" if self.error else ")"))
+
+def _is_identifier(word):
+    """Etiket adı: harf veya '_' ile başlar, harf/rakam/'_' ile devam eder (ASCII)."""
+    return word.isascii() and word.isidentifier()
+
+def _is_mnemonic_word(word):
+    return word.isascii() and word.isalpha()
+
+def _find_comment(text):
+    """
+    Yorumu başlatan ';' karakterinin konumunu döndürür (yoksa -1).
+    Tırnak içindeki ';' yorum sayılmaz: "..." string'leri ve 'x' karakter sabitleri atlanır.
+    """
+    semi = text.find(';')
+    if semi < 0 or ('"' not in text and "'" not in text):
+        return semi # Hızlı yol: tırnak yoksa ilk ';' yorumdur
+    i = 0
+    length = len(text)
+    while i < length:
+        ch = text[i]
+        if ch == ';':
+            return i
+        if ch == '"':
+            end = text.find('"', i + 1)
+            if end < 0:
+                return -1
+            i = end + 1
+        elif ch == "'":
+            # Karakter sabiti: 'A' veya 'A (kapanış tırnağı isteğe bağlı)
+            i += 3 if i + 2 < length and text[i + 2] == "'" else 2
+        else:
+            i += 1
+    return -1
 
 class LexicalAnalyzer:
-    def __init__(self):
-        # Regex ile bir assembly satırını parçalamak için desenler
-        # Bu desen M6800 için daha spesifik hale getirilebilir.
-        # Örnek: (Label)? (Mnemonic) (Operands)? (Comment)?
-        # Label: isteğe bağlı, alfa-numerik, ':' ile bitebilir (veya boşlukla ayrılır)
-        # Mnemonic: alfa-numerik
-        # Operands: virgüülle ayrılmış olabilir, özel karakterler içerebilir (#, $, ,X)
-        # Comment: ';' veya '*' ile başlar
-
-        # Basit bir regex, daha karmaşık durumlar için geliştirilebilir.
-        # Bu regex, satır başındaki boşlukları ve etiket sonrası boşlukları dikkate alır.
-        # Grup 1: Label (isteğe bağlı, sonda ':' olabilir veya olmayabilir)
-        # Grup 2: Mnemonic/Directive
-        # Grup 3: Operands (isteğe bağlı)
-        # Grup 4: Comment (isteğe bağlı, ';' veya '*' ile başlayan)
-        self.line_regex = re.compile(
-            r"^\s*(?:([a-zA-Z_][a-zA-Z0-9_]*)(?::|\s+))?"  # 1: Label (isteğe bağlı)
-            r"\s*([a-zA-Z]{2,5})"                         # 2: Mnemonic/Directive (2-5 harf)
-            r"(?:\s+([^;*]*?))?"                          # 3: Operands (isteğe bağlı, yorum öncesine kadar)
-            r"\s*(?:([;*].*))?$"                          # 4: Comment (isteğe bağlı)
-            , re.IGNORECASE) # Büyük/küçük harf duyarsız
-
-        # Sadece yorum veya boş satırları yakalamak için
-        self.comment_or_empty_regex = re.compile(r"^\s*([;*].*)?$|^\s*$")
+    """
+    Her satırı tek geçişte sınıflandıran elle yazılmış tarayıcı.
+    Satır biçimi: [ETİKET[:]] [MNEMONİK [OPERANDLAR]] [; yorum]
+    '*' veya ';' ile başlayan satırlar tam satır yorumdur.
+
+    İlk kelime ':' ile bitiyorsa veya bilinen bir komut/direktif değilse etikettir (sütunu
+    önemli değildir: girintili "LOOP: ..." ve "LOOP NOP" etiketlidir; sadece satırda tek başına
+    duran girintili bir kelime, yanlış yazılmış komut sayılır). Bilinen bir komutsa
+    mnemoniktir; girintisiz yazılmış "LDAA #1" de geçerlidir. Tek belirsiz durum, ilk iki
+    kelimenin de bilinen komut olmasıdır ("TAB NOP" etiketi mi, "LDX TAB" başvurusu mu?):
+    burada sütuna bakılır, 1. sütundaki kelime etiket, girintili olan mnemoniktir. Böylece
+    "JMP END" gibi komut adıyla aynı isimli etiketlere yapılan başvurular etiket sanılmaz.
+    """
 
+    def _is_known_mnemonic(self, word):
+        word = word.upper()
+        return word in MNEMONICS or word in DIRECTIVES
 
     def tokenize_line(self, line_number, line_text):
         """
-        Tek bir assembly satırını token'larına ayırır.
+        Tek bir assembly satırını token'larına ayırır. Boş satırlar için None döner.
         """
-        line_text = line_text.strip()
-
-        # Sadece yorum veya boş satır mı kontrol et
-        match_comment_empty = self.comment_or_empty_regex.match(line_text)
-        if match_comment_empty:
-            comment_content = match_comment_empty.group(1) if match_comment_empty.group(1) else None
-            if line_text == "" and not comment_content : # Tamamen boş satırsa
-                return None # Boş satırlar için None döndür, işlenmesin
-            return Token(line_number, line_text, comment=comment_content)
-
-
-        match = self.line_regex.match(line_text)
-        if match:
-            label, mnemonic, operands, comment = match.groups()
-
-            # Etiketteki ':' karakterini temizle (eğer varsa)
-            if label and label.endswith(':'):
-                label = label[:-1]
-
-            # Operandlar varsa, baştaki/sondaki boşlukları temizle
-            operands_str = operands.strip() if operands else None
-
-            return Token(line_number, line_text, label, mnemonic, operands_str, comment)
+        text = line_text.strip()
+        if not text:
+            return None
+        first = text[0]
+        if first == ';' or first == '*':
+            return Token(line_number, text, comment=text)
+
+        # Yorumu ayır
+        comment = None
+        semi = _find_comment(text)
+        if semi >= 0:
+            comment = text[semi:]
+            code = text[:semi].rstrip()
+            if not code:
+                return Token(line_number, text, comment=comment)
         else:
-            # Eğer satır yukarıdaki regex'e uymuyorsa, bu bir syntax hatası olabilir
-            # veya satır sadece bir etiket ve yorumdan oluşuyor olabilir.
-            # Şimdilik bunu bir hata olarak işaretleyebiliriz veya daha esnek bir ayrıştırma deneyebiliriz.
-            # Örnek: Sadece etiket varsa ve komut yoksa
-            label_only_match = re.match(r"^\s*([a-zA-Z_][a-zA-Z0-9_]*)(?::|\s+)?\s*([;*].*)?$", line_text, re.IGNORECASE)
-            if label_only_match:
-                label = label_only_match.group(1)
-                comment = label_only_match.group(2)
-                if label and label.endswith(':'):
-                    label = label[:-1]
-                return Token(line_number, line_text, label=label, comment=comment)
-
-            # Bilinmeyen format veya hata
-            print(f"Warning: Line {line_number} could not be fully parsed: '{line_text}'") # Geçici uyarı
-            # Daha iyi hata yönetimi için burada bir hata token'ı döndürülebilir.
-            return Token(line_number, line_text, comment=f"LEXICAL_ERROR: Invalid format: {line_text}")
-
+            code = text
+
+        # İlk kelime ve kalanı
+        parts = code.split(None, 1)
+        word = parts[0]
+        rest = parts[1] if len(parts) > 1 else ""
+        label = None
+
+        colon = word.find(':')
+        if colon >= 0:
+            # "LOOP:" veya "LOOP:LDAA #1" -> açık etiket
+            label = word[:colon]
+            rest = (word[colon + 1:] + " " + rest).strip()
+        elif not self._is_known_mnemonic(word):
+            if not rest and (line_text[:1].isspace() or not _is_identifier(word)):
+                # Girintili tek kelime (örn. yanlış yazılmış "NOOP") veya geçersiz isim: mnemonik
+                # olarak kalır, syntax analizinde hata verir
+                return self._make_token(line_number, text, None, word, None, comment)
+            label = word # Bilinmeyen kelime: etiket
+        elif (rest and not line_text[:1].isspace()
+              and self._is_known_mnemonic(rest.split(None, 1)[0])):
+            label = word # 1. sütunda komut adıyla aynı isimli etiket ("TAB NOP", "END RTS")
+        else:
+            return self._make_token(line_number, text, None, word, rest or None, comment)
+
+        if not _is_identifier(label):
+            return Token(line_number, text, comment=comment, error=f"Invalid label '{label}'")
+        if not rest or rest[0] == '*':
+            # Sadece etiket (ardından '*' yorum gelebilir)
+            return Token(line_number, text, label=label, comment=rest or comment)
+
+        parts = rest.split(None, 1)
+        return self._make_token(line_number, text, label, parts[0],
+                                parts[1] if len(parts) > 1 else None, comment)
+
+    def _make_token(self, line_number, text, label, mnemonic, operands, comment):
+        if not _is_mnemonic_word(mnemonic):
+            return Token(line_number, text, label=label, comment=comment,
+                         error=f"Invalid format: '{text}'")
+        if operands:
+            operands = operands.strip() or None
+        return Token(line_number, text, label, mnemonic, operands, comment)
+
+    def iter_tokens(self, lines, first_line_number=1):
+        """Satır iterable'ından token'ları tek tek üretir (boş satırlar atlanır)."""
+        return self.iter_numbered_tokens(enumerate(lines, first_line_number))
+
+    def iter_numbered_tokens(self, numbered_lines):
+        """(satır_no, satır) çiftlerinden token üretir; koşullu derlemede süzülmüş satırlar için."""
+        tokenize_line = self.tokenize_line
+        for line_number, line in numbered_lines:
+            token = tokenize_line(line_number, line)
+            if token is not None:
+                yield token
+
+    def tokenize_stream(self, stream):
+        """
+        Açık bir dosya (veya satır üreten herhangi bir iterable) üzerinden tembel tokenizasyon.
+        Dosya hiçbir zaman tamamen belleğe okunmaz.
+        """
+        return self.iter_tokens(stream)
 
     def tokenize_source_code(self, source_code_str):
         """
         Tüm kaynak kodunu (string olarak) alır ve token listesi döndürür.
         """
-        tokens = []
-        lines = source_code_str.splitlines()
-        for i, line in enumerate(lines):
-            token = self.tokenize_line(i + 1, line)
-            if token: # None olmayan (boş olmayan) token'ları ekle
-                tokens.append(token)
-        return tokens
+        return list(self.iter_tokens(source_code_str.splitlines()))
 
 # Test için örnek kullanım
 if __name__ == "__main__":
     lexer = LexicalAnalyzer()
 
+    # Etiketler 1. sütunda, komutlar girintili
     sample_code = """
-    STARTADR EQU $1000    ; Program başlangıç adresi
-    LOOP: LDAA #$05      ; A'ya 5 yükle
-          DECA
-          BNE  LOOP      ; LOOP'a dallan eğer sıfır değilse
-          ANDA #%00001111 ; Maskeleme
-    * Sadece yorum satırı
-          LDAB DATA,X
-    VALUE FCB $10, $20, $30
-          ORG  STARTADR
-          NOP              ; No operation
-          END
-    LABELONLY:
-    ; son yorum
-    """
+STARTADR EQU $1000    ; Program başlangıç adresi
+LOOP: LDAA #$05      ; A'ya 5 yükle
+      DECA
+      BNE  LOOP      ; LOOP'a dallan eğer sıfır değilse
+      ANDA #%00001111 ; Maskeleme
+* Sadece yorum satırı
+      LDAB DATA,X
+      JMP  END       ; END adlı etikete atlama (END direktifi değil)
+VALUE FCB $10, $20, $30
+      ORG  STARTADR
+      NOP              ; No operation
+      END
+LABELONLY:
+; son yorum
+"""
 
     print("--- Tokenizing Sample Code ---")
     token_list = lexer.tokenize_source_code(sample_code)
@@ -130,18 +194,20 @@ if __name__ == "__main__":
     test_lines = [
         "MYLABEL: LDAA #$FF",
         "         ADDB VALUE",
-        "NOOP", # Bu mnemonik "NOP" olmalı, regex bunu yakalayabilir ama syntax'ta hata verir
+        "         NOOP", # Girintili bilinmeyen kelime: mnemonik sayılır, syntax'ta hata verir
         "LOOP:    DECA       ; Decrement A",
         "         BNE  LOOP",
         "* This is a full line comment",
         "         FCB  $01,$02,$03 ; Define bytes",
+        "         FCB  ';',$0D     ; Tırnak içindeki ';' yorum değildir",
         "         ORG  $C000",
         "LABEL_NO_CMD: ; Sadece etiket ve yorum",
         "           END",
-        "INVALID LINE HERE", # Hata durumu
+        "INVALID LINE HERE", # Hata durumu (syntax'ta bilinmeyen mnemonik)
+        "BAD #5",            # Hata durumu (lexer: geçersiz format)
         "LONE_LABEL:",
         "" # Boş satır
     ]
 
     for i, tl in enumerate(test_lines):
-        print(f"Line {i+1}: '{tl}' -> {lexer.tokenize_line(i+1, tl)}") 
+        print(f"Line {i+1}: '{tl}' -> {lexer.tokenize_line(i+1, tl)}")
@@ -1,5 +1,8 @@
  # m6800_sdk/assembler/opcode_table.py
 
+from collections import namedtuple
+from types import MappingProxyType
+
 # Condition Code Register (CCR) Bit Pozisyonları (MSB'den LSB'ye doğru)
 # Gerçek M6800'de flag'ler tek bir byte içinde bitler olarak bulunur.
 # H I N Z V C
@@ -30,228 +33,308 @@ MODE_EXTENDED = "EXTND"
 MODE_INDEXED = "INDEX"
 MODE_RELATIVE = "REL" # Branch komutları için
 
-# Her komut için:
+# Her komut için üretilen yapı:
 # 'mnemonic': {
 #     MODE_XXX: {'opcode': 0xYY, 'bytes': N, 'cycles': M,
 #                'flags_affected': [FLAG_N, FLAG_Z, ...],
-#                'flags_logic': {'N': 'result < 0', 'Z': 'result == 0', ...} # Opsiyonel, flag'lerin nasıl set edileceğine dair mantık
-#                'description': "Kısa açıklama"},
+#                'desc': "Kısa açıklama"},
 #     ...
 # }
-# 'cycles' şimdilik opsiyonel, simülasyonun doğruluğu için eklenebilir.
-# 'flags_logic' hangi koşulda hangi flag'in set olacağını belirtir.
-# Bazı komutlar flag'leri belirli bir değere set eder (örn: V=0). Bunları da belirtebiliriz.
+# Branch komutlarında ek olarak 'condition_true': lambda ccr: ... bulunur.
+#
+# Tablo elle yazılmış iç içe sözlükler yerine aşağıdaki kompakt spesifikasyondan üretilir
+# (Motorola M6800 Programming Reference Manual, Tablo 2-5). Her hücre "opcode/cycle"
+# biçimindedir, '-' o modun olmadığını belirtir. Uzunluk moddan türetilir
+# (IMM 2 byte, 16-bit yazmaçlar için 3; DIR/IDX/REL 2; EXT 3; INH 1).
+# FLAGS sütunu komutun değiştirdiği (set/clear/hesaplanan) CCR bitleridir.
+_INSTRUCTION_SPEC = """
+# MNEM  IMM    DIR    IDX    EXT    INH    REL    FLAGS   DESCRIPTION
+# --- Accumulator and Memory Operations ---
+ABA     -      -      -      -      1B/2   -      HNZVC   Add Accumulators
+ADCA    89/2   99/3   A9/5   B9/4   -      -      HNZVC   Add with Carry to A
+ADCB    C9/2   D9/3   E9/5   F9/4   -      -      HNZVC   Add with Carry to B
+ADDA    8B/2   9B/3   AB/5   BB/4   -      -      HNZVC   Add to A
+ADDB    CB/2   DB/3   EB/5   FB/4   -      -      HNZVC   Add to B
+ANDA    84/2   94/3   A4/5   B4/4   -      -      NZV     AND with A
+ANDB    C4/2   D4/3   E4/5   F4/4   -      -      NZV     AND with B
+ASL     -      -      68/7   78/6   -      -      NZVC    Arithmetic Shift Left Memory
+ASLA    -      -      -      -      48/2   -      NZVC    Arithmetic Shift Left A
+ASLB    -      -      -      -      58/2   -      NZVC    Arithmetic Shift Left B
+ASR     -      -      67/7   77/6   -      -      NZVC    Arithmetic Shift Right Memory
+ASRA    -      -      -      -      47/2   -      NZVC    Arithmetic Shift Right A
+ASRB    -      -      -      -      57/2   -      NZVC    Arithmetic Shift Right B
+BITA    85/2   95/3   A5/5   B5/4   -      -      NZV     Bit Test A
+BITB    C5/2   D5/3   E5/5   F5/4   -      -      NZV     Bit Test B
+CBA     -      -      -      -      11/2   -      NZVC    Compare Accumulators
+CLR     -      -      6F/7   7F/6   -      -      NZVC    Clear Memory
+CLRA    -      -      -      -      4F/2   -      NZVC    Clear A
+CLRB    -      -      -      -      5F/2   -      NZVC    Clear B
+CMPA    81/2   91/3   A1/5   B1/4   -      -      NZVC    Compare with A
+CMPB    C1/2   D1/3   E1/5   F1/4   -      -      NZVC    Compare with B
+COM     -      -      63/7   73/6   -      -      NZVC    Complement Memory
+COMA    -      -      -      -      43/2   -      NZVC    Complement A
+COMB    -      -      -      -      53/2   -      NZVC    Complement B
+DAA     -      -      -      -      19/2   -      NZVC    Decimal Adjust A
+DEC     -      -      6A/7   7A/6   -      -      NZV     Decrement Memory
+DECA    -      -      -      -      4A/2   -      NZV     Decrement Accumulator A
+DECB    -      -      -      -      5A/2   -      NZV     Decrement Accumulator B
+EORA    88/2   98/3   A8/5   B8/4   -      -      NZV     Exclusive OR with A
+EORB    C8/2   D8/3   E8/5   F8/4   -      -      NZV     Exclusive OR with B
+INC     -      -      6C/7   7C/6   -      -      NZV     Increment Memory
+INCA    -      -      -      -      4C/2   -      NZV     Increment Accumulator A
+INCB    -      -      -      -      5C/2   -      NZV     Increment Accumulator B
+LDAA    86/2   96/3   A6/5   B6/4   -      -      NZV     Load Accumulator A
+LDAB    C6/2   D6/3   E6/5   F6/4   -      -      NZV     Load Accumulator B
+LSR     -      -      64/7   74/6   -      -      NZVC    Logical Shift Right Memory
+LSRA    -      -      -      -      44/2   -      NZVC    Logical Shift Right A
+LSRB    -      -      -      -      54/2   -      NZVC    Logical Shift Right B
+NEG     -      -      60/7   70/6   -      -      NZVC    Negate Memory
+NEGA    -      -      -      -      40/2   -      NZVC    Negate A
+NEGB    -      -      -      -      50/2   -      NZVC    Negate B
+ORAA    8A/2   9A/3   AA/5   BA/4   -      -      NZV     Inclusive OR with A
+ORAB    CA/2   DA/3   EA/5   FA/4   -      -      NZV     Inclusive OR with B
+PSHA    -      -      -      -      36/4   -      -       Push A onto Stack
+PSHB    -      -      -      -      37/4   -      -       Push B onto Stack
+PULA    -      -      -      -      32/4   -      -       Pull A from Stack
+PULB    -      -      -      -      33/4   -      -       Pull B from Stack
+ROL     -      -      69/7   79/6   -      -      NZVC    Rotate Left Memory
+ROLA    -      -      -      -      49/2   -      NZVC    Rotate Left A
+ROLB    -      -      -      -      59/2   -      NZVC    Rotate Left B
+ROR     -      -      66/7   76/6   -      -      NZVC    Rotate Right Memory
+RORA    -      -      -      -      46/2   -      NZVC    Rotate Right A
+RORB    -      -      -      -      56/2   -      NZVC    Rotate Right B
+SBA     -      -      -      -      10/2   -      NZVC    Subtract Accumulators
+SBCA    82/2   92/3   A2/5   B2/4   -      -      NZVC    Subtract with Carry from A
+SBCB    C2/2   D2/3   E2/5   F2/4   -      -      NZVC    Subtract with Carry from B
+STAA    -      97/4   A7/6   B7/5   -      -      NZV     Store Accumulator A
+STAB    -      D7/4   E7/6   F7/5   -      -      NZV     Store Accumulator B
+SUBA    80/2   90/3   A0/5   B0/4   -      -      NZVC    Subtract from A
+SUBB    C0/2   D0/3   E0/5   F0/4   -      -      NZVC    Subtract from B
+TAB     -      -      -      -      16/2   -      NZV     Transfer A to B
+TBA     -      -      -      -      17/2   -      NZV     Transfer B to A
+TST     -      -      6D/7   7D/6   -      -      NZVC    Test Memory
+TSTA    -      -      -      -      4D/2   -      NZVC    Test A
+TSTB    -      -      -      -      5D/2   -      NZVC    Test B
+# --- Index Register and Stack Pointer Instructions ---
+CPX     8C/3   9C/4   AC/6   BC/5   -      -      NZV     Compare Index Register
+DES     -      -      -      -      34/4   -      -       Decrement Stack Pointer
+DEX     -      -      -      -      09/4   -      Z       Decrement Index Register
+INS     -      -      -      -      31/4   -      -       Increment Stack Pointer
+INX     -      -      -      -      08/4   -      Z       Increment Index Register
+LDS     8E/3   9E/4   AE/6   BE/5   -      -      NZV     Load Stack Pointer
+LDX     CE/3   DE/4   EE/6   FE/5   -      -      NZV     Load Index Register
+STS     -      9F/5   AF/7   BF/6   -      -      NZV     Store Stack Pointer
+STX     -      DF/5   EF/7   FF/6   -      -      NZV     Store Index Register
+TSX     -      -      -      -      30/4   -      -       Transfer Stack Pntr to Index Reg
+TXS     -      -      -      -      35/4   -      -       Transfer Index Reg to Stack Pntr
+# --- Jump and Branch Instructions ---
+BRA     -      -      -      -      -      20/4   -       Branch Always
+BHI     -      -      -      -      -      22/4   -       Branch if Higher
+BLS     -      -      -      -      -      23/4   -       Branch if Lower or Same
+BCC     -      -      -      -      -      24/4   -       Branch if Carry Clear
+BCS     -      -      -      -      -      25/4   -       Branch if Carry Set
+BNE     -      -      -      -      -      26/4   -       Branch if Not Equal (Z=0)
+BEQ     -      -      -      -      -      27/4   -       Branch if Equal (Z=1)
+BVC     -      -      -      -      -      28/4   -       Branch if Overflow Clear
+BVS     -      -      -      -      -      29/4   -       Branch if Overflow Set
+BPL     -      -      -      -      -      2A/4   -       Branch if Plus
+BMI     -      -      -      -      -      2B/4   -       Branch if Minus
+BGE     -      -      -      -      -      2C/4   -       Branch if Greater or Equal (signed)
+BLT     -      -      -      -      -      2D/4   -       Branch if Less Than (signed)
+BGT     -      -      -      -      -      2E/4   -       Branch if Greater Than (signed)
+BLE     -      -      -      -      -      2F/4   -       Branch if Less or Equal (signed)
+BSR     -      -      -      -      -      8D/8   -       Branch to Subroutine
+JMP     -      -      6E/4   7E/3   -      -      -       Jump
+JSR     -      -      AD/8   BD/9   -      -      -       Jump to Subroutine
+NOP     -      -      -      -      01/2   -      -       No Operation
+RTI     -      -      -      -      3B/10  -      HINZVC  Return from Interrupt
+RTS     -      -      -      -      39/5   -      -       Return from Subroutine
+SWI     -      -      -      -      3F/12  -      I       Software Interrupt
+WAI     -      -      -      -      3E/9   -      I       Wait for Interrupt
+# --- Condition Code Register Instructions ---
+CLC     -      -      -      -      0C/2   -      C       Clear Carry
+CLI     -      -      -      -      0E/2   -      I       Clear Interrupt Mask
+CLV     -      -      -      -      0A/2   -      V       Clear Overflow
+SEC     -      -      -      -      0D/2   -      C       Set Carry
+SEI     -      -      -      -      0F/2   -      I       Set Interrupt Mask
+SEV     -      -      -      -      0B/2   -      V       Set Overflow
+TAP     -      -      -      -      06/2   -      HINZVC  Transfer A to CCR
+TPA     -      -      -      -      07/2   -      -       Transfer CCR to A
+"""
 
-INSTRUCTION_SET = {
-    # --- TABLE 2: ACCUMULATOR AND MEMORY OPERATIONS ---
-    'ABA': {
-        MODE_IMPLIED: {'opcode': 0x1B, 'bytes': 1, 'flags_affected': [FLAG_H, FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add Accumulators"},
-    },
-    'ADCA': {
-        MODE_IMMEDIATE: {'opcode': 0x89, 'bytes': 2, 'flags_affected': [FLAG_H, FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to A"},
-        MODE_DIRECT:    {'opcode': 0x99, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to A"}, # H not affected in direct for ADCA/SBCA as per some docs
-        MODE_INDEXED:   {'opcode': 0xA9, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to A"},
-        MODE_EXTENDED:  {'opcode': 0xB9, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to A"},
-    },
-    'ADCB': {
-        MODE_IMMEDIATE: {'opcode': 0xC9, 'bytes': 2, 'flags_affected': [FLAG_H, FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to B"},
-        MODE_DIRECT:    {'opcode': 0xD9, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to B"},
-        MODE_INDEXED:   {'opcode': 0xE9, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to B"},
-        MODE_EXTENDED:  {'opcode': 0xF9, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add with Carry to B"},
-    },
-    'ADDA': {
-        MODE_IMMEDIATE: {'opcode': 0x8B, 'bytes': 2, 'flags_affected': [FLAG_H, FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to A"},
-        MODE_DIRECT:    {'opcode': 0x9B, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to A"},
-        MODE_INDEXED:   {'opcode': 0xAB, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to A"},
-        MODE_EXTENDED:  {'opcode': 0xBB, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to A"},
-    },
-    'ADDB': {
-        MODE_IMMEDIATE: {'opcode': 0xCB, 'bytes': 2, 'flags_affected': [FLAG_H, FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to B"},
-        MODE_DIRECT:    {'opcode': 0xDB, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to B"},
-        MODE_INDEXED:   {'opcode': 0xEB, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to B"},
-        MODE_EXTENDED:  {'opcode': 0xFB, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Add to B"},
-    },
-    'ANDA': {
-        MODE_IMMEDIATE: {'opcode': 0x84, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with A"}, # V is cleared
-        MODE_DIRECT:    {'opcode': 0x94, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with A"},
-        MODE_INDEXED:   {'opcode': 0xA4, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with A"},
-        MODE_EXTENDED:  {'opcode': 0xB4, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with A"},
-    },
-    'ANDB': {
-        MODE_IMMEDIATE: {'opcode': 0xC4, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with B"}, # V is cleared
-        MODE_DIRECT:    {'opcode': 0xD4, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with B"},
-        MODE_INDEXED:   {'opcode': 0xE4, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with B"},
-        MODE_EXTENDED:  {'opcode': 0xF4, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "AND with B"},
-    },
-    'ASL': { # Arithmetic Shift Left (Memory)
-        MODE_INDEXED:   {'opcode': 0x68, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Arithmetic Shift Left Memory"}, # Yanlış opkod, 78 olmalı
-        MODE_EXTENDED:  {'opcode': 0x78, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Arithmetic Shift Left Memory"},
-    },
-    'ASLA': {
-        MODE_IMPLIED:   {'opcode': 0x48, 'bytes': 1, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Arithmetic Shift Left A"},
-    },
-    'ASLB': {
-        MODE_IMPLIED:   {'opcode': 0x58, 'bytes': 1, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Arithmetic Shift Left B"},
-    },
-    'ASR': { # Arithmetic Shift Right (Memory)
-        MODE_INDEXED:   {'opcode': 0x67, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_C], 'desc': "Arithmetic Shift Right Memory"}, # Yanlış opkod, 77 olmalı
-        MODE_EXTENDED:  {'opcode': 0x77, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_C], 'desc': "Arithmetic Shift Right Memory"},
-    },
-    'ASRA': {
-        MODE_IMPLIED:   {'opcode': 0x47, 'bytes': 1, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_C], 'desc': "Arithmetic Shift Right A"},
-    },
-    'ASRB': {
-        MODE_IMPLIED:   {'opcode': 0x57, 'bytes': 1, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_C], 'desc': "Arithmetic Shift Right B"},
-    },
-    # ... (Diğer tüm komutlar bu şekilde eklenecek) ...
-    # Örnek bir branch komutu
-    'BCC': {
-        MODE_RELATIVE:  {'opcode': 0x24, 'bytes': 2, 'flags_affected': [], 'condition_true': lambda ccr: not ccr.C, 'desc': "Branch if Carry Clear"},
-    },
-    'BCS': {
-        MODE_RELATIVE:  {'opcode': 0x25, 'bytes': 2, 'flags_affected': [], 'condition_true': lambda ccr: ccr.C, 'desc': "Branch if Carry Set"},
-    },
-    'BEQ': {
-        MODE_RELATIVE:  {'opcode': 0x27, 'bytes': 2, 'flags_affected': [], 'condition_true': lambda ccr: ccr.Z, 'desc': "Branch if Equal (Z=1)"},
-    },
-    # ... Diğer branch komutları ...
-    'BRA': {
-        MODE_RELATIVE:  {'opcode': 0x20, 'bytes': 2, 'flags_affected': [], 'condition_true': lambda ccr: True, 'desc': "Branch Always"},
-    },
-    # ...
-    'LDAA': {
-        MODE_IMMEDIATE: {'opcode': 0x86, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator A"},
-        MODE_DIRECT:    {'opcode': 0x96, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator A"},
-        MODE_INDEXED:   {'opcode': 0xA6, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator A"},
-        MODE_EXTENDED:  {'opcode': 0xB6, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator A"},
-    },
-    'LDAB': {
-        MODE_IMMEDIATE: {'opcode': 0xC6, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator B"},
-        MODE_DIRECT:    {'opcode': 0xD6, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator B"},
-        MODE_INDEXED:   {'opcode': 0xE6, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator B"},
-        MODE_EXTENDED:  {'opcode': 0xF6, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Accumulator B"},
-    },
-    # ...
-    'STAA': {
-        MODE_DIRECT:    {'opcode': 0x97, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Accumulator A"},
-        MODE_INDEXED:   {'opcode': 0xA7, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Accumulator A"},
-        MODE_EXTENDED:  {'opcode': 0xB7, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Accumulator A"},
-    },
-    'STAB': {
-        MODE_DIRECT:    {'opcode': 0xD7, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Accumulator B"}, # D7 olmalı, C7 değil
-        MODE_INDEXED:   {'opcode': 0xE7, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Accumulator B"},
-        MODE_EXTENDED:  {'opcode': 0xF7, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Accumulator B"},
-    },
-    # --- TABLE 3: INDEX REGISTER AND STACK POINTER INSTRUCTIONS ---
-    'CPX': {
-        MODE_IMMEDIATE: {'opcode': 0x8C, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V], 'desc': "Compare Index Register"},
-        MODE_DIRECT:    {'opcode': 0x9C, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V], 'desc': "Compare Index Register"},
-        MODE_INDEXED:   {'opcode': 0xAC, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V], 'desc': "Compare Index Register"},
-        MODE_EXTENDED:  {'opcode': 0xBC, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V], 'desc': "Compare Index Register"},
-    },
-    'DEX': {
-        MODE_IMPLIED:   {'opcode': 0x09, 'bytes': 1, 'flags_affected': [FLAG_Z], 'desc': "Decrement Index Register"}, # 09 olmalı, 08 değil
-    },
-    'DES': {
-        MODE_IMPLIED:   {'opcode': 0x34, 'bytes': 1, 'flags_affected': [], 'desc': "Decrement Stack Pointer"},
-    },
-    'INX': {
-        MODE_IMPLIED:   {'opcode': 0x08, 'bytes': 1, 'flags_affected': [FLAG_Z], 'desc': "Increment Index Register"},
-    },
-    'INS': {
-        MODE_IMPLIED:   {'opcode': 0x31, 'bytes': 1, 'flags_affected': [], 'desc': "Increment Stack Pointer"},
-    },
-    'LDX': {
-        MODE_IMMEDIATE: {'opcode': 0xCE, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Index Register"},
-        MODE_DIRECT:    {'opcode': 0xDE, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Index Register"},
-        MODE_INDEXED:   {'opcode': 0xEE, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Index Register"},
-        MODE_EXTENDED:  {'opcode': 0xFE, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Index Register"},
-    },
-    'LDS': {
-        MODE_IMMEDIATE: {'opcode': 0x8E, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Stack Pointer"},
-        MODE_DIRECT:    {'opcode': 0x9E, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Stack Pointer"}, # 9E olmalı, 95 değil
-        MODE_INDEXED:   {'opcode': 0xAE, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Stack Pointer"},
-        MODE_EXTENDED:  {'opcode': 0xBE, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Load Stack Pointer"},
-    },
-    'STX': {
-        MODE_DIRECT:    {'opcode': 0xDF, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Index Register"}, # DF olmalı, OF değil
-        MODE_INDEXED:   {'opcode': 0xEF, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Index Register"},
-        MODE_EXTENDED:  {'opcode': 0xFF, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Index Register"},
-    },
-    'STS': {
-        MODE_DIRECT:    {'opcode': 0x9F, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Stack Pointer"},
-        MODE_INDEXED:   {'opcode': 0xAF, 'bytes': 2, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Stack Pointer"},
-        MODE_EXTENDED:  {'opcode': 0xBF, 'bytes': 3, 'flags_affected': [FLAG_N, FLAG_Z], 'v_flag_clear': True, 'desc': "Store Stack Pointer"},
-    },
-    'TXS': {
-        MODE_IMPLIED:   {'opcode': 0x35, 'bytes': 1, 'flags_affected': [], 'desc': "Transfer Index Reg to Stack Pntr"},
-    },
-    'TSX': {
-        MODE_IMPLIED:   {'opcode': 0x30, 'bytes': 1, 'flags_affected': [], 'desc': "Transfer Stack Pntr to Index Reg"},
-    },
+_SPEC_MODES = (MODE_IMMEDIATE, MODE_DIRECT, MODE_INDEXED, MODE_EXTENDED, MODE_IMPLIED, MODE_RELATIVE)
+_MODE_LENGTHS = {MODE_IMMEDIATE: 2, MODE_DIRECT: 2, MODE_INDEXED: 2, MODE_EXTENDED: 3, MODE_IMPLIED: 1, MODE_RELATIVE: 2}
+_WORD_IMMEDIATE = frozenset(('CPX', 'LDS', 'LDX')) # 16-bit immediate operand alan komutlar
 
-    # --- TABLE 4: JUMP AND BRANCH INSTRUCTIONS ---
-    'JMP': {
-        MODE_INDEXED:   {'opcode': 0x6E, 'bytes': 2, 'flags_affected': [], 'desc': "Jump"},
-        MODE_EXTENDED:  {'opcode': 0x7E, 'bytes': 3, 'flags_affected': [], 'desc': "Jump"},
-    },
-    'JSR': {
-        MODE_INDEXED:   {'opcode': 0xAD, 'bytes': 2, 'flags_affected': [], 'desc': "Jump to Subroutine"},
-        MODE_EXTENDED:  {'opcode': 0xBD, 'bytes': 3, 'flags_affected': [], 'desc': "Jump to Subroutine"},
-    },
-    'NOP': {
-        MODE_IMPLIED:   {'opcode': 0x01, 'bytes': 1, 'flags_affected': [], 'desc': "No Operation"},
-    },
-    'RTI': {
-        MODE_IMPLIED:   {'opcode': 0x3B, 'bytes': 1, 'flags_affected': [FLAG_H, FLAG_I, FLAG_N, FLAG_Z, FLAG_V, FLAG_C], 'desc': "Return from Interrupt"}, # Tüm flag'ler yığından çekilir
-    },
-    'RTS': {
-        MODE_IMPLIED:   {'opcode': 0x39, 'bytes': 1, 'flags_affected': [], 'desc': "Return from Subroutine"},
-    },
-    'SWI': {
-        MODE_IMPLIED:   {'opcode': 0x3F, 'bytes': 1, 'flags_affected': [FLAG_I], 'i_flag_set': True, 'desc': "Software Interrupt"}, # I flag'i set edilir
-    },
-    'WAI': {
-        MODE_IMPLIED:   {'opcode': 0x3E, 'bytes': 1, 'flags_affected': [], 'desc': "Wait for Interrupt"}, # Aslında I flag'ini etkiler (interrupt beklerken)
-    },
-    # Diğer tüm komutlar benzer şekilde doldurulacak...
-    'INCA': {
-    MODE_IMPLIED: {'opcode': 0x4C, 'bytes': 1, 'cycles': 2, 'flags_affected': [FLAG_N, FLAG_Z, FLAG_V], 'desc': "Increment Accumulator A"},
-    },
-     'DECB': {
-        MODE_IMPLIED: {
-            'opcode': 0x5A, 
-            'bytes': 1,
-            'cycles': 2,
-            'flags_affected': [FLAG_N, FLAG_Z, FLAG_V],
-            'desc': "Decrement Accumulator B"
-        }
-    },
+# Branch koşulları (ccr: H/I/N/Z/V/C özniteliklerine sahip nesne)
+_BRANCH_CONDITIONS = {
+    'BRA': lambda ccr: True,
+    'BHI': lambda ccr: not (ccr.C or ccr.Z),
+    'BLS': lambda ccr: ccr.C or ccr.Z,
+    'BCC': lambda ccr: not ccr.C,
+    'BCS': lambda ccr: ccr.C,
+    'BNE': lambda ccr: not ccr.Z,
+    'BEQ': lambda ccr: ccr.Z,
+    'BVC': lambda ccr: not ccr.V,
+    'BVS': lambda ccr: ccr.V,
+    'BPL': lambda ccr: not ccr.N,
+    'BMI': lambda ccr: ccr.N,
+    'BGE': lambda ccr: ccr.N == ccr.V,
+    'BLT': lambda ccr: ccr.N != ccr.V,
+    'BGT': lambda ccr: not ccr.Z and ccr.N == ccr.V,
+    'BLE': lambda ccr: ccr.Z or ccr.N != ccr.V,
+    'BSR': lambda ccr: True,
 }
 
+def _build_instruction_set(spec):
+    """Kompakt spesifikasyonu INSTRUCTION_SET sözlüğüne çevirir; tutarsızlıkta ValueError fırlatır."""
+    instruction_set = {}
+    seen_opcodes = {}
+    for line in spec.splitlines():
+        if not line.strip() or line.startswith('#'):
+            continue
+        fields = line.split(None, 8)
+        if len(fields) != 9:
+            raise ValueError(f"Malformed instruction spec line: {line!r}")
+        mnemonic, cells, flags, desc = fields[0], fields[1:7], fields[7], fields[8]
+        flags_affected = [] if flags == '-' else [flag for flag in flags]
+        modes = {}
+        for mode, cell in zip(_SPEC_MODES, cells):
+            if cell == '-':
+                continue
+            opcode_str, cycles_str = cell.split('/')
+            opcode = int(opcode_str, 16)
+            if opcode in seen_opcodes:
+                raise ValueError(f"Opcode ${opcode:02X} defined for both {seen_opcodes[opcode]} and {mnemonic}")
+            seen_opcodes[opcode] = mnemonic
+            length = 3 if mode == MODE_IMMEDIATE and mnemonic in _WORD_IMMEDIATE else _MODE_LENGTHS[mode]
+            info = {'opcode': opcode, 'bytes': length, 'cycles': int(cycles_str),
+                    'flags_affected': list(flags_affected), 'desc': desc.strip()}
+            if mode == MODE_RELATIVE:
+                info['condition_true'] = _BRANCH_CONDITIONS[mnemonic]
+            modes[mode] = info
+        if not modes:
+            raise ValueError(f"Instruction {mnemonic} has no addressing modes")
+        instruction_set[mnemonic] = modes
+    return instruction_set
+
+INSTRUCTION_SET = _build_instruction_set(_INSTRUCTION_SPEC)
+OPCODE_COUNT = sum(len(modes) for modes in INSTRUCTION_SET.values()) # M6800: 197 geçerli opcode
+
+# Kontrol akışı sınıfları (peephole ve statik zamanlama analizi kullanır).
+# M6800'de branch'in süresi dallanıp dallanmamasından bağımsızdır (4 cycle); en iyi/en kötü
+# durum farkı sadece izlenen yoldan ve uzun branch'e çevrilmiş komutlardan doğar.
+CONDITIONAL_BRANCHES = frozenset(m for m in _BRANCH_CONDITIONS if m not in ('BRA', 'BSR'))
+JUMPS = frozenset(('BRA', 'JMP'))
+CALLS = frozenset(('BSR', 'JSR'))
+RETURNS = frozenset(('RTS', 'RTI'))
+INTERRUPTS = frozenset(('SWI', 'WAI'))
+
 # Pseudo-işlemler (Assembler direktifleri)
 PSEUDO_OPS = {
     'ORG': {'params': 1, 'type': 'address', 'desc': "Set program origin"},
-    'END': {'params': 0, 'desc': "End of program"},
+    'END': {'params': '0_or_1', 'type': 'address', 'desc': "End of program (optional entry point)"},
     'EQU': {'params': 1, 'type': 'value', 'desc': "Equate symbol to value"}, # Label EQU Value
     'FCB': {'params': '1_or_more', 'type': 'byte_values', 'desc': "Form Constant Byte(s)"}, # BYTE
     'FDB': {'params': '1_or_more', 'type': 'word_values', 'desc': "Form Double Byte(s) / Form Constant Word"}, # WORD
     'RMB': {'params': 1, 'type': 'count', 'desc': "Reserve Memory Bytes"}, # RESB
-    # Diğer pseudo op'lar eklenebilir (örn: FCC - Form Constant Character string)
+    'FCC': {'params': '1_or_more', 'type': 'string', 'desc': "Form Constant Characters (\"string\"[,byte,...])"},
+    'FILL': {'params': 2, 'type': 'fill', 'desc': "Fill memory with a byte value (value, count)"},
+    'INCBIN': {'params': '1_or_more', 'type': 'binary_file', 'desc': "Include binary file (\"file\"[,offset[,length]])"},
+    'CYCLES': {'params': 2, 'type': 'assertion', 'desc': "Assert worst-case cycles of a routine (label, budget)"},
+    # Koşullu derleme (bkz. conditional.py); LC'yi etkilemez, kod üretmez
+    'IF': {'params': 1, 'type': 'condition', 'desc': "Assemble following lines if expression is non-zero"},
+    'IFDEF': {'params': 1, 'type': 'condition', 'desc': "Assemble following lines if symbol is defined"},
+    'IFNDEF': {'params': 1, 'type': 'condition', 'desc': "Assemble following lines if symbol is not defined"},
+    'ELSE': {'params': 0, 'type': 'condition', 'desc': "Invert the current conditional block"},
+    'ENDIF': {'params': 0, 'type': 'condition', 'desc': "End conditional block"},
+    # Diğer pseudo op'lar eklenebilir
 }
 
+# --- Kompakt op_info referansları ---
+# ParsedInstruction, op_info sözlüğünün kendisini değil, bu dondurulmuş tablodaki
+# küçük bir tamsayı indeksini saklar. Tablo, komut başına mod sözlüğünü, her modun
+# bilgisini ve direktif bilgilerini salt okunur (MappingProxyType) olarak içerir.
+def _build_op_info_table():
+    infos = []
+    for modes in INSTRUCTION_SET.values():
+        infos.append(modes)
+        infos.extend(modes.values())
+    infos.extend(PSEUDO_OPS.values())
+    return infos
+
+_OP_INFO_SOURCES = _build_op_info_table()
+OP_INFO_TABLE = tuple(MappingProxyType(info) for info in _OP_INFO_SOURCES)
+# Hem orijinal sözlük hem de proxy aynı indekse çözülür
+_OP_INFO_INDEX = {id(info): index for index, info in enumerate(_OP_INFO_SOURCES)}
+_OP_INFO_INDEX.update((id(proxy), index) for index, proxy in enumerate(OP_INFO_TABLE))
+
+def op_info_index(info):
+    """op_info sözlüğünün OP_INFO_TABLE'daki indeksini döndürür (None için -1)."""
+    if info is None:
+        return -1
+    try:
+        return _OP_INFO_INDEX[id(info)]
+    except KeyError:
+        raise ValueError("op_info is not an entry of the opcode table") from None
+
+# --- Düz (flat) arama tabloları ---
+# İç içe sözlükler yerine, import sırasında bir kez kurulan ve sonra değiştirilemeyen
+# tablolar. Assembler, simülatör ve UI aynı tabloları paylaşır:
+#   ENCODE_TABLE[(mnemonic, mod)] -> EncodeEntry(opcode, length, cycles)
+#   DECODE_TABLE[opcode]          -> DecodeEntry(mnemonic, mode, length, cycles, flags) veya None
+# DECODE_TABLE 256 elemanlı bir tuple'dır; opcode doğrudan indeks olarak kullanılır.
+# Tablolar birkaç yüz girdilik olduğu için kurulumları import süresini belirgin etkilemez.
+EncodeEntry = namedtuple('EncodeEntry', 'opcode length cycles')
+DecodeEntry = namedtuple('DecodeEntry', 'mnemonic mode length cycles flags')
+
+def _build_flat_tables():
+    encode = {}
+    decode = [None] * 256
+    for mnemonic, modes in INSTRUCTION_SET.items():
+        for mode, info in modes.items():
+            opcode = info.get('opcode')
+            if opcode is None:
+                continue
+            length = info.get('bytes', 1)
+            cycles = info.get('cycles', 1)
+            encode[(mnemonic, mode)] = EncodeEntry(opcode, length, cycles)
+            if decode[opcode] is None: # Aynı opcode iki kez tanımlıysa ilk tanım geçerli
+                decode[opcode] = DecodeEntry(mnemonic, mode, length, cycles,
+                                             frozenset(info.get('flags_affected', ())))
+    return MappingProxyType(encode), tuple(decode)
+
+ENCODE_TABLE, DECODE_TABLE = _build_flat_tables()
+MNEMONICS = frozenset(INSTRUCTION_SET)
+DIRECTIVES = frozenset(PSEUDO_OPS)
+
+def encode(mnemonic, mode):
+    """(mnemonic, mod) için EncodeEntry döndürür; tanımlı değilse None."""
+    return ENCODE_TABLE.get((mnemonic, mode))
+
+def decode(opcode):
+    """Opcode byte'ı için DecodeEntry döndürür; tanımsız opcode için None."""
+    return DECODE_TABLE[opcode & 0xFF]
+
 def get_instruction_info(mnemonic):
     """Verilen mnemonik için instruction setten bilgileri alır."""
-    return INSTRUCTION_SET.get(mnemonic.upper())
+    # Lexer mnemonikleri zaten büyük harfe çevirip intern ettiği için önce doğrudan arama yapılır
+    info = INSTRUCTION_SET.get(mnemonic)
+    return info if info is not None else INSTRUCTION_SET.get(mnemonic.upper())
 
 def get_pseudo_op_info(directive):
     """Verilen assembler direktifi için bilgileri alır."""
-    return PSEUDO_OPS.get(directive.upper())
+    info = PSEUDO_OPS.get(directive)
+    return info if info is not None else PSEUDO_OPS.get(directive.upper())
 
 # Test için örnek kullanım (bu dosya doğrudan çalıştırıldığında)
 if __name__ == "__main__":
     print("LDAA IMMED Opcode:", INSTRUCTION_SET['LDAA'][MODE_IMMEDIATE]['opcode'])
+    print("LDAA EXTND encoding:", encode('LDAA', MODE_EXTENDED))
+    print("Opcode $86 decodes to:", decode(0x86))
+    print("Defined opcodes:", sum(1 for entry in DECODE_TABLE if entry is not None))
     print("ORG params:", PSEUDO_OPS['ORG']['params'])
     print("BCC condition:", INSTRUCTION_SET['BCC'][MODE_RELATIVE]['desc'])
-    if INSTRUCTION_SET['BCC'][MODE_RELATIVE]['condition_true']({'C': False}): # Örnek CCR durumu
+    from types import SimpleNamespace
+    if INSTRUCTION_SET['BCC'][MODE_RELATIVE]['condition_true'](SimpleNamespace(C=False)): # Örnek CCR durumu
          print("BCC would branch if C=0")
@@ -0,0 +1,234 @@
+# m6800_sdk/assembler/peephole.py
+
+# Pass 1 ile Pass 2 arasında ParsedInstruction dizisi üzerinde çalışan isteğe bağlı
+# peephole optimizasyonu. Her kural, sonucun önceki kodla davranış ve (canlı olduğu
+# yerde) CCR flag'leri açısından eşdeğer olduğu durumlarda uygulanır:
+#
+#   LDAA #0 / LDAB #0      -> CLRA / CLRB   (sadece C flag'i sonrasında ölü ise)
+#   STAA M ; LDAA M        -> STAA M        (store, load ile aynı N/Z/V'yi üretir)
+#   JMP/BRA <sonraki komut> -> (kaldırılır)  (flag etkisi yok)
+#   JSR f ; RTS            -> JMP f         (tail call, flag etkisi yok)
+#   BSR f ; RTS            -> BRA f         (f dönüş adresini yığından okumamalı)
+#
+# İki komutluk kurallarda ikinci komut etiketsiz olmalıdır (başka yerden atlanılmamalı).
+# Flag canlılığı muhafazakâr hesaplanır: düz kodda ileriye doğru taranır; herhangi bir
+# kontrol transferi, veri direktifi veya hatalı satırda kalan flag'ler canlı kabul edilir.
+#
+# Not: 'STAA M ; LDAA M' kuralı M'nin sıradan bellek olduğunu varsayar; bellek
+# eşlemeli G/Ç yazmaçlarına yazıp tekrar okuyan kodda bu pass kullanılmamalıdır.
+
+from .expression import LC_SYMBOL, ExpressionError, symbols_in
+from .opcode_table import (get_instruction_info, CONDITIONAL_BRANCHES, JUMPS, CALLS, RETURNS, INTERRUPTS,
+                           MODE_IMMEDIATE, MODE_IMPLIED, MODE_DIRECT, MODE_EXTENDED, MODE_INDEXED)
+
+ALL_FLAGS = frozenset('HINZVC')
+
+# Komutun sonucunu hesaplarken okuduğu CCR flag'leri (yazdıkları opcode tablosundadır)
+FLAGS_READ = {
+    'ADCA': {'C'}, 'ADCB': {'C'}, 'SBCA': {'C'}, 'SBCB': {'C'},
+    'ROL': {'C'}, 'ROLA': {'C'}, 'ROLB': {'C'}, 'ROR': {'C'}, 'RORA': {'C'}, 'RORB': {'C'},
+    'DAA': {'H', 'C'}, 'TPA': ALL_FLAGS,
+    'BHI': {'C', 'Z'}, 'BLS': {'C', 'Z'}, 'BCC': {'C'}, 'BCS': {'C'},
+    'BNE': {'Z'}, 'BEQ': {'Z'}, 'BVC': {'V'}, 'BVS': {'V'}, 'BPL': {'N'}, 'BMI': {'N'},
+    'BGE': {'N', 'V'}, 'BLT': {'N', 'V'}, 'BGT': {'N', 'Z', 'V'}, 'BLE': {'N', 'Z', 'V'},
+}
+
+# Akışı düz koddan çıkaran komutlar: bunlardan sonrası bilinmez, flag'ler canlı sayılır
+CONTROL_TRANSFER = CONDITIONAL_BRANCHES | JUMPS | CALLS | RETURNS | INTERRUPTS
+
+# Store -> aynı yazmacı yükleyen komut
+_STORE_TO_LOAD = {'STAA': 'LDAA', 'STAB': 'LDAB', 'STX': 'LDX', 'STS': 'LDS'}
+_CLEAR_FOR_LOAD = {'LDAA': 'CLRA', 'LDAB': 'CLRB'}
+_MEMORY_MODES = (MODE_DIRECT, MODE_EXTENDED)
+
+class PeepholeOptimizer:
+    def __init__(self, symbol_table, labels, instruction_size):
+        """
+        symbol_table: çözülmüş sembol değerleri (Pass 1 sonrası)
+        labels: konuma bağlı semboller (etiket adları); bunlara bağlı sabitler yerleşimle değişebilir
+        instruction_size: pi -> byte uzunluğu (assembler'ın yerleşim kuralı)
+        """
+        self.symbol_table = symbol_table
+        self.labels = labels
+        self.instruction_size = instruction_size
+
+    def optimize(self, parsed_instructions):
+        """
+        Kuralları bir kez uygular ve komutları yerinde değiştirir (adresler güncel yerleşimden
+        alınır; assembler değişiklikten sonra yeniden yerleşim yapmalıdır).
+        Kaldırılan komutlar etiketi korunacak şekilde kod üretmeyen satıra çevrilir.
+        Döndürülen değer: [(satır_no, kural, kazanılan_byte, kazanılan_cycle), ...]
+        """
+        code = [pi for pi in parsed_instructions if pi.mnemonic is not None or pi.label is not None]
+        rewrites = []
+        for index, pi in enumerate(code):
+            if pi.error or pi.is_directive or pi.mnemonic is None or pi.relaxation == 'long_branch':
+                continue
+            following = self._next_instruction(code, index)
+            result = (self._clear_for_zero_load(code, index, pi)
+                      or self._redundant_load(pi, following)
+                      or self._jump_to_next(pi, following)
+                      or self._tail_call(pi, following))
+            if result:
+                rewrites.append((pi.line_number,) + result)
+        return rewrites
+
+    # --- Kurallar ---
+
+    def _clear_for_zero_load(self, code, index, pi):
+        clear = _CLEAR_FOR_LOAD.get(pi.mnemonic)
+        if clear is None or pi.addressing_mode != MODE_IMMEDIATE or self._constant(pi.operands[0]) != 0:
+            return None
+        # LDAA #0: N=0 Z=1 V=0, C değişmez. CLRA aynı N/Z/V'yi üretir ama C'yi sıfırlar.
+        if 'C' in self.live_flags_after(code, index, {'C'}):
+            return None
+        rule = f"{pi.mnemonic} #0 -> {clear}"
+        saved = self._replace(pi, clear, MODE_IMPLIED, ())
+        pi.note = _note(rule, *saved)
+        return (rule,) + saved
+
+    def _redundant_load(self, pi, following):
+        load = _STORE_TO_LOAD.get(pi.mnemonic)
+        if (load is None or following is None or following.mnemonic != load or following.label
+                or following.operands != pi.operands or not self._same_location_mode(pi, following)):
+            return None
+        # Store, yazmacın değerinden N/Z'yi hesaplar ve V'yi sıfırlar; aynı adresten yapılan
+        # load aynı değeri yükleyip aynı flag'leri üretir. Yazmaç ve flag'ler değişmez.
+        rule = f"{pi.mnemonic} M ; {load} M -> {pi.mnemonic} M"
+        saved = self._remove(following)
+        following.note = _note(f"redundant {load} removed", *saved)
+        return (rule,) + saved
+
+    def _jump_to_next(self, pi, following):
+        if pi.mnemonic not in ('JMP', 'BRA') or pi.addressing_mode == MODE_INDEXED:
+            return None
+        target = self._value(pi.operands[0], pi.address)
+        next_address = pi.address + self.instruction_size(pi)
+        if target is None or (target & 0xFFFF) != next_address:
+            return None
+        if following is not None and following.address != next_address:
+            return None
+        rule = f"{pi.mnemonic} to next instruction removed"
+        saved = self._remove(pi)
+        pi.note = _note(rule, *saved)
+        return (rule,) + saved
+
+    def _tail_call(self, pi, following):
+        if pi.mnemonic not in ('JSR', 'BSR') or following is None or following.mnemonic != 'RTS' or following.label:
+            return None
+        jump = 'JMP' if pi.mnemonic == 'JSR' else 'BRA'
+        rule = f"{pi.mnemonic} ; RTS -> {jump}"
+        saved_call = self._replace(pi, jump, pi.addressing_mode, pi.operands)
+        saved_rts = self._remove(following)
+        bytes_saved, cycles_saved = saved_call[0] + saved_rts[0], saved_call[1] + saved_rts[1]
+        pi.note = _note(rule, bytes_saved, cycles_saved)
+        following.note = "; peephole: tail call"
+        return (rule, bytes_saved, cycles_saved)
+
+    # --- Flag canlılığı ---
+
+    def live_flags_after(self, code, index, flags):
+        """
+        code[index] komutundan sonra, flags kümesindeki hangi flag'lerin yeniden yazılmadan
+        önce okunabileceğini (canlı olduğunu) muhafazakâr olarak döndürür.
+        """
+        remaining = set(flags)
+        live = set()
+        for pi in code[index + 1:]:
+            if pi.mnemonic is None: # Sadece etiket: düz akış devam eder
+                continue
+            if pi.error or pi.is_directive:
+                if pi.is_directive and pi.mnemonic == 'EQU' and not pi.error:
+                    continue
+                return live | remaining
+            if pi.mnemonic in CONTROL_TRANSFER:
+                return live | remaining
+            reads = FLAGS_READ.get(pi.mnemonic)
+            if reads:
+                live |= remaining & reads
+                remaining -= reads
+            remaining -= set(pi.op_info.get('flags_affected', ()))
+            if not remaining:
+                return live
+        return live | remaining
+
+    # --- Yardımcılar ---
+
+    @staticmethod
+    def _next_instruction(code, index):
+        """Sonraki kod satırı (etiket-only satırlar dahil); yoksa None."""
+        return code[index + 1] if index + 1 < len(code) else None
+
+    @staticmethod
+    def _same_location_mode(store, load):
+        if store.addressing_mode in _MEMORY_MODES:
+            return load.addressing_mode in _MEMORY_MODES # Direct/Extended seçimi aynı adresi gösterir
+        return store.addressing_mode == MODE_INDEXED and load.addressing_mode == MODE_INDEXED
+
+    def _constant(self, expression):
+        """Yerleşimden bağımsız bir ifadenin değeri; etikete veya '*'a bağlıysa None."""
+        if _contains_lc(expression) or symbols_in(expression) & self.labels:
+            return None
+        return self._value(expression, 0)
+
+    def _value(self, expression, location_counter):
+        try:
+            return self.symbol_table.evaluate(expression, location_counter)
+        except ExpressionError:
+            return None
+
+    def _replace(self, pi, mnemonic, mode, operands):
+        """Komutu başka bir komutla değiştirir. Döndürülen değer: (byte, cycle) kazancı."""
+        old_bytes, old_cycles = self.instruction_size(pi), pi.op_info.get('cycles', 0)
+        pi.mnemonic = mnemonic
+        pi.addressing_mode = mode
+        pi.operands = tuple(operands)
+        pi.op_info = get_instruction_info(mnemonic)[mode]
+        return old_bytes - self.instruction_size(pi), old_cycles - pi.op_info.get('cycles', 0)
+
+    def _remove(self, pi):
+        """Komutu kod üretmeyen satıra çevirir (etiketi korunur). Döndürülen değer: (byte, cycle) kazancı."""
+        saved = self.instruction_size(pi), pi.op_info.get('cycles', 0)
+        pi.mnemonic = None
+        pi.addressing_mode = None
+        pi.operands = ()
+        pi.op_info = None
+        pi.relaxation = None
+        return saved
+
+def _note(rule, bytes_saved, cycles_saved):
+    """Listing'de değiştirilen satırın yanına yazılan açıklama."""
+    return f"; peephole: {rule} (-{bytes_saved} byte, -{cycles_saved} cycle)"
+
+def _contains_lc(node):
+    if isinstance(node, str):
+        return node == LC_SYMBOL
+    if isinstance(node, tuple):
+        return any(_contains_lc(child) for child in node[1:])
+    return False
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    import textwrap # Örnekler girintili yazıldı; etiketler 1. sütuna gelsin
+    from .assembler import Assembler
+
+    sample_code = textwrap.dedent("""
+            ORG  $0100
+    START   LDAA #0          ; C sonra ADCA tarafından okunuyor -> değişmez
+            ADCA #1
+            LDAB #0          ; C sonra CLC ile yazılıyor -> CLRB
+            CLC
+            STAA $40
+            LDAA $40         ; gereksiz
+            JMP  NEXT        ; bir sonraki komuta atlama
+    NEXT    JSR  SUB
+            RTS              ; JSR+RTS -> JMP
+    SUB     INCA
+            RTS
+            END  START
+    """)
+    assembler = Assembler(peephole=True)
+    success, segments, listing, errors = assembler.assemble(sample_code)
+    for row in listing:
+        print(f"{row[0]}\t{row[1]:<10}\t{row[2]:<30}\t{row[3]}")
+    print(errors)
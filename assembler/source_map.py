@@ -0,0 +1,140 @@
+# m6800_sdk/assembler/source_map.py
+
+# Adres <-> kaynak satırı eşlemesi. Listing string tuple'larından oluştuğu için PC'den
+# satıra gitmek doğrusal tarama ve hex string ayrıştırması gerektiriyordu; SourceMap
+# Pass 2'de byte üreten her satırı kaydeder ve iki yönde de bisect ile O(log n) arama sağlar.
+#
+# Veriler sıkıştırılmış array'lerde tutulur (kayıt başına ~14 byte):
+#   ileri yön: adrese göre sıralı başlangıç adresleri, uzunluklar, satır numaraları, dosya id'leri
+#   geri yön: (dosya id, satır) sırasına göre sıralı satırlar ve adresleri
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+class SourceMap:
+    def __init__(self, files=None):
+        self.files = list(files) if files else ["<source>"] # dosya id -> dosya adı
+        # Pass 2 sırasında kayıtlar kaynak sırasıyla eklenir; finalize() adrese göre sıralar
+        self._addresses = array('I') # 16-bit alanı aşan (taşan) programlarda da çalışsın
+        self._lengths = array('I') # INCBIN/FILL satırları 64 KB'ı aşabilir
+        self._lines = array('I')
+        self._file_ids = array('H')
+        self._line_index = {} # Geri yön: dosya_id -> (sıralı satırlar, adresler)
+
+    def add(self, address, length, line_number, file_id=0):
+        """address'ten başlayan length byte'ı kaynak satırına bağlar (Pass 2 sırasında)."""
+        if length > 0:
+            self._addresses.append(address)
+            self._lengths.append(length)
+            self._lines.append(line_number)
+            self._file_ids.append(file_id)
+
+    def finalize(self):
+        """Geri yön indeksini kurar ve kayıtları adrese göre sıralar; sorgulardan önce bir kez çağrılır."""
+        # Geri yön: kaynak sırası zaten dosya içinde satır sırasıdır
+        order = range(len(self._lines))
+        if not _is_sorted(self._lines) or len(self.files) > 1:
+            order = sorted(order, key=lambda i: (self._file_ids[i], self._lines[i]))
+        self._line_index = {}
+        for i in order:
+            lines, addresses = self._line_index.setdefault(self._file_ids[i], (array('I'), array('I')))
+            if lines and lines[-1] == self._lines[i]:
+                continue
+            lines.append(self._lines[i])
+            addresses.append(self._addresses[i])
+
+        # İleri yön: ORG ile geriye dönen kaynaklarda adresler sıralı olmayabilir
+        if not _is_sorted(self._addresses):
+            order = sorted(range(len(self._addresses)), key=self._addresses.__getitem__)
+            self._addresses, self._lengths, self._lines, self._file_ids = (
+                array(column.typecode, (column[i] for i in order))
+                for column in (self._addresses, self._lengths, self._lines, self._file_ids))
+        return self
+
+    def __len__(self):
+        return len(self._addresses)
+
+    def lookup_address(self, address):
+        """
+        address'i içeren satırın (dosya_adı, satır_no, başlangıç_adresi) bilgisini döndürür.
+        Adres bir komutun ortasına (operand byte'ına) denk gelse de o komutun satırı bulunur.
+        Eşleşme yoksa None.
+        """
+        index = bisect_right(self._addresses, address) - 1
+        if index < 0:
+            return None
+        start = self._addresses[index]
+        if address >= start + self._lengths[index]:
+            return None
+        return self.files[self._file_ids[index]], self._lines[index], start
+
+    def line_for_address(self, address):
+        """address'teki komutun satır numarası; yoksa None."""
+        found = self.lookup_address(address)
+        return found[1] if found else None
+
+    def address_for_line(self, line_number, file_id=0, exact=False):
+        """
+        Satırın ürettiği ilk byte'ın adresi. exact=False iken satır kod üretmiyorsa
+        (yorum, etiket, boş satır) sonraki ilk kod satırının adresi döndürülür.
+        Bulunamazsa None.
+        """
+        index_for_file = self._line_index.get(file_id)
+        if not index_for_file:
+            return None
+        lines, addresses = index_for_file
+        index = bisect_left(lines, line_number)
+        if index == len(lines) or (exact and lines[index] != line_number):
+            return None
+        return addresses[index]
+
+    def to_state(self):
+        """Önbellek için kompakt durum: array'ler ham byte olarak (bkz. cache.py)."""
+        return (self.files, self._addresses.tobytes(), self._lengths.tobytes(), self._lines.tobytes(),
+                self._file_ids.tobytes(),
+                {file_id: (lines.tobytes(), addresses.tobytes())
+                 for file_id, (lines, addresses) in self._line_index.items()})
+
+    @classmethod
+    def from_state(cls, state):
+        files, addresses, lengths, lines, file_ids, line_index = state
+        source_map = cls(files)
+        source_map._addresses.frombytes(addresses)
+        source_map._lengths.frombytes(lengths)
+        source_map._lines.frombytes(lines)
+        source_map._file_ids.frombytes(file_ids)
+        for file_id, (index_lines, index_addresses) in line_index.items():
+            source_map._line_index[file_id] = (array('I', index_lines), array('I', index_addresses))
+        return source_map
+
+    def iter_entries(self):
+        """Adres sırasıyla (adres, uzunluk, satır, dosya_id) üretir."""
+        return zip(self._addresses, self._lengths, self._lines, self._file_ids)
+
+def _is_sorted(values):
+    return all(values[i] <= values[i + 1] for i in range(len(values) - 1))
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    import textwrap # Örnekler girintili yazıldı; etiketler 1. sütuna gelsin
+    from .assembler import Assembler
+
+    sample_code = textwrap.dedent("""
+            ORG  $0100
+    START   LDAA #$05
+    LOOP    DECA            ; geri sayım
+            BNE  LOOP
+    * yorum satırı
+            STAA $2000
+            FCB  1,2,3
+            END  START
+    """)
+    assembler = Assembler()
+    assembler.assemble(sample_code)
+    source_map = assembler.source_map
+    for address, length, line_number, file_id in source_map.iter_entries():
+        print(f"${address:04X} +{length} -> line {line_number}")
+    print("PC $0104 (BNE operand) ->", source_map.lookup_address(0x0104))
+    print("line 6 (comment) ->", f"${source_map.address_for_line(6):04X}")
+    print("line 6 exact ->", source_map.address_for_line(6, exact=True))
+    print("PC $0200 ->", source_map.lookup_address(0x0200))
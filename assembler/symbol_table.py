@@ -1,6 +1,12 @@
+from .expression import evaluate, symbols_in, ExpressionError, UndefinedSymbolError
+
 class SymbolTable:
     def __init__(self):
         self._symbols = {}  # Sembol adı -> adres eşlemesi
+        # EQU gibi ifadeyle tanımlanan semboller: ad -> (AST, tanım anındaki LC, satır no)
+        # Bunlar bağımlılık grafiği üzerinden topolojik sırayla çözülür.
+        self._expressions = {}
+        self._resolve_order = None # Topolojik sıra önbelleği (grafik değişince sıfırlanır)
 
     def add_symbol(self, name, address):
         """Sembol tablosuna yeni bir sembol ekler."""
@@ -12,6 +18,21 @@ class SymbolTable:
             pass # Ya da hata yönetimi eklenir
         self._symbols[name] = address
 
+    def add_expression(self, name, expression, location_counter=0, line_number=0):
+        """
+        Değeri bir ifadeye bağlı olan sembolü (örn: ENDIT EQU MYLOOP+2) kaydeder.
+        Değer, resolve_expressions() çağrıldığında bağımlılık sırasıyla hesaplanır.
+        """
+        name = name.upper()
+        previous = self._expressions.get(name)
+        self._expressions[name] = (expression, location_counter, line_number)
+        if previous is None or previous[0] is not expression:
+            self._resolve_order = None # Bağımlılık grafiği değişti
+
+    def remove_symbol(self, name):
+        """Sembolün değerini tablodan kaldırır (yoksa bir şey yapmaz)."""
+        self._symbols.pop(name.upper(), None)
+
     def get_address(self, name):
         """Verilen sembol adının adresini döndürür."""
         name = name.upper()
@@ -20,7 +41,77 @@ class SymbolTable:
     def has_symbol(self, name):
         """Verilen sembolün tabloda olup olmadığını kontrol eder."""
         name = name.upper()
-        return name in self._symbols
+        return name in self._symbols or name in self._expressions
+
+    def lookup(self, name):
+        """expression.evaluate için: değeri döndürür, yoksa UndefinedSymbolError fırlatır."""
+        value = self._symbols.get(name)
+        if value is None:
+            raise UndefinedSymbolError(name)
+        return value
+
+    def evaluate(self, expression, location_counter=0):
+        """Bir operand ifadesini mevcut sembol değerleriyle hesaplar."""
+        return evaluate(expression, self.lookup, location_counter)
+
+    def _topological_order(self, roots):
+        """
+        İfade sembollerini, bağımlılıkları kendilerinden önce gelecek şekilde sıralar
+        (iteratif DFS, post-order). Döngüsel tanımlar ayrıca raporlanır.
+        Döndürülen değer: (sıralı_adlar, döngüdeki_adlar)
+        """
+        order = []
+        cyclic = set()
+        state = {} # ad -> 1 (ziyarette), 2 (bitti)
+        for root in roots:
+            if root in state or root not in self._expressions:
+                continue
+            stack = [(root, iter(symbols_in(self._expressions[root][0])))]
+            state[root] = 1
+            while stack:
+                name, deps = stack[-1]
+                for dep in deps:
+                    if dep not in self._expressions:
+                        continue # Etiket veya sabit; grafikte düğüm değil
+                    dep_state = state.get(dep)
+                    if dep_state is None:
+                        state[dep] = 1
+                        stack.append((dep, iter(symbols_in(self._expressions[dep][0]))))
+                        break
+                    elif dep_state == 1: # Geri kenar -> döngü
+                        cyclic.update(n for n, _ in stack[[n for n, _ in stack].index(dep):])
+                else:
+                    stack.pop()
+                    state[name] = 2
+                    order.append(name)
+        return order, cyclic
+
+    def resolve_expressions(self, roots=None):
+        """
+        İfadeyle tanımlanmış sembolleri tek bir doğrusal geçişte, topolojik sırayla çözer.
+        roots verilirse sadece o sembollerin bağımlılık alt grafiği çözülür.
+        Döndürülen değer: [(ad, satır_no, hata_mesajı), ...]
+        """
+        if roots is None:
+            if self._resolve_order is None:
+                self._resolve_order = self._topological_order(list(self._expressions))
+            order, cyclic = self._resolve_order
+        else:
+            order, cyclic = self._topological_order([r.upper() for r in roots])
+
+        errors = []
+        for name in order:
+            expression, lc, line_number = self._expressions[name]
+            if name in cyclic:
+                self._symbols.pop(name, None)
+                errors.append((name, line_number, f"Circular definition of symbol '{name}'."))
+                continue
+            try:
+                self._symbols[name] = self.evaluate(expression, lc)
+            except ExpressionError as e:
+                self._symbols.pop(name, None)
+                errors.append((name, line_number, f"Cannot resolve '{name}': {e}"))
+        return errors
 
     def get_all_symbols(self):
         """Tüm sembolleri ve adreslerini bir sözlük olarak döndürür."""
@@ -29,16 +120,22 @@ class SymbolTable:
     def clear(self):
         """Sembol tablosunu temizler."""
         self._symbols.clear()
+        self._expressions.clear()
+        self._resolve_order = None
 
     def __str__(self):
         return f"SymbolTable({self._symbols})"
 
 # Test için örnek kullanım
 if __name__ == "__main__":
+    from .expression import parse_expression
     st = SymbolTable()
     st.add_symbol("LOOP", 0x0100)
     st.add_symbol("DATA", 0x02A0)
+    st.add_expression("ENDIT", parse_expression("NEXT+1"))
+    st.add_expression("NEXT", parse_expression("LOOP+2"))
+    print(st.resolve_expressions())
     print(st.get_address("LOOP"))
     print(st.get_address("UNKNOWN"))
     print(st.has_symbol("DATA"))
-    print(st) 
+    print(st)
@@ -1,106 +1,137 @@
 import re
-from .opcode_table import get_instruction_info, get_pseudo_op_info, MODE_IMPLIED, MODE_IMMEDIATE, MODE_DIRECT, MODE_EXTENDED, MODE_INDEXED, MODE_RELATIVE
+import sys
+from .opcode_table import OP_INFO_TABLE, op_info_index, get_instruction_info, get_pseudo_op_info, MODE_IMPLIED, MODE_IMMEDIATE, MODE_DIRECT, MODE_EXTENDED, MODE_INDEXED, MODE_RELATIVE
 from .lexical_analyzer import Token # Token sınıfını kullanacağız
+from .expression import parse_expression, ExpressionError
 
 class ParsedInstruction:
     """
     Sözdizimi analizinden geçmiş bir komutu veya direktifi temsil eder.
     Adresleme modu, çözümlenmiş operandlar gibi ek bilgiler içerir.
+    Token nesnesinin kendisi saklanmaz; sadece Pass 1/Pass 2'nin ihtiyaç duyduğu
+    satır numarası, etiket ve (listing için) kaynak satırı kopyalanır.
+    Büyük kaynaklarda yüz binlerce örnek oluştuğu için __slots__ kullanılır ve
+    op_info sözlüğü yerine opcode tablosundaki indeksi tutulur.
     """
+    __slots__ = ('line_number', 'label', 'source_line', 'is_directive', 'mnemonic', 'addressing_mode',
+                 'operands', '_op_index', 'error', 'address', 'relaxation', 'note')
+
     def __init__(self, token, is_directive=False, mnemonic=None, addressing_mode=None, operands=None, op_info=None, error=None, address=0): # address eklendi
-        self.token = token # Orijinal Token nesnesi
+        self.line_number = token.line_number
+        self.label = token.label
+        self.source_line = token.original_line # Listing gerekmiyorsa assembler None yapar
         self.is_directive = is_directive
-        self.mnemonic = mnemonic.upper() if mnemonic else (token.mnemonic.upper() if token.mnemonic else None)
+        self.mnemonic = sys.intern(mnemonic.upper()) if mnemonic else token.mnemonic
         self.addressing_mode = addressing_mode
-        self.operands = operands if operands is not None else [] # [(type, value), ...] veya direkt değer listesi
-        self.op_info = op_info # opcode_table'dan gelen instruction/directive bilgisi
+        self.operands = tuple(operands) if operands else () # Değer listesi (sabit int veya ifade AST'si)
+        self._op_index = op_info_index(op_info) # opcode_table.OP_INFO_TABLE içindeki indeks
         self.error = error # Eğer syntax hatası varsa
         self.address = address # Komutun/direktifin Pass 1'deki adresi
+        self.relaxation = None # Pass 1'de uygulanan boyut optimizasyonu (örn: 'direct')
+        self.note = None # Optimizasyon pass'lerinin listing'e yazdığı açıklama (örn: peephole)
+
+    @property
+    def op_info(self):
+        """opcode_table'dan gelen instruction/directive bilgisi (salt okunur)."""
+        return OP_INFO_TABLE[self._op_index] if self._op_index >= 0 else None
+
+    @op_info.setter
+    def op_info(self, info):
+        self._op_index = op_info_index(info)
 
     def __repr__(self):
         return (f"ParsedInstruction(Addr={self.address:04X}, Mnem='{self.mnemonic}', Mode='{self.addressing_mode}', "
-                f"Ops={self.operands}, Err='{self.error}', Orig='{self.token.original_line}')")
+                f"Ops={list(self.operands)}, Err='{self.error}', Orig='{self.source_line}')")
 
 class SyntaxAnalyzer:
     def __init__(self, opcode_table_module):
         self.opcode_table = opcode_table_module # opcode_table.py modülünün kendisi
         # Regex tanımları
-        self.imm_regex = re.compile(r"^#(?:\$([0-9A-Fa-f]{1,2})|%([01]{1,8})|(\d{1,3})|'(.)')$")
-        self.idx_regex = re.compile(r"^(?:\$([0-9A-Fa-f]{1,2})|(\d{1,3})),\s*X$", re.IGNORECASE)
-        self.hex_addr_regex = re.compile(r"^\$([0-9A-Fa-f]{1,4})$")
-        self.label_regex = re.compile(r"^([a-zA-Z_][a-zA-Z0-9_]*)$")
-        self.dec_num_regex = re.compile(r"^(\d+)$")
-
-        self.value_list_regex = re.compile(r"\s*,\s*")
-
+        self.idx_regex = re.compile(r"^(.*?),\s*X$", re.IGNORECASE) # <ifade>,X veya ,X
+
+    def _split_operands(self, operands_raw_str):
+        """Operand string'ini virgüllerden böler; tırnak içindeki virgülleri dikkate almaz."""
+        parts = []
+        current = []
+        in_quote = None
+        for ch in operands_raw_str:
+            if in_quote:
+                current.append(ch)
+                if ch == in_quote:
+                    in_quote = None
+            elif ch in "'\"":
+                in_quote = ch
+                current.append(ch)
+            elif ch == ',':
+                parts.append("".join(current).strip())
+                current = []
+            else:
+                current.append(ch)
+        parts.append("".join(current).strip())
+        return parts
 
     def _parse_operand_value(self, operand_str):
+        """
+        Tek bir komut operandını çözümler.
+        Döndürülen değer: (tip, ifade_AST) -> tip: 'immediate', 'indexed', 'expression' veya 'error'
+        """
         operand_str = operand_str.strip()
-
-        # 1. Anında Değerler (# ile başlar)
-        m_imm = self.imm_regex.match(operand_str)
-        if m_imm:
-            if m_imm.group(1): return 'imm_hex', int(m_imm.group(1), 16)
-            elif m_imm.group(2): return 'imm_bin', int(m_imm.group(2), 2)
-            elif m_imm.group(3): return 'imm_dec', int(m_imm.group(3))
-            elif m_imm.group(4): return 'imm_char', ord(m_imm.group(4))
-            return 'error', "Invalid immediate format"
-
-        # 2. İndeksli Değerler (,X ile biter)
-        m_idx = self.idx_regex.match(operand_str)
-        if m_idx:
-            offset_val = None
-            if m_idx.group(1): offset_val = int(m_idx.group(1), 16) # Hex offset
-            elif m_idx.group(2): offset_val = int(m_idx.group(2))   # Decimal offset
-            if offset_val is not None and 0 <= offset_val <= 255:
-                return 'indexed', offset_val
-            else:
-                return 'error', f"Invalid or out-of-range indexed offset: {operand_str}"
-
-        # 3. Hex Adres ($ ile başlar)
-        m_hex_addr = self.hex_addr_regex.match(operand_str)
-        if m_hex_addr:
-            hex_val_str = m_hex_addr.group(1)
-            val = int(hex_val_str, 16)
-            # Adres aralığına göre direct/extended ayrımı CodeGenerator'da yapılmalı.
-            # Şimdilik sadece hex adres olduğunu belirtelim.
-            # if len(hex_val_str) <= 2 and 0 <= val <= 0xFF: return 'address_direct_hex', val
-            # elif 0 <= val <= 0xFFFF: return 'address_extended_hex', val
-            if 0 <= val <= 0xFFFF: return 'hex_address', val # Genel hex adres tipi
-            else: return 'error', f"Hex address out of 16-bit range: {operand_str}"
-
-        # 4. Düz Decimal Sayı (Sadece rakamlardan oluşuyorsa)
-        m_dec_num = self.dec_num_regex.match(operand_str)
-        if m_dec_num:
-            val = int(m_dec_num.group(1))
-            # Komutlar için bu adres olabilir, direktifler için sayı.
-            return 'decimal_value', val
-
-        # 5. Etiket (Diğerlerine uymuyorsa ve geçerli etiket formatındaysa)
-        m_label = self.label_regex.match(operand_str)
-        if m_label:
-            return 'label', m_label.group(1).upper()
-
-        return 'unknown', operand_str # Hiçbirine uymadıysa
+        try:
+            # 1. Anında Değerler (# ile başlar)
+            if operand_str.startswith('#'):
+                return 'immediate', parse_expression(operand_str[1:])
+
+            # 2. İndeksli Değerler (,X ile biter). Offset boşsa 0 kabul edilir.
+            m_idx = self.idx_regex.match(operand_str)
+            if m_idx:
+                offset_str = m_idx.group(1).strip()
+                return 'indexed', parse_expression(offset_str) if offset_str else 0
+
+            # 3. Adres / etiket / ifade (direct, extended veya relative olarak kullanılır)
+            return 'expression', parse_expression(operand_str)
+        except ExpressionError as e:
+            return 'error', str(e)
 
     def _parse_operands_string(self, operands_raw_str):
-        """Ham operand string'ini [(type, value), ...] listesine çevirir."""
+        """Direktif operandlarını [(type, value), ...] listesine çevirir (her biri bir ifade)."""
         parsed_ops_list_of_tuples = []
         if not operands_raw_str:
             return parsed_ops_list_of_tuples
 
-        op_parts = [op.strip() for op in self.value_list_regex.split(operands_raw_str) if op.strip()]
-
-        for op_str in op_parts:
-            op_type, op_value = self._parse_operand_value(op_str)
-            if op_type == 'error':
+        for op_str in self._split_operands(operands_raw_str):
+            if not op_str:
+                return [('error', f"Empty operand in '{operands_raw_str}'")]
+            try:
+                parsed_ops_list_of_tuples.append(('expression', parse_expression(op_str)))
+            except ExpressionError as e:
                 # Hata varsa, hatalı değeri ve mesajı içeren tek bir tuple döndür.
-                return [('error', op_value)]
-            parsed_ops_list_of_tuples.append((op_type, op_value))
+                return [('error', str(e))]
         return parsed_ops_list_of_tuples
 
 
+    def _parse_data_operands(self, operands_raw_str):
+        """
+        FCC/INCBIN operandları: "..." string'leri ('string', metin), diğerleri ('expression', AST) olur.
+        Hata varsa tek elemanlı [('error', mesaj)] döndürür.
+        """
+        parsed_ops_list_of_tuples = []
+        for op_str in self._split_operands(operands_raw_str):
+            if not op_str:
+                return [('error', f"Empty operand in '{operands_raw_str}'")]
+            if op_str[0] == '"':
+                if len(op_str) < 2 or op_str[-1] != '"':
+                    return [('error', f"Unterminated string {op_str}")]
+                parsed_ops_list_of_tuples.append(('string', op_str[1:-1]))
+                continue
+            try:
+                parsed_ops_list_of_tuples.append(('expression', parse_expression(op_str)))
+            except ExpressionError as e:
+                return [('error', str(e))]
+        return parsed_ops_list_of_tuples
+
     def parse_token(self, token: Token):
+        if token.error: # Lexer satırı parçalayamadı
+            return ParsedInstruction(token, error=f"Lexical error: {token.error}")
         if not token.mnemonic:
             if token.label and not token.comment and not token.operands_raw_str:
                 return ParsedInstruction(token, mnemonic=None)
@@ -113,36 +144,25 @@ class SyntaxAnalyzer:
         op_info_pseudo = self.opcode_table.get_pseudo_op_info(mnemonic)
 
         if op_info_instr: # Bu bir M6800 komutu
-            parsed_ops_tuples = self._parse_operands_string(token.operands_raw_str)
-
-            if parsed_ops_tuples and parsed_ops_tuples[0][0] == 'error':
-                return ParsedInstruction(token, mnemonic=mnemonic, error=f"Operand error: {parsed_ops_tuples[0][1]}")
-
             addressing_mode = None
-            # Komutlar genellikle tek operand alır veya implied'dır.
-            # ParsedInstruction.operands sadece çözümlenmiş değeri (veya etiket adını) tutacak.
+            # Komutlar tek operand alır veya implied'dır.
+            # ParsedInstruction.operands sadece çözümlenmiş değeri (sabit int veya ifade AST'si) tutacak.
             final_operand_value = None
-            if parsed_ops_tuples:
-                final_operand_value = parsed_ops_tuples[0][1] # İlk operandın değeri
-                op_type = parsed_ops_tuples[0][0]
+            if token.operands_raw_str:
+                op_type, final_operand_value = self._parse_operand_value(token.operands_raw_str)
+                if op_type == 'error':
+                    return ParsedInstruction(token, mnemonic=mnemonic, error=f"Operand error: {final_operand_value}")
 
-                if op_type.startswith('imm_') and MODE_IMMEDIATE in op_info_instr:
+                if op_type == 'immediate' and MODE_IMMEDIATE in op_info_instr:
                     addressing_mode = MODE_IMMEDIATE
                 elif op_type == 'indexed' and MODE_INDEXED in op_info_instr:
                     addressing_mode = MODE_INDEXED
-                elif op_type == 'label':
+                elif op_type == 'expression':
                     if MODE_RELATIVE in op_info_instr: addressing_mode = MODE_RELATIVE
-                    # Etiket direct/extended için olabilir. Bu ayrım Pass2/CodeGen'de yapılır.
-                    # Şimdilik komutun bu tür adreslemeyi desteklediğini varsayalım.
+                    # Etiket/adres direct veya extended olabilir. Bu ayrım Pass2/CodeGen'de yapılır.
                     elif MODE_EXTENDED in op_info_instr: addressing_mode = MODE_EXTENDED
                     elif MODE_DIRECT in op_info_instr: addressing_mode = MODE_DIRECT
-                    else: return ParsedInstruction(token, mnemonic=mnemonic, error=f"Label operand not supported by {mnemonic}")
-                elif op_type == 'hex_address' or op_type == 'decimal_value': # $XXXX or DDDD
-                    # Adresin direct mi extended mı olduğuna Pass2/CodeGen karar verir.
-                    # Komutun bu tür adreslemeyi desteklediğini kontrol et.
-                    if MODE_EXTENDED in op_info_instr: addressing_mode = MODE_EXTENDED
-                    elif MODE_DIRECT in op_info_instr: addressing_mode = MODE_DIRECT
-                    else: return ParsedInstruction(token, mnemonic=mnemonic, error=f"Numeric address not supported by {mnemonic}")
+                    else: return ParsedInstruction(token, mnemonic=mnemonic, error=f"Address operand not supported by {mnemonic}")
                 # Diğer op_type'lar için hata
                 elif addressing_mode is None : # Eşleşen mod yoksa
                      return ParsedInstruction(token, mnemonic=mnemonic, error=f"Invalid operand type '{op_type}' for {mnemonic}")
@@ -170,35 +190,62 @@ class SyntaxAnalyzer:
             error_msg = None
             op_parts_tuples = []
             if token.operands_raw_str:
-                op_parts_tuples = self._parse_operands_string(token.operands_raw_str)
+                if mnemonic in ('FCC', 'INCBIN'):
+                    op_parts_tuples = self._parse_data_operands(token.operands_raw_str)
+                else:
+                    op_parts_tuples = self._parse_operands_string(token.operands_raw_str)
                 if op_parts_tuples and op_parts_tuples[0][0] == 'error':
                     return ParsedInstruction(token, is_directive=True, mnemonic=mnemonic, op_info=op_info_pseudo, error=f"Operand error: {op_parts_tuples[0][1]}")
 
-            # Direktiflere özel operand işleme
+            # Direktiflere özel operand işleme. Tüm değerler ifade AST'si (veya sabit int) olarak saklanır.
             if mnemonic == 'EQU':
                 if token.label and len(op_parts_tuples) == 1:
-                    op_type, op_val = op_parts_tuples[0]
-                    if op_type not in ['error', 'unknown', 'indexed']: # EQU sayı, hex adres, etiket alabilir
-                        directive_operands.append(op_val)
-                    else: error_msg = f"Invalid value for EQU: type '{op_type}' for '{op_val}'"
+                    directive_operands.append(op_parts_tuples[0][1])
                 else: error_msg = "EQU directive requires a label and exactly one value operand."
             elif mnemonic in ['FCB', 'FDB']:
                 for op_type, op_val in op_parts_tuples:
-                    if op_type.startswith('imm_') or op_type == 'hex_address' or op_type == 'decimal_value' or op_type == 'label':
-                        directive_operands.append(op_val)
-                    else: error_msg = f"Invalid value type '{op_type}' for {mnemonic} operand '{op_val}'"; break
+                    directive_operands.append(op_val)
+            elif mnemonic == 'FCC':
+                # FCC "metin"[,byte,...]: string'ler bytes olarak, diğer değerler FCB gibi ifade olarak saklanır
+                for op_type, op_val in op_parts_tuples:
+                    if op_type == 'string':
+                        try:
+                            op_val = op_val.encode('latin-1')
+                        except UnicodeEncodeError:
+                            error_msg = f"FCC string contains characters outside 8-bit range: \"{op_val}\""
+                            break
+                    directive_operands.append(op_val)
+            elif mnemonic == 'INCBIN':
+                # INCBIN "dosya"[,offset[,uzunluk]]: yol str olarak saklanır, Pass 1'de çözülür (bkz. Assembler)
+                if not op_parts_tuples or op_parts_tuples[0][0] != 'string':
+                    error_msg = 'INCBIN directive expects a quoted file name: INCBIN "file"[,offset[,length]]'
+                elif len(op_parts_tuples) > 3 or any(op_type != 'expression' for op_type, _ in op_parts_tuples[1:]):
+                    error_msg = "INCBIN directive expects a file name and at most an offset and a length."
+                else:
+                    directive_operands = [op_val for _, op_val in op_parts_tuples]
+            elif mnemonic == 'FILL':
+                # FILL değer,adet: adet Pass 1'de (RMB gibi) hesaplanabilir olmalı
+                directive_operands = [op_val for _, op_val in op_parts_tuples]
             elif mnemonic == 'RMB' or mnemonic == 'ORG':
                 if len(op_parts_tuples) == 1:
-                    op_type, op_val = op_parts_tuples[0]
-                    if op_type == 'decimal_value' or op_type == 'hex_address' or op_type == 'label':
-                        if op_type == 'decimal_value' and not (isinstance(op_val, int) and op_val >=0):
-                             error_msg = f"{mnemonic} expects a non-negative integer, got '{op_val}'"
-                        else:
-                            directive_operands.append(op_val)
-                    else: error_msg = f"Invalid value type '{op_type}' for {mnemonic}: '{op_val}'"
+                    op_val = op_parts_tuples[0][1]
+                    if isinstance(op_val, int) and op_val < 0:
+                        error_msg = f"{mnemonic} expects a non-negative value, got '{op_val}'"
+                    else:
+                        directive_operands.append(op_val)
                 else: error_msg = f"{mnemonic} directive expects 1 argument."
+            elif mnemonic == 'CYCLES':
+                # CYCLES RUTİN,BÜTÇE: rutinin en kötü durum süresi bütçeyi aşarsa derleme başarısız olur
+                if len(op_parts_tuples) == 2:
+                    directive_operands = [op_val for _, op_val in op_parts_tuples]
+                else: error_msg = "CYCLES directive expects a routine label and a cycle budget."
+            elif mnemonic in ('IF', 'IFDEF', 'IFNDEF'):
+                # Koşul ConditionalAssembly tarafından satır okunurken değerlendirilir; burada sadece listing için
+                directive_operands = [op_val for _, op_val in op_parts_tuples]
             elif mnemonic == 'END':
-                if op_parts_tuples: error_msg = "END directive does not take arguments."
+                # END isteğe bağlı olarak programın başlangıç adresini alabilir: END START
+                if len(op_parts_tuples) > 1: error_msg = "END directive takes at most one argument (entry point)."
+                else: directive_operands = [op_val for _, op_val in op_parts_tuples]
             # Diğer direktifler eklenebilir
 
             # Operand sayısı kontrolü
@@ -210,6 +257,9 @@ class SyntaxAnalyzer:
                     if not (mnemonic == 'END' and num_parsed_ops == 0 and not token.operands_raw_str):
                         if num_parsed_ops != expected_params_info:
                             error_msg = f"Directive '{mnemonic}' expects {expected_params_info} operand(s), got {num_parsed_ops}."
+                elif expected_params_info == '0_or_1':
+                    if num_parsed_ops > 1:
+                        error_msg = f"Directive '{mnemonic}' expects at most 1 operand, got {num_parsed_ops}."
                 elif expected_params_info == '1_or_more':
                     if num_parsed_ops == 0 and token.operands_raw_str : # Operand vardı ama parse edilemediyse farklı, hiç yoksa farklı
                          error_msg = f"Directive '{mnemonic}' expects at least 1 operand, but none were validly parsed."
@@ -225,30 +275,36 @@ class SyntaxAnalyzer:
         else: # Ne komut ne de direktif
             return ParsedInstruction(token, error=f"Unknown mnemonic or directive: '{mnemonic}'")
 
+    def iter_parse(self, tokens):
+        """Token iterable'ından ParsedInstruction'ları tek tek üretir (liste oluşturmaz)."""
+        parse_token = self.parse_token
+        for token_obj in tokens:
+            yield parse_token(token_obj)
+
     def parse_tokens(self, token_list):
-        parsed_instructions = []
-        for token_obj in token_list: # token_obj olarak değiştirdim, token modülüyle karışmasın
-            parsed_instructions.append(self.parse_token(token_obj))
-        return parsed_instructions
+        return list(self.iter_parse(token_list))
 
 
 # Test için örnek kullanım
 if __name__ == "__main__":
+    import textwrap # Örnekler girintili yazıldı; etiketler 1. sütuna gelsin
     from .lexical_analyzer import LexicalAnalyzer
     import assembler.opcode_table as ot_module # opcode_table.py 'yi import et
 
     lexer = LexicalAnalyzer()
     syntax_analyzer = SyntaxAnalyzer(ot_module) # ot_module'ü constructor'a ver
 
-    sample_code = """
+    sample_code = textwrap.dedent("""
     START EQU $1000
     LOOP: LDAA #$05
           RMB  1         ; Test RMB
           ORG  $C000
-          FCB  $0A, 20, %00010101, #'X', START
+          FCB  $0A, 20, %00010101, 'X', <START
+    MSG   FCC  "HI, THERE",0
+          FILL $FF,4
           END
     BADRMB RMB BADVAL
-    """
+    """)
     print("--- Parsing Sample Code ---")
     tokens = lexer.tokenize_source_code(sample_code)
     parsed_instrs = syntax_analyzer.parse_tokens(tokens)
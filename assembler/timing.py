@@ -0,0 +1,352 @@
+# m6800_sdk/assembler/timing.py
+
+# Yerleşimi tamamlanmış ParsedInstruction dizisi üzerinde statik zamanlama analizi:
+#   - Her komutun cycle sayısı (uzun branch'e çevrilmişse dallanma/dallanmama durumları)
+#   - Temel blok (basic block) başına cycle toplamı
+#   - Etiketli rutin başına en iyi / en kötü durum cycle sayısı
+#
+# Komut ve blok cycle'ları doğrusal ve ucuzdur (listing'in cycle sütunu). Rutin toplamları
+# kontrol akışı grafiğinde yol araması gerektirir; sadece istenen etiketler için ve ilk
+# istendiğinde hesaplanır (bkz. Assembler.routine_timing).
+#
+# Rutin, etiketten başlayıp RTS/RTI ile (veya kodun dışına atlayarak) biten yolların
+# kümesidir. JSR/BSR ile çağrılan rutinlerin süresi çağıranın süresine eklenir.
+# Basit sayaçlı döngüler (LDAB #n ... DECB ; BNE geri) n tur olarak hesaplanır; tanınmayan
+# döngülerde, indeksli JMP/JSR'de, özyinelemeli ve MAX_CALL_DEPTH'ten derin çağrılarda en kötü durum
+# sınırsız (None) kabul edilir.
+# Analiz komut sayısına göre doğrusaldır; yol araması açık bir yığın kullanır, sadece çağrılan
+# rutinler özyinelemeli çözülür (bkz. MAX_CALL_DEPTH).
+
+from .expression import ExpressionError
+from .opcode_table import (CONDITIONAL_BRANCHES, JUMPS, CALLS, RETURNS,
+                           MODE_IMMEDIATE, MODE_INDEXED)
+
+# Sayaçlı döngü tanıma: azaltma komutu -> (sayaç yükleme komutu, sayaç genişliği)
+_COUNTERS = {'DECA': ('LDAA', 0x100), 'DECB': ('LDAB', 0x100), 'DEX': ('LDX', 0x10000)}
+
+# Sayaç yazmacını değiştiren komutlar (döngü gövdesinde sadece azaltma komutu bulunabilir)
+_REGISTER_WRITERS = {
+    'DECA': frozenset(('LDAA', 'ADDA', 'ADCA', 'SUBA', 'SBCA', 'ANDA', 'ORAA', 'EORA', 'CLRA', 'COMA',
+                       'NEGA', 'INCA', 'DECA', 'ASLA', 'ASRA', 'LSRA', 'ROLA', 'RORA', 'TBA', 'TPA',
+                       'PULA', 'ABA', 'SBA', 'DAA')),
+    'DECB': frozenset(('LDAB', 'ADDB', 'ADCB', 'SUBB', 'SBCB', 'ANDB', 'ORAB', 'EORB', 'CLRB', 'COMB',
+                       'NEGB', 'INCB', 'DECB', 'ASLB', 'ASRB', 'LSRB', 'ROLB', 'RORB', 'TAB', 'PULB')),
+    'DEX': frozenset(('LDX', 'INX', 'DEX', 'TSX')),
+}
+
+_LONG_BRANCH_JUMP_CYCLES = 3 # Uzun branch'in JMP/JSR kısmı (Extended)
+_LONG_BSR_CYCLES = 9         # BSR -> JSR Extended
+
+# İç içe çağrı sınırı: JSR/BSR hedefleri routine_cycles ile (Python özyinelemesiyle) çözülür.
+# Daha derin çağrı zincirleri sınırsız kabul edilir; RecursionError yerine hata mesajı verilir.
+MAX_CALL_DEPTH = 128
+
+def instruction_cycles(pi):
+    """
+    Komutun (en iyi, en kötü) cycle sayısı. Sadece uzun branch'e çevrilmiş koşullu
+    branch'lerde iki değer farklıdır: dallanmazsa 4, dallanırsa 4 + JMP.
+    """
+    cycles = pi.op_info.get('cycles', 0)
+    if pi.relaxation == 'long_branch':
+        if pi.mnemonic == 'BRA':
+            return _LONG_BRANCH_JUMP_CYCLES, _LONG_BRANCH_JUMP_CYCLES
+        if pi.mnemonic == 'BSR':
+            return _LONG_BSR_CYCLES, _LONG_BSR_CYCLES
+        return cycles, cycles + _LONG_BRANCH_JUMP_CYCLES
+    return cycles, cycles
+
+def format_cycles(best, worst):
+    """Listing için cycle metni: '4', '4/7' veya sınırsız için '4/∞'."""
+    if worst is None:
+        return f"{best}/∞"
+    return str(best) if best == worst else f"{best}/{worst}"
+
+class TimingReport:
+    """
+    blocks: [(başlangıç_adresi, bitiş_adresi (dahil değil), cycle), ...] program sırasıyla
+    routines: {etiket: (en_iyi, en_kötü)}; en_kötü None ise sınırsız
+    block_ends: {ParsedInstruction id: blok toplamı} listing'de blok sonunu işaretlemek için
+    """
+    def __init__(self):
+        self.blocks = []
+        self.routines = {}
+        self.block_ends = {}
+
+    def block_total_after(self, pi):
+        """pi bir temel bloğun son komutuysa bloğun toplam cycle'ı, değilse None."""
+        return self.block_ends.get(id(pi))
+
+class TimingAnalyzer:
+    def __init__(self, symbol_table, instruction_size):
+        self.symbol_table = symbol_table
+        self.instruction_size = instruction_size
+
+    def analyze(self, parsed_instructions, routine_labels=()):
+        """
+        parsed_instructions: yerleşimi yapılmış komutlar (adresler atanmış olmalı)
+        routine_labels: toplamı raporlanacak etiketler; varsayılan olarak hiçbiri (sadece
+        bloklar). None ise çağrılan veya hiçbir branch'in hedeflemediği tüm kod etiketleri
+        rutin kabul edilir (pahalıdır). Diğer rutinler sonradan routine_cycles ile sorulabilir.
+        """
+        self._code = [pi for pi in parsed_instructions
+                      if not pi.error and not pi.is_directive and pi.mnemonic is not None and pi.op_info]
+        self._by_address = {}
+        for index, pi in enumerate(self._code):
+            self._by_address.setdefault(pi.address, index)
+        self._fallthroughs = self._find_fallthroughs()
+        self._targets = {} # Kod indeksi -> _target_index sonucu (her hedef ifadesi bir kez hesaplanır)
+        self._successors = [None] * len(self._code)
+        self._memo = {}
+        self._routine_memo = {}
+        self._in_progress = set()
+        self._loops = None # Sayaçlı döngüler; ilk rutin sorgusunda bulunur
+
+        report = TimingReport()
+        self._collect_blocks(report)
+        if routine_labels is None:
+            routine_labels = self._default_routine_labels(parsed_instructions)
+        for label in routine_labels:
+            address = self.symbol_table.get_address(label)
+            if address is not None and address in self._by_address:
+                report.routines[label] = self.routine_cycles(address)
+        return report
+
+    def has_code(self, address):
+        """address'te bir komut başlıyor mu (rutin adresi olarak geçerli mi)?"""
+        return address in self._by_address
+
+    def routine_cycles(self, address):
+        """address'ten başlayan rutinin (en iyi, en kötü) cycle sayısı; kod yoksa (0, 0)."""
+        index = self._by_address.get(address)
+        if index is None:
+            return 0, 0
+        if address in self._in_progress:
+            return None, None # Özyinelemeli çağrı: sınırsız
+        if len(self._in_progress) >= MAX_CALL_DEPTH:
+            return None, None # Çok derin çağrı zinciri: sınırsız (sonuç saklanmaz)
+        if address not in self._routine_memo:
+            self._in_progress.add(address)
+            self._routine_memo[address] = self._path_cycles(index)
+            self._in_progress.discard(address)
+        return self._routine_memo[address]
+
+    # --- Kontrol akışı grafiği ---
+
+    def _target_index(self, index):
+        """Branch/jump hedefinin kod indeksi; hedef kod dışındaysa None, hesaplanamazsa False."""
+        if index in self._targets:
+            return self._targets[index]
+        pi = self._code[index]
+        if pi.addressing_mode == MODE_INDEXED or not pi.operands:
+            target_index = False
+        else:
+            try:
+                target = self.symbol_table.evaluate(pi.operands[0], pi.address) & 0xFFFF
+            except ExpressionError:
+                target_index = False
+            else:
+                target_index = self._by_address.get(target)
+        self._targets[index] = target_index
+        return target_index
+
+    def _find_fallthroughs(self):
+        """
+        Her komut için sonraki komutun indeksi; adres olarak bitişik değilse (veri/ORG araya
+        girmiş) None. Bloklar, kenarlar ve döngü tanıma aynı listeyi kullanır.
+        """
+        code = self._code
+        fallthroughs = [None] * len(code)
+        for index in range(len(code) - 1):
+            pi = code[index]
+            if code[index + 1].address == pi.address + self.instruction_size(pi):
+                fallthroughs[index] = index + 1
+        return fallthroughs
+
+    def _edges(self, index):
+        """
+        [(sonraki_indeks veya None (çıkış), en_iyi_maliyet, en_kötü_maliyet), ...]
+        Maliyet bu komutun (ve çağrılan rutinin) cycle'larıdır; en kötü None ise sınırsız.
+        """
+        edges = self._successors[index]
+        if edges is not None:
+            return edges
+        pi = self._code[index]
+        mnemonic = pi.mnemonic
+        best, worst = instruction_cycles(pi)
+        if self._loops is None:
+            self._loops = self._find_counted_loops()
+        loop = self._loops.get(index)
+        if loop is not None:
+            end, total = loop
+            edges = [(self._fallthroughs[end], total, total)]
+        elif mnemonic in RETURNS:
+            edges = [(None, best, worst)]
+        elif mnemonic in CONDITIONAL_BRANCHES:
+            target = self._target_index(index)
+            edges = [(self._fallthroughs[index], best, best),
+                     (target, worst, worst) if target is not False else (None, worst, None)]
+        elif mnemonic in JUMPS:
+            target = self._target_index(index)
+            edges = [(target, best, worst) if target is not False else (None, best, None)]
+        elif mnemonic in CALLS:
+            target = self._target_index(index)
+            if target is False:
+                callee_best, callee_worst = 0, None # İndeksli çağrı: hedef bilinmiyor
+            elif target is None:
+                callee_best, callee_worst = 0, 0 # Kod dışı (örn. monitor ROM) rutin: sadece çağrı maliyeti
+            else:
+                callee_best, callee_worst = self.routine_cycles(self._code[target].address)
+            edges = [(self._fallthroughs[index], best + (callee_best or 0),
+                      None if callee_worst is None else worst + callee_worst)]
+        else:
+            edges = [(self._fallthroughs[index], best, worst)]
+        self._successors[index] = edges
+        return edges
+
+    def _path_cycles(self, start):
+        """
+        start'tan çıkışa kadar en kısa ve en uzun yol (cycle). Açık yığınla derinlik öncelikli
+        arama yapılır; yığındaki bir düğüme dönen kenar tanınmamış bir döngüdür (en kötü = None).
+        """
+        memo = self._memo
+        if start in memo:
+            return memo[start]
+        on_stack = {start}
+        stack = [(start, iter(self._edges(start)))]
+        while stack:
+            node, pending = stack[-1]
+            for successor, _, _ in pending:
+                if successor is not None and successor not in memo and successor not in on_stack:
+                    on_stack.add(successor)
+                    stack.append((successor, iter(self._edges(successor))))
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(node)
+                memo[node] = self._combine(node)
+        return memo[start]
+
+    def _combine(self, node):
+        best = None
+        worst = 0
+        for successor, edge_best, edge_worst in self._edges(node):
+            if successor is None:
+                path_best, path_worst = edge_best, edge_worst
+            elif successor in self._memo:
+                after_best, after_worst = self._memo[successor]
+                path_best = None if after_best is None else edge_best + after_best
+                path_worst = None if after_worst is None or edge_worst is None else edge_worst + after_worst
+            else:
+                path_best, path_worst = None, None # Geri kenar: döngü
+            if path_best is not None and (best is None or path_best < best):
+                best = path_best
+            if worst is not None:
+                worst = None if path_worst is None else max(worst, path_worst)
+        return best, worst
+
+    def _find_counted_loops(self):
+        """
+        'LDAB #n ; T: ... DECB ; BNE T' kalıbındaki döngüleri bulur.
+        Döndürülen değer: {T_indeksi: (BNE_indeksi, n tur için toplam cycle)}
+        """
+        loops = {}
+        for index, pi in enumerate(self._code):
+            if pi.mnemonic != 'BNE' or pi.relaxation == 'long_branch' or index < 1:
+                continue
+            decrement = self._code[index - 1].mnemonic
+            if decrement not in _COUNTERS:
+                continue
+            head = self._target_index(index)
+            if not head or head > index - 1:
+                continue
+            load, width = _COUNTERS[decrement]
+            init = self._code[head - 1]
+            if (init.mnemonic != load or init.addressing_mode != MODE_IMMEDIATE
+                    or self._fallthroughs[head - 1] != head):
+                continue
+            try:
+                count = self.symbol_table.evaluate(init.operands[0], init.address) % width or width
+            except ExpressionError:
+                continue
+            body = self._code[head:index + 1]
+            writers = _REGISTER_WRITERS[decrement]
+            if any(self._fallthroughs[i] != i + 1 for i in range(head, index)):
+                continue
+            if any(p.mnemonic in writers for p in body[:-2]) or any(
+                    p.mnemonic in CONDITIONAL_BRANCHES or p.mnemonic in JUMPS or p.mnemonic in CALLS
+                    or p.mnemonic in RETURNS for p in body[:-1]):
+                continue
+            loops[head] = (index, count * sum(instruction_cycles(p)[0] for p in body))
+        return loops
+
+    # --- Raporlama ---
+
+    def _collect_blocks(self, report):
+        """Kodu temel bloklara böler: hedefler ve kontrol transferlerinden sonra yeni blok başlar."""
+        leaders = {0} if self._code else set()
+        for index, pi in enumerate(self._code):
+            mnemonic = pi.mnemonic
+            if (mnemonic in CONDITIONAL_BRANCHES or mnemonic in JUMPS or mnemonic in CALLS
+                    or mnemonic in RETURNS):
+                leaders.add(index + 1)
+                target = self._target_index(index)
+                if target:
+                    leaders.add(target)
+            if self._fallthroughs[index] is None:
+                leaders.add(index + 1)
+            if pi.label:
+                leaders.add(index)
+        starts = sorted(i for i in leaders if i < len(self._code))
+        for position, start in enumerate(starts):
+            end = starts[position + 1] if position + 1 < len(starts) else len(self._code)
+            block = self._code[start:end]
+            total = sum(instruction_cycles(pi)[0] for pi in block)
+            last = block[-1]
+            report.blocks.append((block[0].address, last.address + self.instruction_size(last), total))
+            report.block_ends[id(last)] = total
+
+    def _default_routine_labels(self, parsed_instructions):
+        """Çağrılan etiketler ve hiçbir branch/JMP'nin hedeflemediği kod etiketleri."""
+        called = set()
+        branched = set()
+        for index, pi in enumerate(self._code):
+            if pi.mnemonic in CALLS or pi.mnemonic in JUMPS or pi.mnemonic in CONDITIONAL_BRANCHES:
+                target = self._target_index(index)
+                if target is None or target is False:
+                    continue
+                (called if pi.mnemonic in CALLS else branched).add(self._code[target].address)
+        labels = []
+        for pi in parsed_instructions:
+            if pi.error or not pi.label or pi.is_directive and pi.mnemonic == 'EQU':
+                continue
+            address = self.symbol_table.get_address(pi.label)
+            if address in self._by_address and (address in called or address not in branched):
+                labels.append(pi.label)
+        return labels
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    import textwrap # Örnekler girintili yazıldı; etiketler 1. sütuna gelsin
+    from .assembler import Assembler
+
+    sample_code = textwrap.dedent("""
+            ORG  $0100
+    ISR     LDAB #10        ; 10 turluk sayaçlı döngü
+    WAIT    NOP
+            DECB
+            BNE  WAIT
+            LDAA $40
+            BEQ  SKIP
+            JSR  WORK
+    SKIP    RTI
+    WORK    INCA
+            STAA $40
+            RTS
+            CYCLES ISR,150
+            END
+    """)
+    assembler = Assembler()
+    success, segments, listing, errors = assembler.assemble(sample_code)
+    for row in listing:
+        print(f"{row[0]}\t{row[1]:<10}\t{row[4]:<8}\t{row[2]:<30}\t{row[3]}")
+    print(errors)
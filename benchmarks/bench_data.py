@@ -0,0 +1,51 @@
+# m6800_sdk/benchmarks/bench_data.py
+
+# Aynı veri tablosunu (font, lookup tablosu, ses örneği gibi) FCB satırları olarak ve
+# INCBIN ile dahil ederek derler; iki yolun süresini ve ürettiği imajın aynılığını karşılaştırır.
+#
+# Çalıştırma (proje kök dizininden):
+#   python -m benchmarks.bench_data            # 48 KiB veri
+#   python -m benchmarks.bench_data 60000
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from assembler.assembler import Assembler
+
+def generate_fcb_source(data, per_line=16):
+    yield "        ORG  $0100\n"
+    yield "TABLE\n"
+    for start in range(0, len(data), per_line):
+        yield "        FCB  " + ",".join(f"${b:02X}" for b in data[start:start + per_line]) + "\n"
+    yield "        END\n"
+
+def measure(label, func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): # Assembler'ın durum mesajlarını gizle
+        result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms, success={result[0]}")
+    return result
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 48 * 1024
+    data = bytes((i * 31 + (i >> 8)) & 0xFF for i in range(size))
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path = os.path.join(tmp, "table.bin")
+        with open(bin_path, "wb") as f:
+            f.write(data)
+        fcb_path = os.path.join(tmp, "table_fcb.asm")
+        with open(fcb_path, "w") as f:
+            f.writelines(generate_fcb_source(data))
+        incbin_path = os.path.join(tmp, "table_incbin.asm")
+        with open(incbin_path, "w") as f:
+            f.write('        ORG  $0100\nTABLE   INCBIN "table.bin"\n        END\n')
+        print(f"{size:,} data bytes, FCB source {os.path.getsize(fcb_path) / 1024:.0f} KiB")
+
+        fcb = measure("FCB source", lambda: Assembler().assemble_file(fcb_path))
+        incbin = measure("INCBIN (mmap)", lambda: Assembler().assemble_file(incbin_path))
+        print("identical image:", fcb[1] == incbin[1])
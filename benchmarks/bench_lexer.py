@@ -0,0 +1,53 @@
+# m6800_sdk/benchmarks/bench_lexer.py
+
+# Lexer'ı, ürettiğimiz lookup-table kaynaklarına benzeyen büyük sentetik
+# dosyalarla ölçer: saniyedeki satır sayısı ve token listesinin bellek tepe değeri.
+#
+# Çalıştırma (proje kök dizininden):
+#   python -m benchmarks.bench_lexer             # 100k ve 1M satır
+#   python -m benchmarks.bench_lexer 250000      # özel satır sayıları
+
+import sys
+import time
+import tracemalloc
+
+from assembler.lexical_analyzer import LexicalAnalyzer
+
+def generate_source(num_lines):
+    """Etiketli tablo satırları, kod, yorumlar ve boş satırlardan oluşan kaynak üretir."""
+    lines = ["        ORG  $0100"]
+    templates = (
+        "TBL{0:06d} FCB  ${1:02X},${2:02X},${3:02X},${4:02X} ; entry {0}",
+        "        LDAA TBL{0:06d},X",
+        "        STAA $00{1:02X}",
+        "* block {0}",
+        "L{0:06d}: ADDA #{1}",
+        "",
+        "        FDB  TBL{0:06d}+{2},{3}*2",
+        "        JMP  L{0:06d}",
+    )
+    for i in range(num_lines - 1):
+        lines.append(templates[i % len(templates)].format(i, i & 0xFF, (i >> 3) & 0xFF, (i * 7) & 0xFF, (i * 13) & 0xFF))
+    return "\n".join(lines)
+
+def bench(num_lines):
+    source = generate_source(num_lines)
+    lexer = LexicalAnalyzer()
+
+    start = time.perf_counter()
+    tokens = lexer.tokenize_source_code(source)
+    elapsed = time.perf_counter() - start
+    del tokens
+
+    tracemalloc.start()
+    tokens = lexer.tokenize_source_code(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{num_lines:>9,} lines: {elapsed:7.3f} s, {num_lines / elapsed:>12,.0f} lines/s, "
+          f"{len(tokens):>9,} tokens, peak {peak / (1 << 20):7.1f} MiB")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for size in sizes:
+        bench(size)
@@ -0,0 +1,72 @@
+# m6800_sdk/benchmarks/bench_memory.py
+
+# Pass 1 sonunda bellekte tutulan veri yapılarının boyutunu ölçer: 500k satırlık
+# üretilmiş bir kaynak assemble_file() ile derlenir ve Assembler nesnesi canlıyken
+# tracemalloc ile kalıcı (retained) bellek ölçülür. Ayrıca tek bir ParsedInstruction'ın
+# __slots__ ile ve eski __dict__ tabanlı düzenle kapladığı yer karşılaştırılır.
+#
+# Çalıştırma (proje kök dizininden):
+#   python -m benchmarks.bench_memory            # 500k satır
+#   python -m benchmarks.bench_memory 100000
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from assembler.assembler import Assembler
+from assembler.lexical_analyzer import LexicalAnalyzer
+from benchmarks.bench_pipeline import generate_source
+
+class _DictInstruction:
+    """Karşılaştırma için eski düzen: __dict__, Token referansı ve op_info sözlüğü."""
+    def __init__(self, pi, token):
+        self.token = token
+        self.is_directive = pi.is_directive
+        self.mnemonic = pi.mnemonic
+        self.addressing_mode = pi.addressing_mode
+        self.operands = list(pi.operands)
+        self.op_info = pi.op_info
+        self.error = pi.error
+        self.address = pi.address
+        self.relaxation = pi.relaxation
+
+def _object_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+def per_instruction_sizes(assembler):
+    token = LexicalAnalyzer().tokenize_line(1, "TBL0000001 FCB  $01,$00,$07 ; row 1")
+    pi = next(pi for pi in assembler.parsed_instructions if pi.mnemonic == 'FCB')
+    old = _DictInstruction(pi, token)
+    slotted = _object_size(pi) + sys.getsizeof(pi.operands)
+    dict_based = _object_size(old) + sys.getsizeof(old.operands) + _object_size(token) + sys.getsizeof(token.original_line)
+    return slotted, dict_based
+
+if __name__ == "__main__":
+    num_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "generated.asm")
+        with open(path, "w") as f:
+            f.writelines(generate_source(num_lines))
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        assembler = Assembler()
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = assembler.assemble_file(path)[0]
+        elapsed = time.perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        count = len(assembler.parsed_instructions)
+        slotted, dict_based = per_instruction_sizes(assembler)
+        print(f"{num_lines:,} lines ({os.path.getsize(path) / (1 << 20):.1f} MiB source), success={success}, {elapsed:.1f} s")
+        print(f"retained after assembly: {retained / (1 << 20):7.1f} MiB ({retained / count:.0f} B per instruction)")
+        print(f"peak during assembly:    {peak / (1 << 20):7.1f} MiB")
+        print(f"FCB instruction record:  {slotted} B slotted vs {dict_based} B with __dict__ + Token")
@@ -0,0 +1,63 @@
+# m6800_sdk/benchmarks/bench_pipeline.py
+
+# Tüm kaynağı string olarak derleyen assemble() ile dosyayı satır satır akış
+# halinde derleyen assemble_file() yolunun bellek tepe değerlerini karşılaştırır.
+#
+# Çalıştırma (proje kök dizininden):
+#   python -m benchmarks.bench_pipeline            # 200k satır (~5 MB kaynak)
+#   python -m benchmarks.bench_pipeline 500000
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from assembler.assembler import Assembler
+
+def generate_source(num_lines, block_groups=300):
+    """
+    Üretilmiş lookup-table kaynaklarına benzer bir program üretir (6 satırlık gruplar).
+    64 KiB adres alanını aşmamak için her blok aynı ORG adresinden başlar
+    (bloklar üst üste yazar).
+    """
+    for group in range(num_lines // 6):
+        if group % block_groups == 0:
+            yield "        ORG  $0100\n"
+        yield f"TBL{group:07d} FCB  ${group & 0xFF:02X},${(group >> 8) & 0xFF:02X},${(group * 7) & 0xFF:02X} ; row {group}\n"
+        yield f"        LDAA TBL{group:07d}\n"
+        yield f"        ADDA #{group & 0x7F}\n"
+        yield f"* ---- table row {group} ----\n"
+        yield f"        STAA ${group & 0xFF:02X}\n"
+        yield f"        FDB  TBL{group:07d}+1\n"
+    yield "        END\n"
+
+def measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): # Assembler'ın durum mesajlarını gizle
+        result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {elapsed:7.2f} s, peak {peak / (1 << 20):8.1f} MiB, success={result[0]}")
+    return peak
+
+if __name__ == "__main__":
+    num_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "generated.asm")
+        with open(path, "w") as f:
+            f.writelines(generate_source(num_lines))
+        print(f"{num_lines:,} lines, {os.path.getsize(path) / (1 << 20):.1f} MiB source")
+
+        def in_memory():
+            with open(path) as f:
+                source = f.read()
+            return Assembler().assemble(source)
+
+        full = measure("assemble(str) with listing", in_memory)
+        streamed = measure("assemble_file() without listing", lambda: Assembler().assemble_file(path))
+        print(f"peak memory reduced {full / streamed:.1f}x")
@@ -0,0 +1,4 @@
+# m6800_sdk/m6800
+
+# Komut satırı giriş noktası: python -m m6800 {asm,run,trace,profile,bench} ...
+# Bu paket tkinter'ı hiçbir zaman import etmez (bkz. cli.py); GUI için main.py kullanılır.
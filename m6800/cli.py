@@ -0,0 +1,310 @@
+# m6800_sdk/m6800/cli.py
+
+# Başsız (headless) komut satırı arayüzü:
+#   python -m m6800 asm     prog.asm -o prog.s19 [-l prog.lst]
+#   python -m m6800 run     prog.asm|prog.s19 [--max-steps N] [-b ADDR] [--dump ADDR:LEN]
+#   python -m m6800 trace   prog.asm [--max-steps N]
+#   python -m m6800 profile prog.asm [--top N]
+#   python -m m6800 bench   [prog.s19] [--steps N]
+#
+# CI'da binlerce kısa simülasyon çalıştığı için yorumlayıcı açılışı ve import'lar toplam
+# sürenin görünür bir kısmıdır. Bu modül en üstte sadece argparse/sys/time import eder;
+# her alt komut ihtiyaç duyduğu modülleri fonksiyon içinde, tembel (lazy) olarak import eder:
+# nesne dosyası çalıştırmak assembler'ı, hiçbir komut tkinter'ı yüklemez.
+#
+# Durum mesajları (derleme, yükleme, simülatörün durma mesajları) stderr'e gider; stdout
+# komutun asıl çıktısıdır (trace satırları, register durumu, profil tablosu), böylece çıktı
+# doğrudan dosyaya/diff'e verilebilir.
+#
+# Çıkış kodları: 0 başarılı, 1 derleme/yükleme hatası, 2 adım sınırına ulaşıldı (program durmadı).
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_STEP_LIMIT = 2
+
+DEFAULT_RUN_STEPS = 1_000_000
+DEFAULT_TRACE_STEPS = 1000
+DEFAULT_BENCH_STEPS = 500_000
+BATCH_SIZE = 5000
+BENCH_PROGRAM = (0x0100, [0x08, 0x20, 0xFD]) # LOOP: INX ; BRA LOOP
+
+def parse_address(text):
+    """'$1234', '0x1234' veya '1234' (hex) -> int."""
+    text = text.strip()
+    if text.startswith('$'):
+        text = text[1:]
+    try:
+        value = int(text, 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid hex address '{text}'")
+    if not 0 <= value <= 0xFFFF:
+        raise argparse.ArgumentTypeError(f"address ${value:X} out of range")
+    return value
+
+def parse_range(text):
+    """'ADDR:LEN' (ikisi de hex) -> (adres, uzunluk)."""
+    address, _, length = text.partition(':')
+    return parse_address(address), parse_address(length) if length else 0x10
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m m6800",
+                                     description="Motorola M6800 SDK - headless assembler & simulator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Kaynak dosyayı derleyen tüm komutların ortak seçenekleri
+    source = argparse.ArgumentParser(add_help=False)
+    source.add_argument("-D", dest="defines", action="append", default=[], metavar="SYMBOL[=VALUE]",
+                        help="define a symbol for IF/IFDEF conditional assembly (repeatable)")
+    source.add_argument("--relax-branches", action="store_true", help="relax out-of-range branches")
+    source.add_argument("--peephole", action="store_true", help="enable the peephole optimizer")
+    source.add_argument("--cache", action="store_true",
+                        help="reuse results from the on-disk assembly cache (~/.cache/m6800_sdk or $M6800_CACHE_DIR)")
+
+    # Programı simülatöre yükleyen komutların ortak seçenekleri
+    program = argparse.ArgumentParser(add_help=False, parents=[source])
+    program.add_argument("--entry", type=parse_address, help="override the entry point (hex)")
+    program.add_argument("--base", type=parse_address, default=0, help="load address for raw .bin files (hex)")
+    program.add_argument("-b", "--breakpoint", dest="breakpoints", action="append", type=parse_address,
+                         default=[], metavar="ADDR", help="stop when PC reaches ADDR (repeatable)")
+
+    asm = commands.add_parser("asm", parents=[source], help="assemble a source file")
+    asm.add_argument("file", help="assembly source file")
+    asm.add_argument("-o", "--output", help="object file to write (.s19, .s28, .hex, .bin)")
+    asm.add_argument("-l", "--listing", help="listing file to write")
+    asm.set_defaults(handler=cmd_asm)
+
+    run = commands.add_parser("run", parents=[program], help="run a program until it halts")
+    run.add_argument("file", help="assembly source or object file")
+    run.add_argument("--max-steps", type=int, default=DEFAULT_RUN_STEPS)
+    run.add_argument("--dump", action="append", type=parse_range, default=[], metavar="ADDR:LEN",
+                     help="print memory after the run (hex, repeatable)")
+    run.set_defaults(handler=cmd_run)
+
+    trace = commands.add_parser("trace", parents=[program], help="print every executed instruction")
+    trace.add_argument("file", help="assembly source or object file")
+    trace.add_argument("--max-steps", type=int, default=DEFAULT_TRACE_STEPS)
+    trace.set_defaults(handler=cmd_trace)
+
+    profile = commands.add_parser("profile", parents=[program], help="count instructions and cycles per address")
+    profile.add_argument("file", help="assembly source or object file")
+    profile.add_argument("--max-steps", type=int, default=DEFAULT_RUN_STEPS)
+    profile.add_argument("--top", type=int, default=20, help="number of hot addresses to show")
+    profile.set_defaults(handler=cmd_profile)
+
+    bench = commands.add_parser("bench", parents=[program], help="measure startup time and emulation speed")
+    bench.add_argument("file", nargs="?", help="program to run (default: a built-in INX/BRA loop)")
+    bench.add_argument("--steps", type=int, default=DEFAULT_BENCH_STEPS)
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+# --- Yükleme ---
+
+def _error(message):
+    print(f"m6800: {message}", file=sys.stderr)
+
+def _is_object_file(path):
+    from utils.object_formats import FORMAT_EXTENSIONS
+    return os.path.splitext(path)[1].lower() in FORMAT_EXTENSIONS
+
+def _assemble(args, keep_listing=False):
+    """Kaynak dosyayı derler; başarılıysa Assembler nesnesini, değilse None döndürür."""
+    from assembler.assembler import Assembler
+    from assembler.conditional import parse_define
+
+    try:
+        defines = dict(parse_define(text) for text in args.defines)
+    except ValueError as e:
+        _error(e)
+        return None
+    cache = None # Önbellek isteğe bağlı: CI'da binlerce çalıştırma kalıcı kayıt bırakmasın
+    if args.cache:
+        from assembler.cache import AssemblyCache
+        cache = AssemblyCache()
+    assembler = Assembler(relax_branches=args.relax_branches, peephole=args.peephole, cache=cache, defines=defines)
+    try:
+        success = assembler.assemble_file(args.file, keep_listing=keep_listing)[0]
+    except OSError as e:
+        _error(e)
+        return None
+    for message in assembler.errors:
+        print(message, file=sys.stderr)
+    return assembler if success else None
+
+def _load(args):
+    """
+    args.file'ı (kaynak veya nesne dosyası) yeni bir Simulator'a yükler.
+    Döndürülen değer: (simulator, source_map); hata durumunda (None, None). source_map
+    sadece kaynaktan derlenen programlar için vardır.
+    """
+    from simulator.simulator import Simulator
+
+    with contextlib.redirect_stdout(sys.stderr): # Derleme/yükleme mesajları stdout'u kirletmesin
+        source_map = None
+        if args.file is None: # bench: yerleşik döngü
+            entry, code = BENCH_PROGRAM
+            segments = [(entry, bytearray(code))]
+        elif _is_object_file(args.file):
+            from utils.object_formats import read_object_file
+            try:
+                segments, entry = read_object_file(args.file, base_address=args.base)
+            except (OSError, ValueError) as e:
+                _error(e)
+                return None, None
+        else:
+            assembler = _assemble(args)
+            if assembler is None:
+                return None, None
+            segments, entry, source_map = assembler.segments, assembler.entry_point, assembler.source_map
+        if args.entry is not None:
+            entry = args.entry
+        elif entry is None:
+            entry = segments[0][0] if segments else 0
+        simulator = Simulator()
+        if not simulator.load_segments(segments, entry):
+            return None, None
+    simulator.breakpoints.update(args.breakpoints)
+    return simulator, source_map
+
+def _run(simulator, max_steps):
+    """Program durana, breakpoint'e gelene veya max_steps'e kadar batch'ler halinde çalıştırır."""
+    total = 0
+    while total < max_steps:
+        steps, reason = simulator.run_batch(min(BATCH_SIZE, max_steps - total))
+        total += steps
+        if reason:
+            return total, reason
+    return total, None
+
+def _where(source_map, address):
+    line = source_map.line_for_address(address) if source_map is not None else None
+    return f"line {line}" if line is not None else ""
+
+# --- Komutlar ---
+
+def cmd_asm(args):
+    with contextlib.redirect_stdout(sys.stderr):
+        assembler = _assemble(args, keep_listing=args.listing is not None)
+    if assembler is None:
+        return EXIT_ERROR
+    if args.output:
+        from utils.object_formats import write_object_file
+        try:
+            write_object_file(args.output, assembler.segments, assembler.entry_point)
+        except (OSError, ValueError) as e:
+            _error(e)
+            return EXIT_ERROR
+    if args.listing:
+        with open(args.listing, "w", encoding="utf-8") as f:
+            for addr, hex_code, source, comment, cycles in assembler.listing:
+                f.write(f"{addr:<6}{hex_code:<24}{cycles:<7}{(source or '').rstrip():<40} {comment or ''}".rstrip() + "\n")
+    size = sum(len(data) for _, data in assembler.segments)
+    print(f"{size} byte(s) in {len(assembler.segments)} segment(s), entry ${assembler.entry_point:04X}",
+          file=sys.stderr)
+    return EXIT_OK
+
+def cmd_run(args):
+    simulator, source_map = _load(args)
+    if simulator is None:
+        return EXIT_ERROR
+    with contextlib.redirect_stdout(sys.stderr):
+        steps, reason = _run(simulator, args.max_steps)
+    cpu = simulator.cpu
+    print(cpu.get_state_str())
+    where = _where(source_map, cpu.PC)
+    print(f"{steps:,} instruction(s), {cpu.cycles_executed:,} cycle(s): "
+          f"{reason or 'step limit reached'}{f' ({where})' if where else ''}")
+    for address, length in args.dump:
+        data = cpu.memory.memory_array[address:address + length]
+        for offset in range(0, len(data), 16):
+            print(f"${address + offset:04X}: {data[offset:offset + 16].hex(' ').upper()}")
+    return EXIT_OK if reason else EXIT_STEP_LIMIT
+
+def cmd_trace(args):
+    simulator, source_map = _load(args)
+    if simulator is None:
+        return EXIT_ERROR
+    cpu = simulator.cpu
+    memory = cpu.memory.memory_array
+    dispatch = simulator.executor.dispatch_table
+    execute = simulator.executor.execute_next_instruction
+    breakpoints = simulator.breakpoints
+    write = sys.stdout.write # Trace satırları stdout'a, simülatör mesajları stderr'e
+    with contextlib.redirect_stdout(sys.stderr):
+        for _ in range(args.max_steps):
+            pc = cpu.PC
+            opcode = memory[pc]
+            entry = dispatch[opcode]
+            name = f"{entry[1]} {entry[2]}" if entry else "???"
+            cycles = execute()
+            where = _where(source_map, pc)
+            write(f"{pc:04X}  {opcode:02X}  {name:<13} A={cpu.A:02X} B={cpu.B:02X} X={cpu.X:04X} "
+                  f"SP={cpu.SP:04X} CCR={cpu.CCR.get_byte():02X} +{cycles}{f'  ; {where}' if where else ''}\n")
+            if cpu.is_halted or cpu.PC in breakpoints:
+                return EXIT_OK
+    return EXIT_STEP_LIMIT
+
+def cmd_profile(args):
+    simulator, source_map = _load(args)
+    if simulator is None:
+        return EXIT_ERROR
+    cpu = simulator.cpu
+    execute = simulator.executor.execute_next_instruction
+    breakpoints = simulator.breakpoints
+    counts = [0] * cpu.memory.size
+    cycles = [0] * cpu.memory.size
+    steps = 0
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        while steps < args.max_steps:
+            pc = cpu.PC
+            cycles[pc] += execute()
+            counts[pc] += 1
+            steps += 1
+            if cpu.is_halted or cpu.PC in breakpoints:
+                break
+    elapsed = time.perf_counter() - started
+    total_cycles = sum(cycles) or 1
+    dispatch = simulator.executor.dispatch_table
+    memory = cpu.memory.memory_array
+    hot = sorted((address for address, count in enumerate(counts) if count),
+                 key=lambda address: cycles[address], reverse=True)
+    print(f"{'ADDR':<6}{'COUNT':>12}{'CYCLES':>14}{'%':>7}  INSTRUCTION")
+    for address in hot[:args.top]:
+        entry = dispatch[memory[address]]
+        name = f"{entry[1]} {entry[2]}" if entry else "???"
+        where = _where(source_map, address)
+        print(f"${address:04X}{counts[address]:>12,}{cycles[address]:>14,}{cycles[address] / total_cycles:>7.1%}  "
+              f"{name:<13}{f' ; {where}' if where else ''}")
+    print(f"{steps:,} instruction(s), {sum(cycles):,} cycle(s), {len(hot)} distinct address(es) "
+          f"in {elapsed:.2f} s", file=sys.stderr)
+    return EXIT_OK if cpu.is_halted or cpu.PC in breakpoints else EXIT_STEP_LIMIT
+
+def cmd_bench(args):
+    simulator, _ = _load(args)
+    if simulator is None:
+        return EXIT_ERROR
+    # İşlem başlangıcından ilk komuta kadar harcanan CPU süresi: yorumlayıcı açılışı + import + yükleme
+    startup = time.process_time()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        steps, reason = _run(simulator, args.steps)
+    elapsed = time.perf_counter() - started
+    cycles = simulator.cpu.cycles_executed
+    print(f"startup to first instruction: {startup * 1000:.0f} ms (process CPU time)")
+    if elapsed > 0 and steps:
+        print(f"{steps:,} instruction(s) in {elapsed:.3f} s: {steps / elapsed:,.0f} instructions/s, "
+              f"{cycles / elapsed / 1e6:.2f} MHz effective "
+              f"({cycles / elapsed / simulator.target_clock_hz:.0%} of {simulator.target_clock_hz / 1e6:.2f} MHz)")
+    if reason:
+        print(f"stopped early: {reason}")
+    return EXIT_OK
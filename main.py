@@ -1,5 +1,20 @@
-import tkinter as tk
-from ui.main_window import MainWindow # MainWindow sınıfını import et
+import argparse
+from assembler.conditional import parse_define
+# tkinter ve MainWindow sadece pencere açılırken import edilir: --help ve argüman hataları
+# GUI import maliyeti ödemez. Başsız (headless) kullanım için: python -m m6800 (bkz. m6800/cli.py)
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Motorola M6800 SDK - Assembler & Simulator",
+                                     epilog="For headless assembly and simulation use: python -m m6800 --help")
+    parser.add_argument("-D", dest="defines", action="append", default=[], metavar="SYMBOL[=VALUE]",
+                        help="define a symbol for IF/IFDEF conditional assembly (repeatable)")
+    parser.add_argument("file", nargs="?", help="assembly source file to open")
+    args = parser.parse_args(argv)
+    try:
+        args.defines = dict(parse_define(text) for text in args.defines)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
 
 if __name__ == "__main__":
     # Python'un modül arama yoluna proje kök dizinini eklemek
@@ -10,6 +25,13 @@ if __name__ == "__main__":
     # import os
     # sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
+    args = parse_arguments()
+    import tkinter as tk
+    from ui.main_window import MainWindow # MainWindow sınıfını import et
+
     root = tk.Tk()
-    app = MainWindow(root)
-    root.mainloop() 
+    app = MainWindow(root, defines=args.defines)
+    if args.file:
+        app.open_path(args.file)
+    root.mainloop()
+    app.background_assembler.close() # Arka plan derleme sürecini beklemeden kapat
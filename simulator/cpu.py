@@ -1,9 +1,19 @@
 from assembler.opcode_table import FLAG_H, FLAG_I, FLAG_N, FLAG_Z, FLAG_V, FLAG_C
 
+# Değişiklik takibi 256 byte'lık sayfalar halinde yapılır
+PAGE_SHIFT = 8
+PAGE_SIZE = 1 << PAGE_SHIFT
+
 class Memory:
     def __init__(self, size=65536): # M6800 16-bit adres alanı (64KB)
         self.size = size
         self.memory_array = bytearray(size) # Belleği bytearray olarak tutalım
+        # Sayfa başına son yazmanın nesil (generation) numarası. Tek bir paylaşılan "kirli" bitmap
+        # yerine nesil tutulur: her tüketici (UI bellek görünümü, snapshot, trace diff, uzak
+        # debug istemcisi) kendi son baktığı nesli saklar ve diğerlerini etkilemeden "temizler".
+        # Yazma yolunda maliyet tek bir liste atamasıdır.
+        self.page_generations = [0] * ((size + PAGE_SIZE - 1) >> PAGE_SHIFT)
+        self.generation = 1
 
     def read_byte(self, address):
         if 0 <= address < self.size:
@@ -18,6 +28,7 @@ class Memory:
             raise ValueError(f"Memory Write Error: Value {value} is not a valid byte.")
         if 0 <= address < self.size:
             self.memory_array[address] = value
+            self.page_generations[address >> PAGE_SHIFT] = self.generation
         else:
             # Hata yönetimi: Geçersiz adres
             # print(f"Memory Write Error: Address {address:04X} out of bounds.")
@@ -45,10 +56,26 @@ class Memory:
         if start_address + len(object_code) > self.size:
             raise ValueError("Load Program Error: Program too large for memory.")
 
-        for i, byte_val in enumerate(object_code):
-            self.memory_array[start_address + i] = byte_val
+        # Tek bir slice ataması ile kopyala (byte byte döngüden çok daha hızlı)
+        self.memory_array[start_address:start_address + len(object_code)] = bytes(object_code)
+        self._touch_range(start_address, start_address + len(object_code))
         print(f"Program loaded into memory starting at ${start_address:04X}, size: {len(object_code)} bytes.")
 
+    def load_segments(self, segments):
+        """
+        Assembler'ın ürettiği [(adres, bytearray), ...] segmentlerini belleğe yükler.
+        Her segment tek bir slice ataması ile kopyalanır; segmentler arasındaki bellek değişmez.
+        """
+        for address, data in segments:
+            if not (0 <= address < self.size) or address + len(data) > self.size:
+                raise ValueError(f"Load Segment Error: Segment ${address:04X} (+{len(data)} bytes) out of bounds.")
+        total = 0
+        for address, data in segments:
+            self.memory_array[address:address + len(data)] = data
+            self._touch_range(address, address + len(data))
+            total += len(data)
+        print(f"Loaded {len(segments)} segment(s) into memory, {total} bytes.")
+
     def get_memory_dump(self, start_address, num_bytes):
         """Belleğin belirli bir bölümünü string olarak döndürür (hex formatında)."""
         if not (0 <= start_address < self.size and start_address + num_bytes <= self.size):
@@ -61,6 +88,35 @@ class Memory:
     def clear(self):
         """Belleği sıfırlar."""
         self.memory_array = bytearray(self.size)
+        self._touch_range(0, self.size)
+
+    # --- Sayfa değişiklik takibi ---
+
+    def mark(self):
+        """
+        Mevcut nesli döndürür ve yeni bir nesle geçer. Tüketici bu değeri saklar ve bir sonraki
+        sorguda changed_pages(since=değer) ile o nesilden itibaren yazılan sayfaları alır:
+
+            generation = memory.mark()
+            pages = memory.changed_pages(self.since)
+            self.since = generation
+
+        Sınır nesli (>=) dahil edildiği için, simülatör başka bir thread'de çalışırken mark()
+        ile yarışan bir yazma kaybolmaz; en fazla iki ardışık sorguda raporlanır.
+        """
+        generation = self.generation
+        self.generation = generation + 1
+        return generation
+
+    def changed_pages(self, since):
+        """since neslinde veya sonrasında yazılmış sayfaların numaraları (artan sırada)."""
+        return [page for page, generation in enumerate(self.page_generations) if generation >= since]
+
+    def _touch_range(self, start, end):
+        """[start, end) aralığındaki sayfaları değişmiş olarak işaretler (toplu yüklemeler için)."""
+        if end > start:
+            first, last = start >> PAGE_SHIFT, (end - 1) >> PAGE_SHIFT
+            self.page_generations[first:last + 1] = [self.generation] * (last - first + 1)
 
 
 class CCR: # Condition Code Register
@@ -198,3 +254,10 @@ if __name__ == "__main__":
     popped_val = cpu.pop_word_from_stack()
     print(f"Popped Word: {popped_val:04X}") # 0x1234 olmalı
     print(f"SP after pop word: {cpu.SP:04X}") # Orijinal SP'ye dönmeli (ya da push öncesi SP'ye) 
+
+    # Sayfa değişiklik takibi: sadece son mark()'tan beri yazılan sayfalar raporlanır
+    cpu.memory.mark() # reset()'in tüm sayfaları işaretlediği nesli geride bırak
+    since = cpu.memory.mark()
+    cpu.memory.write_byte(0x4010, 0x55)
+    cpu.push_byte_to_stack(0x66)
+    print(f"Pages written since generation {since}: {[f'${p:02X}xx' for p in cpu.memory.changed_pages(since)]}")
@@ -0,0 +1,137 @@
+# m6800_sdk/simulator/heatmap.py
+
+# Adres başına okuma/yazma/yürütme sayaçları (bellek erişim ısı haritası). İsteğe bağlıdır:
+# kapalıyken Memory ve Simulator'ın sıcak yollarına hiçbir maliyet eklenmez.
+#
+# Açıldığında Memory nesnesinin read_byte/write_byte metotları, adresi bir Python listesine
+# ekleyip asıl metodu çağıran sarmalayıcılarla (instance attribute) gölgelenir; yürütülen
+# komutların adreslerini Simulator.run_batch ekler. Sayaçlar erişim başına değil, blok
+# (batch) sonunda flush() ile toplu olarak güncellenir: bekleyen adres listesi tek bir
+# numpy.bincount çağrısıyla uint32 dizilerine eklenir.
+#
+# Okumalara opcode/operand getirmeleri de dahildir (veri yolundaki her okuma sayılır).
+#
+# numpy opsiyoneldir; kurulu değilse available() False döner ve AccessCounter oluşturulamaz.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HEATMAP_SIDE = 256 # 256x256 görüntü: satır = adresin yüksek byte'ı (sayfa), sütun = düşük byte
+KINDS = ('read', 'write', 'execute')
+
+def available():
+    """Isı haritası için gereken numpy kurulu mu?"""
+    return np is not None
+
+class AccessCounter:
+    def __init__(self, memory):
+        if np is None:
+            raise RuntimeError("Memory access heatmap requires numpy (pip install numpy).")
+        self.memory = memory
+        self.counts = {kind: np.zeros(memory.size, dtype=np.uint32) for kind in KINDS}
+        # Blok sonuna kadar biriken adresler; sarmalayıcılar bu listelere referansla ekler
+        self.pending = {kind: [] for kind in KINDS}
+        self.attached = False
+        self.version = 0 # Sayaçlar her değiştiğinde artar (görüntü yalnızca gerektiğinde yeniden üretilsin)
+
+    def attach(self):
+        """Memory okuma/yazmalarını kaydetmeye başlar."""
+        if self.attached:
+            return
+        memory = self.memory
+        read_byte, write_byte = memory.read_byte, memory.write_byte # Sınıftaki asıl metotlar
+        record_read, record_write = self.pending['read'].append, self.pending['write'].append
+
+        def recording_read(address):
+            record_read(address)
+            return read_byte(address)
+
+        def recording_write(address, value):
+            record_write(address)
+            write_byte(address, value)
+
+        # read_word/write_word ve CPU yığın işlemleri self.read_byte üzerinden geçtiği için onlar da sayılır
+        memory.read_byte = recording_read
+        memory.write_byte = recording_write
+        self.attached = True
+
+    def detach(self):
+        """
+        Kaydı durdurur. Burada flush() çağrılmaz: detach UI thread'inden, worker bir batch
+        yürütürken çağrılabilir. Bekleyen erişimleri o batch'in sonunda worker'ın kendisi ekler
+        (bkz. Simulator.run_batch).
+        """
+        if not self.attached:
+            return
+        del self.memory.read_byte, self.memory.write_byte # Sınıf metotları yeniden görünür olur
+        self.attached = False
+
+    def flush(self):
+        """Bekleyen adresleri sayaçlara toplu olarak ekler (blok sınırında çağrılır)."""
+        size = self.memory.size
+        for kind, pending in self.pending.items():
+            if not pending:
+                continue
+            taken = len(pending)
+            addresses = np.fromiter(pending, dtype=np.intp, count=taken)
+            # Sadece okunan kısım silinir: bu arada eklenen adresler bir sonraki flush'a kalır.
+            # Liste nesnesi aynı kalmalı: sarmalayıcılar onun append'ini tutuyor
+            del pending[:taken]
+            hits = np.bincount(addresses[(addresses >= 0) & (addresses < size)], minlength=size)
+            np.add(self.counts[kind], hits, out=self.counts[kind], casting='unsafe')
+            self.version += 1
+
+    def clear(self):
+        for kind in KINDS:
+            self.counts[kind].fill(0)
+            del self.pending[kind][:]
+        self.version += 1
+
+    def totals(self):
+        """{tür: toplam erişim sayısı}."""
+        return {kind: int(self.counts[kind].sum(dtype=np.uint64)) for kind in KINDS}
+
+    def counts_at(self, address):
+        """(okuma, yazma, yürütme) sayıları."""
+        return tuple(int(self.counts[kind][address]) for kind in KINDS)
+
+    def rgb(self):
+        """
+        HEATMAP_SIDE x HEATMAP_SIDE x 3 uint8 dizi: kırmızı = yazma, yeşil = okuma, mavi = yürütme.
+        Her kanal kendi en büyük değerine göre logaritmik ölçeklenir; tek bir sıcak döngü diğer
+        adresleri görünmez yapmasın.
+        """
+        image = np.zeros((HEATMAP_SIDE * HEATMAP_SIDE, 3), dtype=np.uint8)
+        for channel, kind in enumerate(('write', 'read', 'execute')):
+            counts = self.counts[kind][:HEATMAP_SIDE * HEATMAP_SIDE]
+            peak = counts.max() if counts.size else 0
+            if peak:
+                levels = np.log1p(counts.astype(np.float32)) * (255 / np.log1p(np.float32(peak)))
+                image[:counts.size, channel] = levels.astype(np.uint8)
+        return image.reshape(HEATMAP_SIDE, HEATMAP_SIDE, 3)
+
+    def ppm(self):
+        """rgb() görüntüsünün ikili PPM (P6) verisi; tk.PhotoImage(data=..., format='PPM') ile yüklenir."""
+        return b"P6 %d %d 255\n" % (HEATMAP_SIDE, HEATMAP_SIDE) + self.rgb().tobytes()
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    from .simulator import Simulator
+
+    if not available():
+        print("numpy is not installed; heatmap demo skipped.")
+    else:
+        sim = Simulator()
+        # LOOP: LDAA $10 ; STAA $11 ; INX ; BRA LOOP
+        sim.load_program([0x96, 0x10, 0x97, 0x11, 0x08, 0x20, 0xF9], 0x0100)
+        sim.enable_access_counting(True)
+        for _ in range(10):
+            sim.run_batch(1000)
+        counter = sim.access_counter
+        print("totals:", counter.totals())
+        for address in (0x0010, 0x0011, 0x0100, 0x0105):
+            print(f"${address:04X} read/write/execute: {counter.counts_at(address)}")
+        print(f"PPM image: {len(counter.ppm())} bytes")
+        sim.enable_access_counting(False)
@@ -1,7 +1,7 @@
 from .cpu import CPU, CCR
 from assembler.opcode_table import (
     FLAG_H, FLAG_I, FLAG_N, FLAG_Z, FLAG_V, FLAG_C,
-    INSTRUCTION_SET, # Artık tüm instruction setini alıyoruz
+    INSTRUCTION_SET, DECODE_TABLE, # Opcode -> (mnemonic, mod, uzunluk, cycle, flag) düz tablosu
     MODE_IMPLIED, MODE_IMMEDIATE, MODE_DIRECT,
     MODE_EXTENDED, MODE_INDEXED, MODE_RELATIVE
 )
@@ -15,22 +15,28 @@ class InstructionExecutor:
         self.dispatch_table = self._build_dispatch_table()
 
     def _build_dispatch_table(self):
-        table = {}
-        # Her mnemonic ve modu için handler'ı direkt opkoda map et
-        for mnemonic_upper, modes_dict in INSTRUCTION_SET.items():
-            handler_method_name = f"_execute_{mnemonic_upper.lower()}"
-            if hasattr(self, handler_method_name):
-                handler_func_for_mnemonic = getattr(self, handler_method_name)
-                for mode, details in modes_dict.items():
-                    opcode_val = details.get('opcode')
-                    if opcode_val is not None:
-                        if opcode_val not in table:
-                            table[opcode_val] = handler_func_for_mnemonic
-                        # else:
-                            # print(f"Warning: Opcode {opcode_val:02X} already has a handler. Mnemonic: {mnemonic_upper}, Mode: {mode}")
-            # else:
-                # print(f"Warning: No handler method found for mnemonic {mnemonic_upper} ({handler_method_name})")
-        return table
+        """
+        opcode -> (handler, mnemonic, mode, cycles, op_info) eşlemesini opcode_table.DECODE_TABLE
+        üzerinden 256 elemanlı bir tuple olarak kurar. Handler'ı olmayan veya tanımsız
+        opcode'lar için eleman None'dır; böylece her komutta sadece tek bir indeksleme yapılır.
+        """
+        table = [None] * 256
+        for opcode, entry in enumerate(DECODE_TABLE):
+            if entry is None:
+                continue
+            handler = getattr(self, f"_execute_{entry.mnemonic.lower()}", None)
+            if handler is not None:
+                table[opcode] = (handler, entry.mnemonic, entry.mode, entry.cycles,
+                                 INSTRUCTION_SET[entry.mnemonic][entry.mode])
+        return tuple(table)
+
+    def missing_handlers(self):
+        """
+        Tutarlılık kontrolü: opcode tablosunda tanımlı olup simülatörde handler'ı
+        bulunmayan opcode'ları döndürür. Döndürülen değer: [(opcode, mnemonic, mod), ...]
+        """
+        return [(opcode, entry.mnemonic, entry.mode) for opcode, entry in enumerate(DECODE_TABLE)
+                if entry is not None and self.dispatch_table[opcode] is None]
 
     def _fetch_operand_byte(self):
         val = self.cpu.memory.read_byte(self.cpu.PC)
@@ -65,31 +71,13 @@ class InstructionExecutor:
             self.cpu.is_halted = True
             return 0
 
-        handler_func = self.dispatch_table.get(self.current_opcode_byte)
-
-        if handler_func:
-            mnemonic_found = None
-            mode_found = None
-            self.op_info = None
-
-            for mnem, modes_dict in INSTRUCTION_SET.items():
-                for mode, details in modes_dict.items():
-                    if details.get('opcode') == self.current_opcode_byte:
-                        mnemonic_found = mnem
-                        mode_found = mode
-                        self.op_info = details
-                        break
-                if mnemonic_found:
-                    break
-
-            if not self.op_info:
-                print(f"Halt: Opcode ${self.current_opcode_byte:02X} at ${start_pc:04X} has no op_info in table.")
-                self.cpu.is_halted = True
-                return 0
+        dispatch_entry = self.dispatch_table[self.current_opcode_byte]
+
+        if dispatch_entry:
+            handler_func, mnemonic_found, mode_found, cycles, self.op_info = dispatch_entry
             try:
                 # print(f"PC:${start_pc:04X} Op:${self.current_opcode_byte:02X} ({mnemonic_found} {mode_found}) A:{self.cpu.A:02X} B:{self.cpu.B:02X} X:{self.cpu.X:04X} SP:{self.cpu.SP:04X} CCR:{self.cpu.CCR}")
                 handler_func(mode_found)
-                cycles = self.op_info.get('cycles', 1)
                 self.cpu.cycles_executed += cycles
                 return cycles
             except ValueError as e:
@@ -0,0 +1,98 @@
+# m6800_sdk/simulator/runner.py
+
+# Simülatörü Tk ana thread'inden ayrı bir worker thread'de, büyük komut grupları (batch)
+# halinde çalıştırır. Worker her batch'ten sonra CPU register'larının değişmez bir
+# anlık görüntüsünü (SimulatorSnapshot) yayınlar; UI bu görüntüyü root.after ile ~30 fps
+# hızında okur. Böylece komut başına UI güncellemesi yapılmaz, pencere çalışma boyunca
+# tepki verir ve Stop düğmesi (is_running bayrağı) en geç bir batch sonra etkili olur.
+#
+# Anlık görüntü tek bir tuple olarak atanır; CPython'da referans ataması atomik olduğundan
+# okuyucu her zaman tutarlı (aynı batch sonundaki) bir register kümesi görür. Bellek ise
+# doğrudan okunur; çalışma sırasında bir kare, yarım kalmış bir komutun yazımını gösterebilir.
+
+import threading
+import time
+from collections import namedtuple
+
+# Bir batch'teki komut sayısı: Python yorumlayıcısında birkaç ms'lik çalışma; stop gecikmesini
+# ve snapshot sıklığını belirler.
+DEFAULT_BATCH_SIZE = 5000
+
+SimulatorSnapshot = namedtuple('SimulatorSnapshot',
+                               'A B X PC SP CCR ccr_str cycles steps running reason elapsed')
+
+class BackgroundRunner:
+    def __init__(self, simulator, batch_size=DEFAULT_BATCH_SIZE):
+        self.simulator = simulator
+        self.batch_size = batch_size
+        self._thread = None
+        self._steps = 0
+        self._started_at = 0.0
+        self._snapshot = self._make_snapshot(False, None)
+
+    def start(self):
+        """
+        Sürekli çalışmayı arka planda başlatır. CPU durmuşsa veya zaten çalışıyorsa False döner.
+        """
+        if self.is_alive() or self.simulator.cpu.is_halted:
+            return False
+        self.simulator.is_running = True
+        self._steps = 0
+        self._started_at = time.perf_counter()
+        self._snapshot = self._make_snapshot(True, None)
+        self._thread = threading.Thread(target=self._run, name="m6800-simulator", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, wait=False):
+        """Çalışmayı durdurur; wait=True ise worker'ın mevcut batch'i bitirmesini bekler."""
+        self.simulator.is_running = False
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self):
+        """Son yayınlanan SimulatorSnapshot (UI thread'inden çağrılır)."""
+        return self._snapshot
+
+    def _run(self):
+        simulator = self.simulator
+        reason = None
+        try:
+            while simulator.is_running:
+                steps, reason = simulator.run_batch(self.batch_size)
+                self._steps += steps
+                if reason:
+                    break
+                self._snapshot = self._make_snapshot(True, None)
+        finally:
+            simulator.is_running = False
+            simulator.clear_temporary_breakpoint() # "Run to cursor" hedefi sadece bu çalışma için
+            self._snapshot = self._make_snapshot(False, reason or "Stopped")
+
+    def _make_snapshot(self, running, reason):
+        cpu = self.simulator.cpu
+        ccr = cpu.CCR
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return SimulatorSnapshot(cpu.A, cpu.B, cpu.X, cpu.PC, cpu.SP, ccr.get_byte(), str(ccr),
+                                 cpu.cycles_executed, self._steps, running, reason, elapsed)
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    from .simulator import Simulator
+
+    sim = Simulator()
+    # LOOP: INX ; BRA LOOP -> sonsuz döngü, sadece stop() ile durur
+    sim.load_program([0x08, 0x20, 0xFD], 0x0100)
+    runner = BackgroundRunner(sim)
+    runner.start()
+    for _ in range(5):
+        time.sleep(1 / 30) # UI'ın root.after ile yaptığı yoklamanın benzeri
+        snap = runner.snapshot()
+        print(f"running={snap.running} steps={snap.steps:8d} X=${snap.X:04X} PC=${snap.PC:04X}")
+    runner.stop(wait=True)
+    snap = runner.snapshot()
+    print(f"stopped: reason={snap.reason} steps={snap.steps} "
+          f"({snap.steps / snap.elapsed:,.0f} instructions/s)")
@@ -1,3 +1,5 @@
+import time
+
 from .cpu import CPU
 from .instruction_executor import InstructionExecutor
 # opcode_table'ı InstructionExecutor'a vermek için import etmemiz gerekebilir,
@@ -11,9 +13,19 @@ class Simulator:
         # burada tekrar vermeye gerek yok. Eğer constructor'ı bekliyorsa:
         # self.executor = InstructionExecutor(self.cpu, ot_module)
         self.executor = InstructionExecutor(self.cpu, None) # None geçiyoruz çünkü executor kendi importunu yapıyor
+        for opcode, mnemonic, mode in self.executor.missing_handlers():
+            print(f"Warning: Opcode ${opcode:02X} ({mnemonic} {mode}) has no handler in the simulator.")
         self.is_running = False # Sürekli çalıştırma için flag
         self.breakpoints = set() # {address1, address2, ...}
+        self.temporary_breakpoint = None # "Run to cursor" için eklenen, çalışma bitince kaldırılan adres
         self.max_steps_run = 1000000 # Sürekli çalıştırmada sonsuz döngüleri engellemek için limit
+        # Performans sayaçları (bkz. stats.PerformanceSampler); reset_cpu ile sıfırlanmaz, hep artar
+        self.target_clock_hz = 1_000_000 # Karşılaştırma için hedef donanım saati (MC6800: 1 MHz)
+        self.instructions_executed = 0
+        self.busy_time = 0.0 # run_batch içinde geçen toplam süre (s)
+        self.breakpoint_checks = 0 # Breakpoint kontrolü yapılarak yürütülen komut sayısı
+        self.last_batch_end = time.perf_counter() # Sayaçların en son güncellendiği an
+        self.access_counter = None # Açıksa bellek erişim ısı haritası sayaçları (bkz. heatmap.py)
 
         # UI'ı güncellemek için callback fonksiyonları (opsiyonel, daha sonra eklenebilir)
         self.on_step_callback = None # Her adımdan sonra çağrılır
@@ -33,6 +45,20 @@ class Simulator:
             print(f"Simulator Error: Could not load program. {e}")
             return False
 
+    def load_segments(self, segments, entry_point):
+        """
+        Assembler'ın segment listesini belleğe yükler ve PC'yi giriş noktasına ayarlar.
+        """
+        try:
+            self.cpu.memory.load_segments(segments)
+            self.cpu.PC = entry_point
+            self.cpu.is_halted = False
+            print(f"Simulator: {len(segments)} segment(s) loaded. PC set to ${entry_point:04X}.")
+            return True
+        except ValueError as e:
+            print(f"Simulator Error: Could not load segments. {e}")
+            return False
+
     def reset_cpu(self, program_start_address=None):
         """CPU'yu sıfırlar ve PC'yi belirtilen adrese (varsa) ayarlar."""
         self.cpu.reset()
@@ -40,6 +66,9 @@ class Simulator:
             self.cpu.PC = program_start_address
         self.is_running = False
         self.breakpoints.clear()
+        self.temporary_breakpoint = None
+        if self.access_counter is not None:
+            self.access_counter.clear() # Yeni çalışmanın ısı haritası temiz başlasın
         if self.on_step_callback: # UI'yı da sıfırlanmış durumla güncelle
             self.on_step_callback(self.cpu.get_state_str(), self.cpu.PC, self.cpu.memory.get_memory_dump(self.cpu.PC, 16))
 
@@ -55,7 +84,13 @@ class Simulator:
                 self.on_halt_callback("CPU Halted")
             return False
 
+        recording = self._recording_counter()
+        if recording is not None:
+            recording.pending['execute'].append(self.cpu.PC)
         executed_cycles = self.executor.execute_next_instruction()
+        self.instructions_executed += 1
+        if recording is not None:
+            recording.flush()
 
         if self.on_step_callback:
             # UI'a güncel durumu gönder
@@ -117,6 +152,107 @@ class Simulator:
              print("Simulator: Run stopped by user or unknown reason.")
 
 
+    def run_batch(self, max_steps):
+        """
+        Callback çağırmadan en fazla max_steps komut yürütür (bkz. runner.BackgroundRunner).
+        UI güncellemesi ve durum mesajı üretilmediği için run()'dan çok daha hızlıdır.
+        Döndürülen değer: (yürütülen_komut_sayısı, durma_nedeni); CPU durmadıysa ve
+        breakpoint'e gelinmediyse neden None'dır.
+        """
+        if self.cpu.is_halted:
+            return 0, "CPU Halted"
+        start = time.perf_counter()
+        # Breakpoint yoksa kontrol etmeyen döngü kullanılır; çalışma sırasında eklenen bir
+        # breakpoint bir sonraki batch'ten itibaren etkili olur.
+        recording = self._recording_counter()
+        if recording is not None:
+            steps, reason = self._batch_recording(recording, max_steps)
+            if self.breakpoints:
+                self.breakpoint_checks += steps
+            # Sayaçlar blok sınırında, worker thread'inde toplu güncellenir; kayıt bu batch
+            # sırasında kapatıldıysa (detach) bekleyen erişimler de burada eklenir
+            recording.flush()
+        elif self.breakpoints:
+            steps, reason = self._batch_with_breakpoints(max_steps)
+            self.breakpoint_checks += steps
+        else:
+            steps, reason = self._batch_without_breakpoints(max_steps)
+        if reason and self.temporary_breakpoint == self.cpu.PC and not self.cpu.is_halted:
+            reason = f"Reached ${self.cpu.PC:04X}" # Run to cursor hedefi, kullanıcı breakpoint'i değil
+        self.instructions_executed += steps
+        self.last_batch_end = time.perf_counter()
+        self.busy_time += self.last_batch_end - start
+        return steps, reason
+
+    def _batch_with_breakpoints(self, max_steps):
+        cpu = self.cpu
+        execute = self.executor.execute_next_instruction
+        breakpoints = self.breakpoints
+        for steps in range(1, max_steps + 1):
+            execute()
+            if cpu.is_halted:
+                return steps, f"CPU Halted at ${cpu.PC:04X}"
+            if cpu.PC in breakpoints:
+                return steps, f"Breakpoint at ${cpu.PC:04X}"
+        return max_steps, None
+
+    def _batch_without_breakpoints(self, max_steps):
+        cpu = self.cpu
+        execute = self.executor.execute_next_instruction
+        for steps in range(1, max_steps + 1):
+            execute()
+            if cpu.is_halted:
+                return steps, f"CPU Halted at ${cpu.PC:04X}"
+        return max_steps, None
+
+    def _batch_recording(self, counter, max_steps):
+        """Erişim sayacı açıkken: yürütülen her komutun adresi bekleyen listeye eklenir."""
+        cpu = self.cpu
+        execute = self.executor.execute_next_instruction
+        breakpoints = self.breakpoints
+        record_execute = counter.pending['execute'].append
+        for steps in range(1, max_steps + 1):
+            record_execute(cpu.PC)
+            execute()
+            if cpu.is_halted:
+                return steps, f"CPU Halted at ${cpu.PC:04X}"
+            if cpu.PC in breakpoints:
+                return steps, f"Breakpoint at ${cpu.PC:04X}"
+        return max_steps, None
+
+    def _recording_counter(self):
+        """Kayıt açıksa erişim sayacı, değilse None (kapatılmış sayaç sadece okunmak için tutulur)."""
+        counter = self.access_counter
+        if counter is not None and counter.attached:
+            return counter
+        return None
+
+    def enable_access_counting(self, enabled):
+        """
+        Adres başına okuma/yazma/yürütme sayaçlarını açar veya kapatır (numpy gerekir).
+        Kapatınca sayaçlar korunur, tekrar açınca kaldığı yerden devam eder.
+        Döndürülen değer: (başarılı, hata_mesajı)
+        """
+        if enabled:
+            if self.access_counter is None:
+                from .heatmap import AccessCounter
+                try:
+                    self.access_counter = AccessCounter(self.cpu.memory)
+                except RuntimeError as e:
+                    return False, str(e)
+            self.access_counter.attach()
+        elif self.access_counter is not None:
+            self.access_counter.detach()
+        return True, None
+
+    def counters(self):
+        """
+        Performans sayaçları ve güncellendikleri an (son batch'in bitişi; bkz. stats.PerformanceSampler).
+        Zaman damgası sayaçlarla birlikte alındığı için çalışma bittikten sonraki boş süre hızları düşürmez.
+        """
+        return (self.last_batch_end, self.instructions_executed, self.cpu.cycles_executed,
+                self.busy_time, self.breakpoint_checks)
+
     def stop_running(self):
         """Sürekli çalışmayı durdurur."""
         self.is_running = False
@@ -138,8 +274,24 @@ class Simulator:
 
     def clear_breakpoints(self):
         self.breakpoints.clear()
+        self.temporary_breakpoint = None
         print("Simulator: All breakpoints cleared.")
 
+    def set_temporary_breakpoint(self, address):
+        """
+        Bir sonraki çalışma durduğunda (herhangi bir nedenle) kaldırılan breakpoint ("Run to cursor").
+        Adreste zaten kullanıcı breakpoint'i varsa ona dokunulmaz.
+        """
+        self.clear_temporary_breakpoint()
+        if address not in self.breakpoints:
+            self.breakpoints.add(address)
+            self.temporary_breakpoint = address
+
+    def clear_temporary_breakpoint(self):
+        if self.temporary_breakpoint is not None:
+            self.breakpoints.discard(self.temporary_breakpoint)
+            self.temporary_breakpoint = None
+
     # --- UI Callback Ayarları ---
     def set_on_step_callback(self, callback_func):
         """Her adımdan sonra çağrılacak UI güncelleme fonksiyonunu ayarlar."""
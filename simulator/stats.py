@@ -0,0 +1,112 @@
+# m6800_sdk/simulator/stats.py
+
+# Canlı emülasyon istatistikleri. PerformanceSampler, Simulator.counters() değerlerini düşük
+# bir sıklıkta (örn. 2 Hz) okur ve iki örnek arasındaki farklardan hızları hesaplar:
+#   - saniyedeki komut sayısı ve emüle edilen cycle/s
+#   - efektif saat (MHz) ve hedef donanım saatine oranı
+#   - breakpoint kontrolünün tahmini maliyeti (çalışma süresine oranı)
+#   - UI'ın bildirdiği kare yenileme süresi
+#
+# Breakpoint kontrolü komut başına ölçülmez (ölçümün kendisi kontrolden pahalı olurdu):
+# kontrollü yürütülen komut sayısı, bir "PC in breakpoints" kontrolünün kalibre edilmiş
+# süresiyle çarpılır.
+
+import time
+from collections import namedtuple
+
+PerformanceSample = namedtuple('PerformanceSample',
+                               'instructions_per_sec cycles_per_sec effective_mhz clock_ratio '
+                               'breakpoint_overhead ui_refresh_ms')
+
+def measure_breakpoint_check(breakpoints, samples=20000):
+    """Tek bir 'pc in breakpoints' kontrolünün (boş döngü farkı ile) tahmini süresi (s)."""
+    addresses = range(samples)
+    start = time.perf_counter()
+    for pc in addresses:
+        pc in breakpoints
+    checked = time.perf_counter() - start
+    start = time.perf_counter()
+    for pc in addresses:
+        pass
+    baseline = time.perf_counter() - start
+    return max(0.0, checked - baseline) / samples
+
+class PerformanceSampler:
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self._previous = None
+        self._check_cost = None # Kalibre edilmiş breakpoint kontrol süresi
+        self._check_cost_size = -1 # Kalibrasyonun yapıldığı breakpoint kümesi boyutu
+        self._ui_time = 0.0
+        self._ui_frames = 0
+
+    def reset(self):
+        """Bir sonraki sample() yeni bir başlangıç noktası alır (örn. çalıştırma başında)."""
+        # Başlangıç anı şimdi: son batch'ten bu yana geçen boş süre ilk örneğe girmesin
+        self._previous = (time.perf_counter(),) + self.simulator.counters()[1:]
+        self._ui_time = 0.0
+        self._ui_frames = 0
+
+    def add_ui_frame(self, seconds):
+        """UI'ın bir kareyi (register + bellek görünümü) yenilemek için harcadığı süre."""
+        self._ui_time += seconds
+        self._ui_frames += 1
+
+    def sample(self):
+        """
+        Son örnekten bu yana geçen aralığın istatistikleri (PerformanceSample); ilk çağrıda veya
+        sayaçlar geriye gittiyse (CPU reset) None döner ve yeni başlangıç noktası alınır.
+        """
+        current = self.simulator.counters()
+        previous, self._previous = self._previous, current
+        ui_refresh_ms = self._ui_time / self._ui_frames * 1000 if self._ui_frames else None
+        self._ui_time = 0.0
+        self._ui_frames = 0
+        if previous is None:
+            return None
+        elapsed, instructions, cycles, busy, checks = (now - before for now, before in zip(current, previous))
+        if elapsed <= 0 or instructions <= 0 or cycles < 0:
+            return None # Bu aralıkta çalışma olmadı veya CPU reset edildi
+        cycles_per_sec = cycles / elapsed
+        return PerformanceSample(instructions / elapsed, cycles_per_sec, cycles_per_sec / 1e6,
+                                 cycles_per_sec / self.simulator.target_clock_hz,
+                                 self._breakpoint_overhead(checks, busy), ui_refresh_ms)
+
+    def _breakpoint_overhead(self, checks, busy):
+        """Breakpoint kontrollerinin çalışma süresine tahmini oranı; kontrol yapılmadıysa None."""
+        if checks <= 0 or busy <= 0:
+            return None
+        breakpoints = self.simulator.breakpoints
+        if self._check_cost is None or len(breakpoints) != self._check_cost_size:
+            self._check_cost = measure_breakpoint_check(frozenset(breakpoints))
+            self._check_cost_size = len(breakpoints)
+        return min(1.0, checks * self._check_cost / busy)
+
+def format_sample(sample, target_clock_hz):
+    """HUD satırları: [(etiket, değer), ...]."""
+    overhead = sample.breakpoint_overhead
+    return [
+        ("Instructions/s", f"{sample.instructions_per_sec:,.0f}"),
+        ("Cycles/s", f"{sample.cycles_per_sec:,.0f}"),
+        ("Effective clock", f"{sample.effective_mhz:.2f} MHz ({sample.clock_ratio:.0%} of "
+                            f"{target_clock_hz / 1e6:.2f} MHz)"),
+        ("Breakpoint checks", "off (no breakpoints)" if overhead is None else f"~{overhead:.1%} of run time"),
+        ("UI refresh", "-" if sample.ui_refresh_ms is None else f"{sample.ui_refresh_ms:.1f} ms/frame"),
+    ]
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    from .simulator import Simulator
+
+    sim = Simulator()
+    # LOOP: INX ; BRA LOOP
+    sim.load_program([0x08, 0x20, 0xFD], 0x0100)
+    sampler = PerformanceSampler(sim)
+    for breakpoints in ((), (0x2000, 0x3000)):
+        sim.breakpoints.update(breakpoints)
+        sampler.reset()
+        for _ in range(20):
+            sim.run_batch(5000)
+        for label, value in format_sample(sampler.sample(), sim.target_clock_hz):
+            print(f"{label:>18}: {value}")
+        print()
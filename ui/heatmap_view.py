@@ -0,0 +1,119 @@
+# m6800_sdk/ui/heatmap_view.py
+
+# Bellek erişim ısı haritası paneli (bkz. simulator/heatmap.py). 64 KiB adres alanı 256x256
+# piksellik tek bir görüntüdür: satır = sayfa (adresin yüksek byte'ı), sütun = düşük byte.
+# Kırmızı yazma, yeşil okuma, mavi yürütme yoğunluğunu gösterir.
+#
+# Görüntü, sayaçlardan üretilen PPM verisiyle aynı PhotoImage üzerine yazılır (her karede yeni
+# bir image oluşturulmaz) ve sadece sayaçlar değiştiyse, HEATMAP_REFRESH_MS aralıkla yenilenir.
+# Kayıt kapalıyken zamanlayıcı da durur.
+
+import tkinter as tk
+from tkinter import ttk
+
+from simulator import heatmap
+from simulator.heatmap import HEATMAP_SIDE
+
+HEATMAP_REFRESH_MS = 300
+
+class HeatmapView(ttk.Frame):
+    def __init__(self, parent, simulator, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.simulator = simulator
+        self._refresh_job = None
+        self._shown_version = None # Son çizilen sayaç sürümü
+
+        controls = ttk.Frame(self)
+        controls.pack(fill=tk.X, pady=2)
+        self.record_var = tk.BooleanVar(value=False)
+        self.record_check = ttk.Checkbutton(controls, text="Record accesses", variable=self.record_var,
+                                            command=self._on_record_toggled)
+        self.record_check.pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="Clear", command=self.clear).pack(side=tk.LEFT, padx=2)
+        ttk.Label(controls, text="R=write G=read B=execute").pack(side=tk.LEFT, padx=8)
+
+        self.image = tk.PhotoImage(width=HEATMAP_SIDE, height=HEATMAP_SIDE)
+        # Kenarlık yok: fare koordinatı doğrudan piksel (adres) koordinatıdır
+        self.image_label = tk.Label(self, image=self.image, background="black", cursor="crosshair",
+                                    borderwidth=0, highlightthickness=0)
+        self.image_label.pack(padx=5, pady=5)
+        self.image_label.bind("<Motion>", self._on_motion)
+
+        self.info_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.info_var, anchor=tk.W).pack(fill=tk.X, padx=5)
+
+        if not heatmap.available():
+            self.record_check.config(state=tk.DISABLED)
+            self.info_var.set("Install numpy to enable the memory access heatmap.")
+
+    def refresh(self):
+        """Sayaçlar son çizimden beri değiştiyse görüntüyü yeniden üretir."""
+        counter = self.simulator.access_counter
+        if counter is None or counter.version == self._shown_version:
+            return
+        self._shown_version = counter.version
+        self.image.configure(data=counter.ppm(), format="PPM")
+        totals = counter.totals()
+        self.info_var.set(f"Reads: {totals['read']:,}  Writes: {totals['write']:,}  "
+                          f"Executes: {totals['execute']:,}")
+
+    def clear(self):
+        if self.simulator.access_counter is not None:
+            self.simulator.access_counter.clear()
+            self.refresh()
+
+    def stop(self):
+        """Kaydı kapatır (örn. pencere kapanırken)."""
+        self.record_var.set(False)
+        self._on_record_toggled()
+
+    def _on_record_toggled(self):
+        if self.record_var.get():
+            success, error = self.simulator.enable_access_counting(True)
+            if not success:
+                self.record_var.set(False)
+                self.info_var.set(error)
+                return
+            self._schedule_refresh()
+        else:
+            self.simulator.enable_access_counting(False)
+            if self._refresh_job is not None:
+                self.after_cancel(self._refresh_job)
+                self._refresh_job = None
+            # Çalışma sürüyorsa son batch'in erişimlerini worker o batch'in sonunda ekler;
+            # MainWindow çalışma bitince refresh() çağırır
+            self.refresh()
+
+    def _schedule_refresh(self):
+        self.refresh()
+        self._refresh_job = self.after(HEATMAP_REFRESH_MS, self._schedule_refresh)
+
+    def _on_motion(self, event):
+        counter = self.simulator.access_counter
+        if counter is None or not (0 <= event.x < HEATMAP_SIDE and 0 <= event.y < HEATMAP_SIDE):
+            return
+        address = event.y * HEATMAP_SIDE + event.x
+        reads, writes, executes = counter.counts_at(address)
+        self.info_var.set(f"${address:04X}  reads: {reads:,}  writes: {writes:,}  executes: {executes:,}")
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    from simulator.simulator import Simulator
+
+    sim = Simulator()
+    # LOOP: LDAA $10 ; STAA $11 ; INX ; BRA LOOP
+    sim.load_program([0x96, 0x10, 0x97, 0x11, 0x08, 0x20, 0xF9], 0x0100)
+    root = tk.Tk()
+    root.title("Heatmap demo")
+    view = HeatmapView(root, sim)
+    view.pack(fill=tk.BOTH, expand=True)
+    view.record_var.set(True)
+    view._on_record_toggled()
+
+    def tick():
+        sim.run_batch(2000)
+        root.after(10, tick)
+
+    root.after(10, tick)
+    root.after(3000, root.destroy)
+    root.mainloop()
@@ -0,0 +1,169 @@
+# m6800_sdk/ui/hex_view.py
+
+# Sanallaştırılmış bellek (hex) görünümü. 64 KiB'ın tamamı 4096 satırlık sanal bir liste
+# olarak kaydırılabilir, ama Text widget'ında sadece görünen satırlar bulunur. Satırlar
+# doğrudan bytearray dilimlerinden bytes.hex() ve bytes.translate() ile toplu olarak
+# biçimlendirilir; her satırın son çizildiği içerik saklanır ve bir sonraki karede sadece
+# içeriği değişen satırlar yeniden yazılır.
+#
+# Bir sayfa takipçisi (simulator.cpu.Memory) verilirse, son kareden beri yazılmamış
+# sayfalardaki satırlar hiç okunmaz; sadece değişen sayfaların satırları karşılaştırılır.
+
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+from simulator.cpu import PAGE_SHIFT
+
+BYTES_PER_ROW = 16
+WHEEL_ROWS = 3 # Fare tekerleğinin bir adımında kaydırılan satır sayısı
+
+# Yazdırılamayan byte'lar ASCII sütununda '.' olarak gösterilir
+_ASCII_TABLE = bytes(b if 32 <= b <= 126 else 0x2E for b in range(256))
+
+def format_row(address, data):
+    """Tek bir bellek satırı: '$0100: 86 10 ...  |..|' (data en fazla BYTES_PER_ROW byte)."""
+    return (f"${address:04X}: {data.hex(' ').upper():<{BYTES_PER_ROW * 3 - 1}}  "
+            f"|{data.translate(_ASCII_TABLE).decode('ascii')}|")
+
+class HexView(ttk.Frame):
+    def __init__(self, parent, memory_getter, font=("Courier New", 9), page_tracker=None, **kwargs):
+        """
+        memory_getter(): gösterilecek bytearray'i döndürür. Memory.clear() diziyi yeniden
+        oluşturduğu için dizinin kendisi değil, her karede çağrılan bir fonksiyon alınır.
+        page_tracker: mark()/changed_pages(since) sağlayan nesne (örn. Memory); None ise
+        her karede görünen tüm satırlar karşılaştırılır.
+        """
+        super().__init__(parent, **kwargs)
+        self._memory = memory_getter
+        self._page_tracker = page_tracker
+        self._since = 0 # page_tracker'dan son alınan nesil
+        self._top_row = 0
+        self._rows = 0
+        self._rendered = [] # Görünen satır -> (adres, son çizilen byte'lar)
+        self._line_height = tkfont.Font(font=font).metrics('linespace')
+
+        self.text = tk.Text(self, wrap=tk.NONE, width=BYTES_PER_ROW * 4 + 9, height=16,
+                            state=tk.DISABLED, font=font, cursor="arrow")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.text.bind("<Configure>", self._on_configure)
+        self.text.bind("<MouseWheel>", self._on_mousewheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll_rows(-WHEEL_ROWS))
+        self.text.bind("<Button-5>", lambda event: self.scroll_rows(WHEEL_ROWS))
+        self._resize(16)
+
+    @property
+    def total_rows(self):
+        return (len(self._memory()) + BYTES_PER_ROW - 1) // BYTES_PER_ROW
+
+    def visible_range(self):
+        """Görünen adres aralığı: (ilk_adres, son_adres_hariç)."""
+        return self._top_row * BYTES_PER_ROW, (self._top_row + self._rows) * BYTES_PER_ROW
+
+    def goto(self, address):
+        """address'in satırını görünümün ortasına getirir."""
+        self._set_top_row(address // BYTES_PER_ROW - self._rows // 2)
+
+    def ensure_visible(self, address):
+        """address görünmüyorsa görünümü ona kaydırır (görünüyorsa hiçbir şey yapmaz)."""
+        first, end = self.visible_range()
+        if not (first <= address < end):
+            self.goto(address)
+
+    def scroll_rows(self, delta):
+        self._set_top_row(self._top_row + delta)
+        return "break"
+
+    def refresh(self):
+        """Görünen satırlardan içeriği değişenleri yeniden yazar."""
+        data = self._memory()
+        dirty_pages = None
+        if self._page_tracker is not None:
+            generation = self._page_tracker.mark()
+            dirty_pages = set(self._page_tracker.changed_pages(self._since))
+            self._since = generation
+        changed = []
+        for index, previous in enumerate(self._rendered):
+            address = (self._top_row + index) * BYTES_PER_ROW
+            if (dirty_pages is not None and previous is not None and previous[0] == address
+                    and (address >> PAGE_SHIFT) not in dirty_pages):
+                continue # Satırın sayfasına son kareden beri yazılmadı
+            chunk = bytes(data[address:address + BYTES_PER_ROW])
+            if previous is None or previous[0] != address or previous[1] != chunk:
+                self._rendered[index] = (address, chunk)
+                changed.append((index, format_row(address, chunk) if chunk else ""))
+        if not changed:
+            return 0
+        self.text.config(state=tk.NORMAL)
+        for index, line in changed:
+            self.text.delete(f"{index + 1}.0", f"{index + 1}.end")
+            self.text.insert(f"{index + 1}.0", line)
+        self.text.config(state=tk.DISABLED)
+        return len(changed)
+
+    def invalidate(self):
+        """Bir sonraki refresh'te tüm görünen satırların yeniden yazılmasını sağlar."""
+        self._rendered = [None] * self._rows
+
+    # --- Kaydırma ve boyut ---
+
+    def _set_top_row(self, row):
+        row = max(0, min(row, self.total_rows - self._rows))
+        if row != self._top_row:
+            self._top_row = row
+            self.refresh() # Satır adresleri değiştiği için tüm görünen satırlar yenilenir
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = max(1, self.total_rows)
+        self.scrollbar.set(self._top_row / total, min(1.0, (self._top_row + self._rows) / total))
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            self._set_top_row(round(float(value) * self.total_rows))
+        elif action == tk.SCROLL:
+            step = self._rows - 1 if unit == tk.PAGES else 1
+            self._set_top_row(self._top_row + int(value) * max(1, step))
+
+    def _on_mousewheel(self, event):
+        return self.scroll_rows(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def _on_configure(self, event):
+        padding = 2 * (int(self.text.cget("borderwidth")) + int(self.text.cget("highlightthickness"))
+                       + int(self.text.cget("pady")))
+        rows = max(1, (event.height - padding) // self._line_height)
+        if rows != self._rows:
+            self._resize(rows)
+
+    def _resize(self, rows):
+        self._rows = rows
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n" * (rows - 1))
+        self.text.config(state=tk.DISABLED)
+        self.invalidate()
+        self._set_top_row(self._top_row)
+        self.refresh()
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    memory = bytearray(range(256)) * 256
+    root = tk.Tk()
+    root.title("HexView demo")
+    view = HexView(root, lambda: memory)
+    view.pack(fill=tk.BOTH, expand=True)
+
+    def tick(counter=[0]):
+        # Her karede tek bir byte değişir; sadece onun satırı yeniden yazılır
+        counter[0] += 1
+        memory[0x0100 + counter[0] % 64] = counter[0] & 0xFF
+        view.ensure_visible(0x0100)
+        view.refresh()
+        root.after(33, tick)
+
+    print(format_row(0x0040, bytes(memory[0x40:0x50])))
+    root.after(33, tick)
+    root.mainloop()
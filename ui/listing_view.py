@@ -0,0 +1,195 @@
+# m6800_sdk/ui/listing_view.py
+
+# Listing Treeview'ının tembel (lazy) doldurulması ve arama indeksi.
+#
+# Büyük kaynaklarda her listing satırı için senkron Treeview.insert() çağrısı pencereyi
+# saniyelerce dondurur. LazyListing ilk ekranı hemen doldurur, kalan satırları root.after ile
+# planlanan küçük parçalar (chunk) halinde ekler; parçalar arasında Tk olayları işlenir.
+# Temizleme, öğe başına delete() yerine tek bir delete(*öğeler) çağrısıdır.
+#
+# Satır iid'leri listing indeksidir (str), böylece adres -> satır eşlemesi ve arama sonucu
+# doğrudan bir Treeview öğesine karşılık gelir. Henüz eklenmemiş bir satıra gidilmek
+# istenirse (arama, PC vurgusu) o satıra kadar olan kısım senkron olarak eklenir.
+#
+# PC vurgusu da aynı adres -> satır sözlüğünü kullanır: her karede tek bir sözlük araması,
+# satır değiştiyse sadece eski ve yeni satırın tag'leri güncellenir (listing taranmaz).
+#
+# Arama indeksi: adresler için {adres: ilk satır} sözlüğü; metin için tüm satırların
+# küçük harfli kaynak+yorum metni tek bir string'de birleştirilir, str.find (C hızında)
+# ve satır başı ofsetleri üzerinde bisect ile eşleşen satır bulunur.
+
+import tkinter as tk
+from bisect import bisect_right
+
+FIRST_CHUNK_ROWS = 200 # İlk ekran: senkron eklenir
+CHUNK_ROWS = 500 # Sonraki her after() çağrısında eklenen satır sayısı
+
+def is_error_row(row, success):
+    """Hata satırları (error_line tag'i) için assemble_code'daki eski kural."""
+    hex_code, comment = row[1], row[3]
+    return "ERROR" in comment.upper() or "ERR" in hex_code.upper() or (not success and not comment)
+
+class LazyListing:
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = []
+        self._success = True
+        self._inserted = 0 # Treeview'a eklenmiş satır sayısı (baştan itibaren)
+        self._fill_job = None
+        self._address_index = {}
+        self._search_text = ""
+        self._row_offsets = []
+        self._highlighted = None # PC vurgulu satırın indeksi
+        tree.tag_configure('error_line', background='pink', foreground='red') # Hata satırlarını renklendir
+        tree.tag_configure('current_pc', background='#fff3a0') # Bir sonraki yürütülecek komut
+
+    def clear(self):
+        self._cancel_fill()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.rows = []
+        self._inserted = 0
+        self._highlighted = None
+        self._address_index = {}
+        self._search_text = ""
+        self._row_offsets = []
+
+    def set_rows(self, listing, success):
+        """
+        listing: [(adres, hex_kod, kaynak, yorum, cycle), ...]. İlk FIRST_CHUNK_ROWS satır hemen,
+        kalanı arka arkaya planlanan parçalar halinde eklenir.
+        """
+        self.clear()
+        self.rows = [(addr, hex_code, (source or "").strip(), str(comment if comment is not None else ""), cycles)
+                     for addr, hex_code, source, comment, cycles in listing]
+        self._success = success
+        self._build_index()
+        self._insert_until(min(FIRST_CHUNK_ROWS, len(self.rows)))
+        self._schedule_fill()
+
+    # --- Arama ---
+
+    def row_for_address(self, address):
+        """address'i ilk listeleyen satırın indeksi; yoksa None."""
+        return self._address_index.get(address)
+
+    def find(self, query, start_row=0):
+        """
+        query '$1234' biçimindeyse o adresin satırını, değilse kaynak/yorum metninde (büyük/küçük
+        harf duyarsız) start_row'dan itibaren ilk eşleşmeyi arar; sona gelince baştan devam eder.
+        Döndürülen değer: satır indeksi veya None.
+        """
+        query = query.strip()
+        if not query or not self.rows:
+            return None
+        if query.startswith('$'):
+            try:
+                return self.row_for_address(int(query[1:], 16))
+            except ValueError:
+                pass
+        needle = query.lower()
+        start_row = min(max(start_row, 0), len(self.rows) - 1)
+        position = self._search_text.find(needle, self._row_offsets[start_row])
+        if position < 0:
+            position = self._search_text.find(needle)
+        if position < 0:
+            return None
+        return bisect_right(self._row_offsets, position) - 1
+
+    def show_row(self, index, select=True):
+        """Satırı (gerekirse ona kadar ekleyerek) görünür yapar ve isteğe bağlı seçer."""
+        if not (0 <= index < len(self.rows)):
+            return
+        self._insert_until(index + 1)
+        iid = str(index)
+        self.tree.see(iid)
+        if select:
+            self.tree.selection_set(iid)
+            self.tree.focus(iid)
+
+    def highlight_address(self, address, see=True):
+        """
+        address'i listeleyen satırı 'current_pc' ile vurgular (öncekinin vurgusunu kaldırır) ve
+        satır değiştiyse görünür yapar. Döndürülen değer: vurgulanan satırın indeksi; adres listing'de yoksa None.
+        """
+        index = self._address_index.get(address)
+        if index == self._highlighted:
+            return index # Satır değişmedi: kullanıcının kaydırdığı görünüm korunur
+        if self._highlighted is not None:
+            self._set_pc_tag(self._highlighted, False)
+        if index is not None:
+            self._insert_until(index + 1)
+            self._set_pc_tag(index, True)
+            if see:
+                self.tree.see(str(index))
+        self._highlighted = index
+        return index
+
+    def _set_pc_tag(self, index, on):
+        iid = str(index)
+        tags = tuple(tag for tag in self.tree.item(iid, 'tags') if tag != 'current_pc')
+        self.tree.item(iid, tags=tags + ('current_pc',) if on else tags)
+
+    def _build_index(self):
+        address_index = {}
+        offsets = []
+        parts = []
+        position = 0
+        for index, (addr, hex_code, source, comment, _) in enumerate(self.rows):
+            if hex_code.strip() and hex_code not in ("ERROR", "CG_ERR"):
+                try:
+                    address_index.setdefault(int(addr, 16), index)
+                except ValueError:
+                    pass # Özet satırları ("----")
+            text = f"{source}\t{comment}\n".lower()
+            offsets.append(position)
+            parts.append(text)
+            position += len(text)
+        self._address_index = address_index
+        self._row_offsets = offsets
+        self._search_text = "".join(parts)
+
+    # --- Parça parça ekleme ---
+
+    def _insert_until(self, end):
+        insert = self.tree.insert
+        success = self._success
+        for index in range(self._inserted, end):
+            row = self.rows[index]
+            insert("", tk.END, iid=str(index), values=row,
+                   tags=('error_line',) if is_error_row(row, success) else ())
+        self._inserted = max(self._inserted, end)
+
+    def _schedule_fill(self):
+        if self._inserted < len(self.rows):
+            self._fill_job = self.tree.after(1, self._fill_chunk)
+
+    def _fill_chunk(self):
+        self._fill_job = None
+        self._insert_until(min(self._inserted + CHUNK_ROWS, len(self.rows)))
+        self._schedule_fill()
+
+    def _cancel_fill(self):
+        if self._fill_job is not None:
+            self.tree.after_cancel(self._fill_job)
+            self._fill_job = None
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    import time
+    from tkinter import ttk
+
+    listing = [(f"{0x0100 + i * 2:04X}", "86 05", f"L{i:05d} LDAA #5", "" if i % 997 else "; marker", "2")
+               for i in range(20000)]
+    root = tk.Tk()
+    tree = ttk.Treeview(root, columns=("addr", "hex", "source", "comment", "cycles"), show="headings")
+    tree.pack(fill=tk.BOTH, expand=True)
+    view = LazyListing(tree)
+    start = time.perf_counter()
+    view.set_rows(listing, True)
+    print(f"first screen in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print("find '$0200' ->", view.find("$0200"), " find 'marker' ->", view.find("marker", 1))
+    view.show_row(view.find("L15000"))
+    root.after(3000, root.destroy)
+    root.mainloop()
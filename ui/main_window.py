@@ -1,23 +1,59 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os # Dosya işlemleri için
+import re
+import time
 
 # Backend sınıflarını import etmemiz gerekiyor.
 # Proje kök dizinini Python path'ine eklemek gerekebilir veya göreceli import kullanılabilir.
 # Eğer m6800_sdk klasöründen çalıştırıyorsanız:
 from assembler.assembler import Assembler
+from assembler.cache import AssemblyCache
+from assembler.background import BackgroundAssembler
 from simulator.simulator import Simulator
+from simulator.runner import BackgroundRunner
+from simulator.stats import PerformanceSampler, format_sample
+from ui.heatmap_view import HeatmapView
+from ui.hex_view import HexView
+from ui.listing_view import LazyListing
+from utils.object_formats import write_object_file, read_object_file, format_for_path
 # utils.error_handler ileride eklenebilir
 
+# Arka planda çalışırken register/bellek görünümünün yenilenme aralığı (~30 fps)
+RUN_POLL_INTERVAL_MS = 33
+# Yazma duraklamasından sonra otomatik derlemenin başlaması için beklenen süre
+AUTO_ASSEMBLE_DELAY_MS = 600
+ASSEMBLY_POLL_INTERVAL_MS = 50
+# Performans panelinin örnekleme aralığı (sayaçlar düşük sıklıkta okunur)
+PERF_SAMPLE_INTERVAL_MS = 500
+_ERROR_LINE_RE = re.compile(r"\(L:(\d+)\)") # "Error (L:12): ..." -> 12
+
 class MainWindow:
-    def __init__(self, root):
+    def __init__(self, root, defines=None):
         self.root = root
         self.root.title("Motorola M6800 SDK - Assembler & Simulator")
         self.root.geometry("1200x800") # Pencere boyutunu ayarla
 
         # Backend nesneleri
-        self.assembler = Assembler()
+        # Değişmemiş kaynak tekrar derlenmez; defines komut satırındaki -D tanımlarıdır
+        self.assembler = Assembler(cache=AssemblyCache(), defines=defines)
+        # Derleme ayrı bir süreçte yapılır; sonuç (result_state) self.assembler'a yüklenir
+        self.background_assembler = BackgroundAssembler()
+        self._auto_assemble_job = None
+        self._assembly_poll_job = None
+        self._interactive_generation = None # Assemble düğmesiyle başlatılan isteğin nesli
+        # Simülatöre yüklü programın source map'i ve segmentleri (yükleme anındaki hali). Yazarken
+        # gelen derleme sonuçları self.assembler'ı değiştirir; satır <-> adres eşlemeleri bu kopyayı
+        # kullanır. Kod değişince program "eski" (stale) sayılır ve imleç/listing işlemleri reddedilir.
+        self.loaded_source_map = None
+        self._loaded_segments = None
+        self.loaded_program_stale = False
         self.simulator = Simulator()
+        # Sürekli çalıştırma worker thread'de yapılır; UI anlık görüntüleri root.after ile okur
+        self.runner = BackgroundRunner(self.simulator)
+        self._run_poll_job = None
+        self.perf_sampler = PerformanceSampler(self.simulator)
+        self._perf_sample_job = None
 
         # Dosya yolu için değişken
         self.current_file_path = None
@@ -67,16 +103,29 @@ class MainWindow:
 
         build_menu = tk.Menu(menubar, tearoff=0)
         build_menu.add_command(label="Assemble", command=self.assemble_code)
+        build_menu.add_command(label="Export Object File...", command=self.export_object_file)
+        build_menu.add_separator()
+        self.auto_assemble_var = tk.BooleanVar(value=True)
+        build_menu.add_checkbutton(label="Assemble While Typing", variable=self.auto_assemble_var)
+        self.relax_branches_var = tk.BooleanVar(value=self.assembler.relax_branches)
+        build_menu.add_checkbutton(label="Relax Out-of-Range Branches", variable=self.relax_branches_var,
+                                   command=self.toggle_branch_relaxation)
+        self.peephole_var = tk.BooleanVar(value=self.assembler.peephole)
+        build_menu.add_checkbutton(label="Peephole Optimization", variable=self.peephole_var,
+                                   command=self.toggle_peephole)
         menubar.add_cascade(label="Build", menu=build_menu)
 
         run_menu = tk.Menu(menubar, tearoff=0)
         run_menu.add_command(label="Load to Simulator", command=self.load_to_simulator)
+        run_menu.add_command(label="Load Object File...", command=self.load_object_file)
         run_menu.add_command(label="Run", command=self.run_simulation)
+        run_menu.add_command(label="Run to Cursor Line", command=self.run_to_cursor)
         run_menu.add_command(label="Step", command=self.step_simulation)
         run_menu.add_command(label="Stop", command=self.stop_simulation)
         run_menu.add_command(label="Reset CPU", command=self.reset_simulation)
         run_menu.add_separator()
         run_menu.add_command(label="Add Breakpoint", command=self.add_breakpoint_dialog)
+        run_menu.add_command(label="Breakpoint at Cursor Line", command=self.add_breakpoint_at_cursor)
         run_menu.add_command(label="Clear All Breakpoints", command=self.simulator.clear_breakpoints) # Direkt çağrı
         menubar.add_cascade(label="Debug", menu=run_menu)
 
@@ -93,6 +142,8 @@ class MainWindow:
         code_editor_frame = ttk.LabelFrame(left_paned_window, text="Assembly Code Editor")
         self.code_editor = scrolledtext.ScrolledText(code_editor_frame, wrap=tk.WORD, width=80, height=20, undo=True)
         self.code_editor.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.code_editor.tag_configure('asm_error', background='#ffd6d6')
+        self.code_editor.bind("<<Modified>>", self._on_editor_modified)
         left_paned_window.add(code_editor_frame, weight=2) # Daha fazla yer
 
         # Nesne Kodu ve Listeleme için Notebook (Sekmeli Alan)
@@ -106,23 +157,36 @@ class MainWindow:
 
         # Assembly-Object Kodu Eşleştirme (Listing) Sekmesi
         listing_frame = ttk.Frame(output_notebook)
+        # Arama: '$adres' veya kaynak/yorum metni; Enter sonraki eşleşmeye gider
+        listing_search_frame = ttk.Frame(listing_frame)
+        listing_search_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Label(listing_search_frame, text="Find ($addr or text):").pack(side=tk.LEFT)
+        self.listing_search_entry = ttk.Entry(listing_search_frame, width=30)
+        self.listing_search_entry.pack(side=tk.LEFT, padx=2)
+        self.listing_search_entry.bind("<Return>", lambda event: self.find_in_listing())
+        ttk.Button(listing_search_frame, text="Find Next", command=self.find_in_listing).pack(side=tk.LEFT, padx=2)
         # Treeview for listing
-        columns = ("addr", "hex", "source", "comment_error")
-        self.listing_tree = ttk.Treeview(listing_frame, columns=columns, show="headings", height=10)
+        columns = ("addr", "hex", "source", "comment_error", "cycles")
+        self.listing_tree = ttk.Treeview(listing_frame, columns=columns, show="headings", height=10,
+                                         displaycolumns=("addr", "hex", "cycles", "source", "comment_error"))
         self.listing_tree.heading("addr", text="Address")
         self.listing_tree.heading("hex", text="Hex Code")
         self.listing_tree.heading("source", text="Source Line")
         self.listing_tree.heading("comment_error", text="Comment/Error")
+        self.listing_tree.heading("cycles", text="Cycles")
 
         self.listing_tree.column("addr", width=70, anchor=tk.W)
         self.listing_tree.column("hex", width=120, anchor=tk.W)
         self.listing_tree.column("source", width=300, anchor=tk.W)
         self.listing_tree.column("comment_error", width=250, anchor=tk.W)
+        self.listing_tree.column("cycles", width=80, anchor=tk.W)
 
         listing_scrollbar = ttk.Scrollbar(listing_frame, orient="vertical", command=self.listing_tree.yview)
         self.listing_tree.configure(yscrollcommand=listing_scrollbar.set)
         listing_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.listing_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Satırlar parça parça eklenir (büyük kaynaklarda pencere donmaz); arama indeksini de tutar
+        self.listing_view = LazyListing(self.listing_tree)
         output_notebook.add(listing_frame, text="Listing / Mapping")
 
         left_paned_window.add(output_notebook, weight=1)
@@ -170,9 +234,21 @@ class MainWindow:
         self.reg_labels["CCR_HEX"].grid(row=len(reg_list), column=4, padx=2, pady=2, sticky=tk.W)
 
 
-        # Bellek Görünümü Çerçevesi
-        memory_frame = ttk.LabelFrame(right_main_frame, text="Memory View")
-        memory_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Performans Çerçevesi: çalışma sırasında Simulator sayaçlarından örneklenir
+        perf_frame = ttk.LabelFrame(right_main_frame, text="Performance")
+        perf_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.perf_labels = {}
+        for i, name in enumerate(("Instructions/s", "Cycles/s", "Effective clock", "Breakpoint checks", "UI refresh")):
+            ttk.Label(perf_frame, text=f"{name}:").grid(row=i, column=0, padx=5, pady=1, sticky=tk.W)
+            self.perf_labels[name] = ttk.Label(perf_frame, text="-", width=34)
+            self.perf_labels[name].grid(row=i, column=1, padx=5, pady=1, sticky=tk.W)
+
+        # Bellek Görünümü ve Erişim Isı Haritası için Notebook
+        memory_notebook = ttk.Notebook(right_main_frame)
+        memory_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        # Bellek Görünümü Sekmesi
+        memory_frame = ttk.Frame(memory_notebook)
 
         # Bellek adresi giriş alanı ve git butonu
         mem_goto_frame = ttk.Frame(memory_frame)
@@ -182,9 +258,19 @@ class MainWindow:
         self.mem_addr_entry.pack(side=tk.LEFT, padx=2)
         self.mem_addr_entry.insert(0, "0000")
         ttk.Button(mem_goto_frame, text="Go", command=self.update_memory_view_from_entry).pack(side=tk.LEFT, padx=2)
+        # İşaretliyse görünüm PC görünür alandan çıktığında ona kaydırılır
+        self.follow_pc_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(mem_goto_frame, text="Follow PC", variable=self.follow_pc_var).pack(side=tk.LEFT, padx=8)
 
-        self.memory_text = scrolledtext.ScrolledText(memory_frame, wrap=tk.WORD, width=50, height=15, state=tk.DISABLED, font=("Courier New", 9))
-        self.memory_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Sanallaştırılmış hex görünümü: 64 KiB kaydırılabilir, sadece görünen/değişen satırlar çizilir
+        self.memory_view = HexView(memory_frame, lambda: self.simulator.cpu.memory.memory_array,
+                                   page_tracker=self.simulator.cpu.memory)
+        self.memory_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        memory_notebook.add(memory_frame, text="Memory View")
+
+        # Erişim Isı Haritası Sekmesi: isteğe bağlı okuma/yazma/yürütme sayaçları (numpy gerekir)
+        self.heatmap_view = HeatmapView(memory_notebook, self.simulator)
+        memory_notebook.add(self.heatmap_view, text="Access Heatmap")
 
         # Durum Çubuğu (Status Bar) - Hatalar ve mesajlar için
         self.status_bar_text = tk.StringVar()
@@ -211,6 +297,7 @@ class MainWindow:
         """Listing Tree için sağ tıklama menüsünü ayarlar."""
         self.listing_tree_context_menu = tk.Menu(self.root, tearoff=0)
         self.listing_tree_context_menu.add_command(label="Copy Error/Comment", command=self.copy_listing_error_comment)
+        self.listing_tree_context_menu.add_command(label="Run to Here", command=self.run_to_listing_row)
         # İleride "Copy Full Line" gibi seçenekler de eklenebilir
 
         # Sağ tıklama olayını Treeview'a bağla
@@ -221,8 +308,8 @@ class MainWindow:
         try:
             selected_item_id = self.listing_tree.selection()[0] # Seçili ilk (ve genellikle tek) öğeyi al
             item_values = self.listing_tree.item(selected_item_id, "values")
-            # values = (addr, hex_c, src, err_cmt)
-            # Son sütun (indeks 3) Comment/Error sütunudur
+            # values = (addr, hex_c, src, err_cmt, cycles)
+            # İndeks 3 Comment/Error sütunudur
             if item_values and len(item_values) > 3:
                 error_comment_text = item_values[3]
                 if error_comment_text:
@@ -252,8 +339,10 @@ class MainWindow:
             defaultextension=".asm",
             filetypes=[("Assembly Files", "*.asm *.s *.txt"), ("All Files", "*.*")]
         )
-        if not filepath:
-            return
+        if filepath:
+            self.open_path(filepath)
+
+    def open_path(self, filepath):
         try:
             with open(filepath, "r") as f:
                 self.code_editor.delete("1.0", tk.END)
@@ -287,6 +376,27 @@ class MainWindow:
         self.current_file_path = filepath
         self.save_file()
 
+    def toggle_branch_relaxation(self):
+        self.assembler.relax_branches = self.relax_branches_var.get()
+        state = "enabled" if self.assembler.relax_branches else "disabled"
+        self.status_bar_text.set(f"Long-branch relaxation {state}.")
+
+    def toggle_peephole(self):
+        self.assembler.peephole = self.peephole_var.get()
+        state = "enabled" if self.assembler.peephole else "disabled"
+        self.status_bar_text.set(f"Peephole optimization {state}.")
+
+    def find_in_listing(self):
+        """Arama kutusundaki adres/metni listing'de seçili satırdan sonra arar."""
+        selection = self.listing_tree.selection()
+        start_row = int(selection[0]) + 1 if selection else 0
+        index = self.listing_view.find(self.listing_search_entry.get(), start_row)
+        if index is None:
+            self.status_bar_text.set(f"Not found in listing: {self.listing_search_entry.get().strip()}")
+            return
+        self.listing_view.show_row(index)
+        self.status_bar_text.set(f"Listing row {index + 1} of {len(self.listing_view.rows)}")
+
     def show_about(self):
         messagebox.showinfo("About M6800 SDK", "Motorola M6800 Assembler & Simulator\n\nDeveloped using Python and Tkinter.")
 
@@ -294,8 +404,7 @@ class MainWindow:
         self.object_code_text.config(state=tk.NORMAL)
         self.object_code_text.delete("1.0", tk.END)
         self.object_code_text.config(state=tk.DISABLED)
-        for item in self.listing_tree.get_children():
-            self.listing_tree.delete(item)
+        self.listing_view.clear()
         self.load_button.config(state=tk.DISABLED)
         self.run_button.config(state=tk.DISABLED)
         self.step_button.config(state=tk.DISABLED)
@@ -304,55 +413,164 @@ class MainWindow:
 
 
     # --- Assembler ve Simülatör Komutları ---
-    def assemble_code(self): # Bu metodu biraz güncelleyelim
-        self._clear_outputs()
-        self.status_bar_text.set("Assembling...")
-        self.root.update_idletasks()
+    def assemble_code(self):
+        """Assemble düğmesi: derlemeyi hemen (arka planda) başlatır; hata varsa dialog gösterilir."""
+        self._cancel_auto_assemble()
+        self._start_assembly(interactive=True)
 
+    def _on_editor_modified(self, event=None):
+        if not self.code_editor.edit_modified():
+            return
+        self.code_editor.edit_modified(False) # Bir sonraki değişiklikte olay tekrar gelsin
+        if not self.auto_assemble_var.get():
+            return
+        # Debounce: her tuş vuruşu zamanlayıcıyı yeniden başlatır
+        self._cancel_auto_assemble()
+        self._auto_assemble_job = self.root.after(AUTO_ASSEMBLE_DELAY_MS, self._start_assembly)
+
+    def _cancel_auto_assemble(self):
+        if self._auto_assemble_job is not None:
+            self.root.after_cancel(self._auto_assemble_job)
+            self._auto_assemble_job = None
+
+    def _assembly_options(self, interactive=False):
+        # Rutin cycle toplamları (yol araması) sadece Assemble düğmesinde; yazarken derleme hızlı kalsın
+        return {'optimize_addressing': self.assembler.optimize_addressing,
+                'relax_branches': self.assembler.relax_branches,
+                'peephole': self.assembler.peephole,
+                'defines': self.assembler.defines,
+                'routine_timing': interactive}
+
+    def _start_assembly(self, interactive=False):
+        self._auto_assemble_job = None
         source_code = self.code_editor.get("1.0", tk.END)
-        success, object_code, listing, errors = self.assembler.assemble(source_code)
-
-        # Listing'i göster (hatalı veya başarılı olsun)
-        for item in self.listing_tree.get_children(): # Önceki listing'i temizle
-            self.listing_tree.delete(item)
-
-        for item_data in listing: # assembler.py'den gelen listing'i kullan
-            addr, hex_c, src, err_cmt = item_data
-            tags_tuple = () # tag'leri tuple olarak tanımla
-            # err_cmt'nin string olduğundan emin ol, bazen None gelebilir
-            err_cmt_str = str(err_cmt if err_cmt is not None else "")
-
-            if "ERROR" in err_cmt_str.upper() or "ERR" in hex_c.upper() or (not success and not err_cmt_str):
-                tags_tuple = ('error_line',) # tag'i tuple olarak ata
-
-            self.listing_tree.insert("", tk.END, values=(addr, hex_c, src.strip(), err_cmt_str), tags=tags_tuple)
+        # INCBIN yolları açık dosyanın dizinine göre çözülür
+        include_dir = os.path.dirname(self.current_file_path) if self.current_file_path else None
+        # Sadece Assemble düğmesinin sonucu diske yazılır; yazarken yapılan derlemeler işçi
+        # sürecin bellek içi önbelleğinde kalır (her ara düzenleme kalıcı kayıt bırakmasın)
+        cache_dir = self.assembler.cache.directory if interactive and self.assembler.cache else None
+        generation = self.background_assembler.submit(source_code, self._assembly_options(interactive), include_dir, cache_dir)
+        if interactive:
+            self._interactive_generation = generation
+        self.status_bar_text.set("Assembling...")
+        if self._assembly_poll_job is None:
+            self._assembly_poll_job = self.root.after(ASSEMBLY_POLL_INTERVAL_MS, self._poll_assembly)
 
-        self.listing_tree.tag_configure('error_line', background='pink', foreground='red') # Hata satırlarını renklendir
+    def _poll_assembly(self):
+        self._assembly_poll_job = None
+        try:
+            result = self.background_assembler.poll()
+        except Exception as e: # İşçi süreç başlatılamadı veya çöktü: bu sefer UI thread'inde derle
+            print(f"Warning: background assembly failed ({e}); assembling in the UI thread.")
+            source_code = self.code_editor.get("1.0", tk.END)
+            include_dir = os.path.dirname(self.current_file_path) if self.current_file_path else None
+            self._show_assembly_result(*self.assembler.assemble(source_code, include_dir=include_dir),
+                                       interactive=self._interactive_generation is not None)
+            self._interactive_generation = None
+            return
+        if result is None:
+            # En son istek henüz bitmedi (daha eski sonuçlar BackgroundAssembler'da atılır)
+            self._assembly_poll_job = self.root.after(ASSEMBLY_POLL_INTERVAL_MS, self._poll_assembly)
+            return
+        generation, state = result
+        interactive = generation == self._interactive_generation
+        self._interactive_generation = None
+        restored = self.assembler.restore_result_state(state)
+        if restored is not None:
+            self._show_assembly_result(*restored, interactive=interactive)
+
+    def _show_assembly_result(self, success, segments, listing, errors, interactive=False):
+        # Simülatör butonlarına dokunulmaz: çalışan bir program, yazarken durdurulmamalı
+        self.object_code_text.config(state=tk.NORMAL)
+        self.object_code_text.delete("1.0", tk.END)
+        # Listing'i göster (hatalı veya başarılı olsun); ilk ekran hemen, kalanı arka planda eklenir
+        self.listing_view.set_rows(listing, success)
+        self._highlight_error_lines(errors)
 
         if success:
             self.status_bar_text.set("Assembly successful.")
-            self.object_code_text.config(state=tk.NORMAL)
-            obj_code_hex = " ".join([f"{b:02X}" for b in object_code])
-            self.object_code_text.insert("1.0", obj_code_hex)
-            self.object_code_text.config(state=tk.DISABLED)
+            # Her segment kendi başlangıç adresiyle, satır başına 16 byte olarak gösterilir
+            obj_code_lines = []
+            for seg_addr, seg_data in segments:
+                for offset in range(0, len(seg_data), 16):
+                    chunk = seg_data[offset:offset + 16]
+                    obj_code_lines.append(f"${seg_addr + offset:04X}: {chunk.hex(' ').upper()}")
+            self.object_code_text.insert("1.0", "\n".join(obj_code_lines))
             self.load_button.config(state=tk.NORMAL)
         else:
             error_count = len(errors)
             self.status_bar_text.set(f"Assembly failed with {error_count} error(s). See listing.")
-            # Hatalar listing'de zaten gösteriliyor. İlk hatayı messagebox'ta göstermek opsiyonel.
-            if errors:
+            self.load_button.config(state=tk.DISABLED)
+            # Hatalar listing'de ve editörde işaretli; dialog sadece Assemble düğmesiyle istenmişse
+            if errors and interactive:
                 first_error_detail = errors[0] # assembler.py'den gelen formatı kontrol et
                 # Hata mesajı formatı: "Error (L:line_num): message -> 'original_line'"
                 messagebox.showerror("Assembly Error", f"Assembly failed. See listing for details.\nFirst detected error: {first_error_detail}")
+        self.object_code_text.config(state=tk.DISABLED)
+        self._update_loaded_program_state(success, segments)
+
+    def _update_loaded_program_state(self, success, segments):
+        """
+        Yeni derleme sonucu yüklü programla aynı kodu üretiyorsa (örn. sadece yorum değişti)
+        güncel source map yüklü programa aittir; aksi halde yüklü program eskidir.
+        """
+        if self._loaded_segments is None:
+            return
+        if success and [(address, bytes(data)) for address, data in segments] == self._loaded_segments:
+            self.loaded_source_map = self.assembler.source_map
+            self.loaded_program_stale = False
+        else:
+            self.loaded_program_stale = True
+            self.listing_view.highlight_address(None) # Listing artık yüklü kodu göstermiyor
+            self.status_bar_text.set(self.status_bar_text.get() + " Loaded program is out of date; load it again.")
+
+    def _loaded_source_map_for(self, action):
+        """
+        Editör satırlarını yüklü programın adreslerine eşleyen source map; yüklü program yoksa,
+        kaynaktan yüklenmediyse veya kaynak o zamandan beri değiştiyse uyarı gösterip None döner.
+        """
+        if self.loaded_program_stale:
+            messagebox.showwarning(action, "The source changed since the program was loaded. "
+                                           "Load it to the simulator again first.")
+            return None
+        if self.loaded_source_map is None:
+            messagebox.showwarning(action, "Load an assembled program to the simulator first.")
+            return None
+        return self.loaded_source_map
+
+    def _loaded_line_for_address(self, address):
+        """Yüklü programda address'i üreten kaynak satırı; bilinmiyorsa veya program eskidiyse None."""
+        if self.loaded_program_stale or self.loaded_source_map is None:
+            return None
+        return self.loaded_source_map.line_for_address(address)
+
+    def _highlight_pc(self, address):
+        """Listing yüklü programa aitse PC'nin satırını vurgular, değilse vurguyu kaldırır."""
+        if self.loaded_program_stale or self.loaded_source_map is None:
+            address = None
+        self.listing_view.highlight_address(address)
+
+    def _highlight_error_lines(self, errors):
+        """Hata mesajlarındaki satır numaralarını editörde işaretler."""
+        self.code_editor.tag_remove('asm_error', "1.0", tk.END)
+        for error in errors:
+            match = _ERROR_LINE_RE.search(error)
+            if match and int(match.group(1)) > 0:
+                line = match.group(1)
+                self.code_editor.tag_add('asm_error', f"{line}.0", f"{line}.end+1c")
 
     def load_to_simulator(self):
-        if not self.assembler.object_code:
+        if not self.assembler.segments:
             messagebox.showwarning("Load Error", "No object code to load. Please assemble first.")
             return
 
-        # Programın başlangıç adresini al (genellikle ORG ile belirlenir)
-        start_address = self.assembler.program_origin
-        if self.simulator.load_program(self.assembler.object_code, start_address):
+        # Programın başlangıç adresi (END operandı veya ilk kod segmenti)
+        start_address = self.assembler.entry_point
+        self._cancel_run()
+        if self.simulator.load_segments(self.assembler.segments, start_address):
+            self.loaded_source_map = self.assembler.source_map
+            self._loaded_segments = [(address, bytes(data)) for address, data in self.assembler.segments]
+            self.loaded_program_stale = False
             self.status_bar_text.set(f"Program loaded. PC: ${start_address:04X}")
             self.run_button.config(state=tk.NORMAL)
             self.step_button.config(state=tk.NORMAL)
@@ -365,19 +583,151 @@ class MainWindow:
             self.status_bar_text.set("Error loading program to simulator.")
 
 
+    def export_object_file(self):
+        if not self.assembler.segments:
+            messagebox.showwarning("Export Error", "No object code to export. Please assemble first.")
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".s19",
+            filetypes=[("Motorola S19", "*.s19"), ("Motorola S28", "*.s28"),
+                       ("Intel HEX", "*.hex"), ("Raw Binary", "*.bin")]
+        )
+        if not filepath:
+            return
+        try:
+            write_object_file(filepath, self.assembler.segments, self.assembler.entry_point)
+            self.status_bar_text.set(f"Exported ({format_for_path(filepath)}): {os.path.basename(filepath)}")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Export Error", str(e))
+            self.status_bar_text.set("Error exporting object file.")
+
+    def load_object_file(self):
+        filepath = filedialog.askopenfilename(
+            filetypes=[("Object Files", "*.s19 *.s28 *.srec *.mot *.hex *.ihx *.bin"), ("All Files", "*.*")]
+        )
+        if not filepath:
+            return
+        try:
+            base_address = 0
+            if format_for_path(filepath) == 'BIN':
+                addr_str = tk.simpledialog.askstring("Binary Base Address", "Load address (hex, e.g., C000 or $C000):")
+                if not addr_str:
+                    return
+                base_address = int(addr_str.lstrip('$'), 16)
+            segments, entry_point = read_object_file(filepath, base_address=base_address)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Load Error", str(e))
+            self.status_bar_text.set("Error loading object file.")
+            return
+        if entry_point is None:
+            entry_point = segments[0][0] if segments else 0
+        self._cancel_run()
+        if self.simulator.load_segments(segments, entry_point):
+            # Nesne dosyasının kaynağı yok: listing ve editör satırları bu koda eşlenemez
+            self.loaded_source_map = None
+            self._loaded_segments = None
+            self.loaded_program_stale = False
+            self.status_bar_text.set(f"Loaded {os.path.basename(filepath)}. PC: ${entry_point:04X}")
+            self.run_button.config(state=tk.NORMAL)
+            self.step_button.config(state=tk.NORMAL)
+            self.reset_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.DISABLED)
+            self.update_ui_on_step(self.simulator.cpu.get_state_str(), self.simulator.cpu.PC,
+                                   self.simulator.cpu.memory.get_memory_dump(self.simulator.cpu.PC, 32))
+        else:
+            messagebox.showerror("Load Error", "Failed to load object file into simulator memory.")
+            self.status_bar_text.set("Error loading object file.")
+
     def run_simulation(self):
+        if not self.runner.start(): # CPU durmuş veya zaten çalışıyor
+            return False
         self.status_bar_text.set("Running simulation...")
         self.run_button.config(state=tk.DISABLED)
         self.step_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
-        self.simulator.run() # Bu bloklayıcı olabilir, thread kullanmak gerekebilir
-        # run() bittiğinde (breakpoint, halt, max_steps) UI güncellenmeli.
-        # on_halt_callback bunu yapacak.
-        # Eğer run bittiyse (halt değilse, yani breakpoint veya stop ile) butonları tekrar ayarla
-        if not self.simulator.cpu.is_halted:
-            self.run_button.config(state=tk.NORMAL)
-            self.step_button.config(state=tk.NORMAL)
+        self._run_poll_job = self.root.after(RUN_POLL_INTERVAL_MS, self._poll_runner)
+        self.perf_sampler.reset()
+        if self._perf_sample_job is None:
+            self._perf_sample_job = self.root.after(PERF_SAMPLE_INTERVAL_MS, self._sample_performance)
+        return True
+
+    def run_to_address(self, address):
+        """Geçici bir breakpoint koyup arka planda (batch modunda) address'e kadar çalıştırır."""
+        if self.run_button.cget('state') == tk.DISABLED: # Program yüklenmemiş, çalışıyor veya CPU durmuş
+            self.status_bar_text.set("Load a program (and stop any running simulation) first.")
+            return
+        self.simulator.set_temporary_breakpoint(address)
+        if not self.run_simulation():
+            self.simulator.clear_temporary_breakpoint()
+            return
+        line_number = self._loaded_line_for_address(address)
+        where = f" (line {line_number})" if line_number is not None else ""
+        self.status_bar_text.set(f"Running to ${address:04X}{where}...")
+
+    def run_to_cursor(self):
+        """Editördeki imlecin satırına (kod üretmeyen satırda sonraki komuta) kadar çalıştırır."""
+        source_map = self._loaded_source_map_for("Run to Cursor")
+        if source_map is None:
+            return
+        line_number = int(self.code_editor.index(tk.INSERT).split('.')[0])
+        address = source_map.address_for_line(line_number)
+        if address is None:
+            messagebox.showwarning("Run to Cursor", f"No code at or after line {line_number}.")
+            return
+        self.run_to_address(address)
+
+    def run_to_listing_row(self):
+        """Listing'de seçili satırın adresine kadar çalıştırır."""
+        selection = self.listing_tree.selection()
+        if not selection or self._loaded_source_map_for("Run to Row") is None:
+            return
+        try:
+            address = int(self.listing_view.rows[int(selection[0])][0], 16)
+        except ValueError:
+            address = None # Özet satırları ("----")
+        if address is None or self.listing_view.row_for_address(address) is None:
+            self.status_bar_text.set("Selected listing row has no code.")
+            return
+        self.run_to_address(address)
+
+    def _sample_performance(self):
+        """Performans panelini günceller; çalışma bittiğinde son bir örnek alıp durur."""
+        self._perf_sample_job = None
+        sample = self.perf_sampler.sample()
+        if sample is not None:
+            for name, value in format_sample(sample, self.simulator.target_clock_hz):
+                self.perf_labels[name].config(text=value)
+        if self.runner.is_alive():
+            self._perf_sample_job = self.root.after(PERF_SAMPLE_INTERVAL_MS, self._sample_performance)
+
+    def _poll_runner(self):
+        """Çalışma sürerken worker'ın son anlık görüntüsünü gösterir; bitince sonucu işler."""
+        self._run_poll_job = None
+        snapshot = self.runner.snapshot()
+        started = time.perf_counter()
+        self._show_snapshot(snapshot)
+        self.perf_sampler.add_ui_frame(time.perf_counter() - started)
+        if snapshot.running:
+            self._run_poll_job = self.root.after(RUN_POLL_INTERVAL_MS, self._poll_runner)
+            return
+        # Worker bitti: breakpoint, CPU durması veya kullanıcı durdurması
         self.stop_button.config(state=tk.DISABLED)
+        self.heatmap_view.refresh() # Son batch'in (kayıt kapatıldıysa da) erişimleri
+        if self.simulator.cpu.is_halted:
+            self.update_ui_on_halt(snapshot.reason)
+            return
+        self.run_button.config(state=tk.NORMAL)
+        self.step_button.config(state=tk.NORMAL)
+        line_number = self._loaded_line_for_address(snapshot.PC)
+        where = f" (line {line_number})" if line_number is not None else ""
+        self.status_bar_text.set(f"{snapshot.reason}{where} after {snapshot.steps:,} instruction(s)")
+
+    def _cancel_run(self):
+        """Arka plan çalışmasını durdurur ve bitmesini bekler (reset/yükleme öncesi)."""
+        self.runner.stop(wait=True)
+        if self._run_poll_job is not None:
+            self.root.after_cancel(self._run_poll_job)
+            self._run_poll_job = None
 
 
     def step_simulation(self):
@@ -395,16 +745,15 @@ class MainWindow:
 
 
     def stop_simulation(self):
-        self.simulator.stop_running()
-        self.status_bar_text.set("Simulation stopped by user.")
-        self.run_button.config(state=tk.NORMAL)
-        self.step_button.config(state=tk.NORMAL)
-        self.stop_button.config(state=tk.DISABLED)
+        # Worker en geç mevcut batch'in sonunda durur; butonları _poll_runner günceller
+        self.runner.stop()
+        self.status_bar_text.set("Stopping simulation...")
 
     def reset_simulation(self):
         # Simülatör resetlendiğinde programın başlangıç adresini bilmemiz lazım.
         # Assembler'dan alabiliriz.
-        start_addr = self.assembler.program_origin if self.assembler.object_code else 0
+        start_addr = self.assembler.entry_point if self.assembler.segments else 0
+        self._cancel_run()
         self.simulator.reset_cpu(start_addr)
         self.status_bar_text.set("CPU Reset. Load program to run.")
         self.run_button.config(state=tk.DISABLED)
@@ -426,24 +775,55 @@ class MainWindow:
             except ValueError:
                 messagebox.showerror("Invalid Address", "Please enter a valid hexadecimal address.")
 
+    def add_breakpoint_at_cursor(self):
+        """Editördeki imlecin bulunduğu satır için breakpoint koyar (kod üretmeyen satırda sonraki komuta)."""
+        source_map = self._loaded_source_map_for("Breakpoint")
+        if source_map is None:
+            return
+        line_number = int(self.code_editor.index(tk.INSERT).split('.')[0])
+        address = source_map.address_for_line(line_number)
+        if address is None:
+            messagebox.showwarning("Breakpoint", f"No code at or after line {line_number}.")
+            return
+        self.simulator.add_breakpoint(address)
+        self.status_bar_text.set(f"Breakpoint added at ${address:04X} (line {source_map.line_for_address(address)})")
+
     # --- UI Güncelleme Callback'leri ---
+    def _show_registers(self, a, b, x, pc, sp, ccr_str, ccr_byte):
+        self.reg_labels["A"].config(text=f"{a:02X}")
+        self.reg_labels["B"].config(text=f"{b:02X}")
+        self.reg_labels["X"].config(text=f"{x:04X}")
+        self.reg_labels["PC"].config(text=f"{pc:04X}") # Bu bir sonraki PC
+        self.reg_labels["SP"].config(text=f"{sp:04X}")
+        self.reg_labels["CCR_STR"].config(text=ccr_str)
+        self.reg_labels["CCR_HEX"].config(text=f"{ccr_byte:02X}")
+
+    def _show_snapshot(self, snapshot):
+        """Arka plan çalışmasının anlık görüntüsünü register ve bellek görünümlerine yansıtır."""
+        self._show_registers(snapshot.A, snapshot.B, snapshot.X, snapshot.PC, snapshot.SP,
+                             snapshot.ccr_str, snapshot.CCR)
+        self.update_memory_view(snapshot.PC)
+        self._highlight_pc(snapshot.PC)
+        if snapshot.running:
+            self.status_bar_text.set(f"Running... PC=${snapshot.PC:04X}  {snapshot.steps:,} instruction(s)")
+
     def update_ui_on_step(self, cpu_state_str, next_pc, memory_dump_str):
         """Simülatörden gelen bilgilerle UI'ı günceller."""
         # Registerları güncelle
         # cpu_state_str'ı parse etmek yerine direkt CPU nesnesinden alalım
-        self.reg_labels["A"].config(text=f"{self.simulator.cpu.A:02X}")
-        self.reg_labels["B"].config(text=f"{self.simulator.cpu.B:02X}")
-        self.reg_labels["X"].config(text=f"{self.simulator.cpu.X:04X}")
-        self.reg_labels["PC"].config(text=f"{self.simulator.cpu.PC:04X}") # Bu bir sonraki PC
-        self.reg_labels["SP"].config(text=f"{self.simulator.cpu.SP:04X}")
-        self.reg_labels["CCR_STR"].config(text=str(self.simulator.cpu.CCR))
-        self.reg_labels["CCR_HEX"].config(text=f"{self.simulator.cpu.CCR.get_byte():02X}")
+        cpu = self.simulator.cpu
+        self._show_registers(cpu.A, cpu.B, cpu.X, cpu.PC, cpu.SP, str(cpu.CCR), cpu.CCR.get_byte())
 
         # Bellek görünümünü güncelle
         self.update_memory_view(self.simulator.cpu.PC) # PC etrafını göster
 
-        # Listing'de bir sonraki çalışacak satırı vurgula (opsiyonel, daha karmaşık)
-        # self.highlight_listing_line(next_pc)
+        # Listing'de bir sonraki komutun satırını vurgula (adres -> satır sözlüğü ile O(1))
+        self._highlight_pc(next_pc)
+
+        # Bir sonraki çalışacak komutun kaynak satırı (yüklü programın source map'i ile O(log n))
+        line_number = self._loaded_line_for_address(next_pc)
+        if line_number is not None:
+            self.status_bar_text.set(f"PC=${next_pc:04X}  line {line_number}")
 
         self.root.update_idletasks()
 
@@ -457,46 +837,20 @@ class MainWindow:
         messagebox.showinfo("Simulation Halted", reason)
 
 
-    def update_memory_view(self, center_address, num_lines=16, bytes_per_line=16):
-        """Bellek görünümünü günceller."""
-        self.memory_text.config(state=tk.NORMAL)
-        self.memory_text.delete("1.0", tk.END)
-
-        # Gösterilecek başlangıç adresini 16 byte'lık sınıra hizala
-        start_addr_display = max(0, center_address - (num_lines // 2 * bytes_per_line))
-        start_addr_display &= ~(bytes_per_line - 1) # 0xFFF0 gibi
-
-        output_lines = []
-        for i in range(num_lines):
-            current_addr_line_start = start_addr_display + (i * bytes_per_line)
-            if current_addr_line_start >= self.simulator.cpu.memory.size:
-                break
-
-            hex_bytes = []
-            ascii_chars = []
-            for j in range(bytes_per_line):
-                addr_to_read = current_addr_line_start + j
-                if addr_to_read < self.simulator.cpu.memory.size:
-                    byte_val = self.simulator.cpu.memory.read_byte(addr_to_read)
-                    hex_bytes.append(f"{byte_val:02X}")
-                    # Yazdırılabilir ASCII karakterleri
-                    ascii_chars.append(chr(byte_val) if 32 <= byte_val <= 126 else '.')
-                else:
-                    hex_bytes.append("  ") # Bellek sonunu geçti
-                    ascii_chars.append(" ")
-
-            line_str = f"${current_addr_line_start:04X}: {' '.join(hex_bytes)}  |{''.join(ascii_chars)}|"
-            output_lines.append(line_str)
-
-        self.memory_text.insert("1.0", "\n".join(output_lines))
-        self.memory_text.config(state=tk.DISABLED)
+    def update_memory_view(self, center_address):
+        """Bellek görünümünü günceller; sadece içeriği değişen görünür satırlar yeniden yazılır."""
+        if self.follow_pc_var.get():
+            self.memory_view.ensure_visible(center_address)
+        self.memory_view.refresh()
 
     def update_memory_view_from_entry(self):
         try:
             addr_str = self.mem_addr_entry.get()
             if addr_str.startswith('$'): addr_str = addr_str[1:]
             addr = int(addr_str, 16)
-            self.update_memory_view(addr)
+            self.follow_pc_var.set(False) # Kullanıcının seçtiği bölge bir sonraki adımda kaybolmasın
+            self.memory_view.goto(addr)
+            self.memory_view.refresh()
         except ValueError:
             messagebox.showerror("Invalid Address", "Please enter a valid hexadecimal address for memory view.")
  
@@ -0,0 +1,287 @@
+# m6800_sdk/utils/object_formats.py
+
+# Assembler'ın segment listesini ([(adres, bytearray), ...]) gerçek kartlara
+# yüklenebilecek veya başka araçlarla paylaşılabilecek dosya formatlarına yazar,
+# ve aynı formatları tekrar segment listesine okur:
+#   - Motorola S-record (S19: 16-bit adres, S28: 24-bit adres)
+#   - Intel HEX
+#   - Ham binary (tek bir taban adresinden itibaren düz imaj)
+#
+# Yazıcılar satırları generator olarak üretir; dosyaya akış halinde yazılır ve
+# tüm imaj hiçbir zaman tek bir string olarak bellekte tutulmaz.
+# Yükleyiciler dosyayı büyük bloklar halinde okur, her kaydın checksum'ını doğrular
+# ve ardışık kayıtları tek bir bytearray'de birleştirir; böylece Memory'ye
+# kayıt başına değil segment başına tek bir slice ataması yapılır.
+
+import os
+
+SREC_BYTES_PER_RECORD = 32
+IHEX_BYTES_PER_RECORD = 16
+READ_CHUNK_SIZE = 1 << 20 # Yükleyicilerin dosyadan tek seferde okuduğu blok (1 MiB)
+
+# S-record türü -> adres alanı uzunluğu (byte)
+_SREC_ADDRESS_LENGTHS = {'0': 2, '1': 2, '2': 3, '3': 4, '5': 2, '6': 3, '7': 4, '8': 3, '9': 2}
+
+FORMAT_EXTENSIONS = {
+    '.s19': 'S19', '.srec': 'S19', '.mot': 'S19',
+    '.s28': 'S28',
+    '.hex': 'IHEX', '.ihx': 'IHEX',
+    '.bin': 'BIN',
+}
+
+def format_for_path(path):
+    """Dosya uzantısından formatı tahmin eder ('S19', 'S28', 'IHEX', 'BIN')."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown object file extension '{ext}'.")
+    return FORMAT_EXTENSIONS[ext]
+
+def _chunks(segments, size):
+    """Segmentleri kayıt boyutunda (adres, memoryview) parçalara böler (kopyasız)."""
+    for address, data in segments:
+        view = memoryview(data)
+        for offset in range(0, len(view), size):
+            yield address + offset, view[offset:offset + size]
+
+# --- Motorola S-record ---
+
+def _srec_line(rec_type, address, data=b""):
+    addr_len = _SREC_ADDRESS_LENGTHS[rec_type]
+    body = bytes([addr_len + len(data) + 1]) + address.to_bytes(addr_len, "big") + bytes(data)
+    checksum = ~sum(body) & 0xFF
+    return f"S{rec_type}{body.hex().upper()}{checksum:02X}\n"
+
+def iter_srecords(segments, entry_point=None, address_bits=16, header="M6800"):
+    """
+    Segmentleri S-record satırları olarak üretir.
+    address_bits=16 -> S1/S9 (S19), address_bits=24 -> S2/S8 (S28).
+    """
+    if address_bits == 16:
+        data_type, end_type = '1', '9'
+    elif address_bits == 24:
+        data_type, end_type = '2', '8'
+    else:
+        raise ValueError(f"Unsupported S-record address width: {address_bits} bits.")
+    limit = 1 << address_bits
+
+    yield _srec_line('0', 0, header.encode("ascii"))
+    count = 0
+    for address, chunk in _chunks(segments, SREC_BYTES_PER_RECORD):
+        if address + len(chunk) > limit:
+            raise ValueError(f"Address ${address:X} does not fit in {address_bits}-bit S-records.")
+        yield _srec_line(data_type, address, chunk)
+        count += 1
+    if count <= 0xFFFF:
+        yield _srec_line('5', count)
+    yield _srec_line(end_type, entry_point or 0)
+
+def read_srecords(path):
+    """
+    S19/S28/S37 dosyasını okur. Döndürülen değer: (segments, entry_point)
+    Checksum veya format hatalarında ValueError fırlatır.
+    """
+    builder = _SegmentBuilder()
+    entry_point = None
+    for line_number, line in _iter_lines(path):
+        if line[0] != 'S' or len(line) < 4:
+            raise ValueError(f"Line {line_number}: Not an S-record.")
+        rec_type = line[1]
+        addr_len = _SREC_ADDRESS_LENGTHS.get(rec_type)
+        if addr_len is None:
+            raise ValueError(f"Line {line_number}: Unknown S-record type 'S{rec_type}'.")
+        record = _decode_hex(line, 2, line_number)
+        if record[0] != len(record) - 1:
+            raise ValueError(f"Line {line_number}: S-record length mismatch.")
+        if (sum(record) & 0xFF) != 0xFF:
+            raise ValueError(f"Line {line_number}: S-record checksum mismatch.")
+        address = int.from_bytes(record[1:1 + addr_len], "big")
+        if rec_type in '123':
+            builder.add(address, record[1 + addr_len:-1])
+        elif rec_type in '789':
+            entry_point = address
+    return builder.segments, entry_point
+
+def write_srecords(path, segments, entry_point=None, address_bits=16):
+    with open(path, "w", newline="\n") as f:
+        f.writelines(iter_srecords(segments, entry_point, address_bits))
+
+# --- Intel HEX ---
+
+def _ihex_line(rec_type, address, data=b""):
+    body = bytes([len(data)]) + (address & 0xFFFF).to_bytes(2, "big") + bytes([rec_type]) + bytes(data)
+    checksum = -sum(body) & 0xFF
+    return f":{body.hex().upper()}{checksum:02X}\n"
+
+def iter_ihex(segments, entry_point=None):
+    """Segmentleri Intel HEX satırları olarak üretir (64 KiB üstü için tip 04 kayıtları)."""
+    upper = 0
+    for address, chunk in _chunks(segments, IHEX_BYTES_PER_RECORD):
+        # Bir kayıt 64 KiB sınırını aşmamalı; aşıyorsa ikiye böl
+        split = min(len(chunk), 0x10000 - (address & 0xFFFF))
+        for part_address, part in ((address, chunk[:split]), (address + split, chunk[split:])):
+            if not part:
+                continue
+            if part_address >> 16 != upper:
+                upper = part_address >> 16
+                yield _ihex_line(0x04, 0, upper.to_bytes(2, "big"))
+            yield _ihex_line(0x00, part_address, part)
+    if entry_point is not None:
+        yield _ihex_line(0x05, 0, entry_point.to_bytes(4, "big"))
+    yield _ihex_line(0x01, 0)
+
+def read_ihex(path):
+    """
+    Intel HEX dosyasını okur. Döndürülen değer: (segments, entry_point)
+    Checksum veya format hatalarında ValueError fırlatır.
+    """
+    builder = _SegmentBuilder()
+    entry_point = None
+    base = 0
+    for line_number, line in _iter_lines(path):
+        if line[0] != ':':
+            raise ValueError(f"Line {line_number}: Intel HEX record must start with ':'.")
+        record = _decode_hex(line, 1, line_number)
+        if len(record) < 5 or record[0] != len(record) - 5:
+            raise ValueError(f"Line {line_number}: Intel HEX length mismatch.")
+        if sum(record) & 0xFF:
+            raise ValueError(f"Line {line_number}: Intel HEX checksum mismatch.")
+        rec_type = record[3]
+        data = record[4:-1]
+        if rec_type == 0x00:
+            builder.add(base + int.from_bytes(record[1:3], "big"), data)
+        elif rec_type == 0x01:
+            break
+        elif rec_type == 0x02:
+            base = int.from_bytes(data, "big") << 4
+        elif rec_type == 0x04:
+            base = int.from_bytes(data, "big") << 16
+        elif rec_type == 0x03:
+            entry_point = (int.from_bytes(data[:2], "big") << 4) + int.from_bytes(data[2:], "big")
+        elif rec_type == 0x05:
+            entry_point = int.from_bytes(data, "big")
+        else:
+            raise ValueError(f"Line {line_number}: Unknown Intel HEX record type {rec_type:02X}.")
+    return builder.segments, entry_point
+
+def write_ihex(path, segments, entry_point=None):
+    with open(path, "w", newline="\n") as f:
+        f.writelines(iter_ihex(segments, entry_point))
+
+# --- Ham binary ---
+
+def write_binary(path, segments, fill=0xFF):
+    """
+    Segmentleri en düşük adresten en yüksek adrese kadar düz bir imaj olarak yazar.
+    Aradaki boşluklar fill ile doldurulur. Döndürülen değer: imajın taban adresi.
+    """
+    if not segments:
+        raise ValueError("Nothing to write: no segments.")
+    base = min(address for address, _ in segments)
+    end = max(address + len(data) for address, data in segments)
+    image = bytearray([fill]) * (end - base)
+    for address, data in segments:
+        image[address - base:address - base + len(data)] = data
+    with open(path, "wb") as f:
+        f.write(image)
+    return base
+
+def read_binary(path, base_address=0):
+    """Ham binary dosyayı base_address'ten başlayan tek bir segment olarak okur."""
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    return [(base_address, data)], base_address
+
+# --- Ortak yardımcılar ---
+
+def write_object_file(path, segments, entry_point=None, fmt=None):
+    """Formatı (veya uzantıdan tahmin edilen formatı) kullanarak segmentleri yazar."""
+    fmt = fmt or format_for_path(path)
+    if fmt == 'S19':
+        write_srecords(path, segments, entry_point, 16)
+    elif fmt == 'S28':
+        write_srecords(path, segments, entry_point, 24)
+    elif fmt == 'IHEX':
+        write_ihex(path, segments, entry_point)
+    elif fmt == 'BIN':
+        write_binary(path, segments)
+    else:
+        raise ValueError(f"Unknown object file format '{fmt}'.")
+
+def read_object_file(path, fmt=None, base_address=0):
+    """Dosyayı okur ve (segments, entry_point) döndürür."""
+    fmt = fmt or format_for_path(path)
+    if fmt in ('S19', 'S28'):
+        return read_srecords(path)
+    if fmt == 'IHEX':
+        return read_ihex(path)
+    if fmt == 'BIN':
+        return read_binary(path, base_address)
+    raise ValueError(f"Unknown object file format '{fmt}'.")
+
+class _SegmentBuilder:
+    """Ardışık adresli kayıtları tek bir bytearray'de birleştirir."""
+    def __init__(self):
+        self.segments = []
+        self._next_address = None
+
+    def add(self, address, data):
+        if address == self._next_address:
+            self.segments[-1][1].extend(data)
+        else:
+            self.segments.append((address, bytearray(data)))
+        self._next_address = address + len(data)
+
+def _decode_hex(line, start, line_number):
+    try:
+        return bytes.fromhex(line[start:])
+    except ValueError:
+        raise ValueError(f"Line {line_number}: Invalid hex digits in record.") from None
+
+def _iter_lines(path):
+    """Dosyayı READ_CHUNK_SIZE'lık bloklar halinde okuyup boş olmayan satırları üretir."""
+    line_number = 0
+    remainder = ""
+    with open(path, "r", newline="") as f:
+        while True:
+            block = f.read(READ_CHUNK_SIZE)
+            if not block:
+                break
+            data = remainder + block
+            lines = data.splitlines()
+            # Blok satır ortasında bitmiş olabilir; son parçayı bir sonraki bloğa sakla. Blok '\r'
+            # ile bitiyorsa CRLF'nin '\n'i sonraki blokta olabilir: '\r' de saklanır, yoksa
+            # sonraki bloğun başındaki '\n' fazladan boş bir satır sayılır (satır numaraları kayar).
+            last = data[-1]
+            if last == "\r":
+                remainder = lines.pop() + "\r"
+            elif last != "\n":
+                remainder = lines.pop()
+            else:
+                remainder = ""
+            for line in lines:
+                line_number += 1
+                line = line.strip()
+                if line:
+                    yield line_number, line
+    if remainder.strip():
+        yield line_number + 1, remainder.strip()
+
+# Test için örnek kullanım
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    segments = [(0x0000, bytearray(range(256)) * 256)] # 64 KiB'lık tam imaj
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("image.s19", "image.hex", "image.bin"):
+            path = os.path.join(tmp, name)
+            write_object_file(path, segments, entry_point=0xC000)
+            start = time.perf_counter()
+            loaded, entry = read_object_file(path)
+            elapsed = (time.perf_counter() - start) * 1000
+            ok = loaded == segments
+            print(f"{name:<10} {os.path.getsize(path):>7} bytes, read in {elapsed:6.1f} ms, "
+                  f"round-trip {'OK' if ok else 'FAILED'}, entry={entry}")
+
+    print("".join(iter_srecords([(0xC000, bytearray(b"\x86\x10\x7E\xC0\x00"))], 0xC000)), end="")
+    print("".join(iter_ihex([(0xC000, bytearray(b"\x86\x10\x7E\xC0\x00"))], 0xC000)), end="")